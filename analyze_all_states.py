@@ -1,25 +1,20 @@
 #!/usr/bin/env python3
-import csv
 import json
 from collections import defaultdict
 
+from landscape import load_landscape
+
 input_file = './CY2026_Landscape_202511/CY2026_Landscape_202511.csv'
 output_file = './data_analysis/state_plans_analysis.json'
 
 state_data = {}
 
-# Read the CSV and organize by state
-with open(input_file, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-
-    state_rows = defaultdict(list)
-
-    for row in reader:
-        state = row['State Territory Name']
-        state_rows[state].append(row)
+# The landscape table is already indexed by state
+table = load_landscape(input_file)
 
 # Analyze each state
-for state, rows in sorted(state_rows.items()):
+for state in sorted(table.by_state):
+    rows = list(table.iter_rows(state=state))
     unique_plan_ids = set()
     counties = set()
     plans_by_county = defaultdict(set)
@@ -3,26 +3,29 @@
 Simple Flask API for Medicare plan lookup by ZIP code
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, send_file
 from pathlib import Path
 import json
 
+from lambda_function import build_plan_index, encode_summary_plans, join_plan_details, splice_json
+from precompress import negotiate
+from zip_index import load_zip_index
+
 app = Flask(__name__)
 
 # Load ZIP to county mapping once at startup
 ZIP_TO_COUNTY = {}
 COUNTY_CACHES = {}
+PLAN_STORE = None  # {plan_id: plan} from plans.json, if built
+PLAN_INDEX = {}  # {plan_id: (plan, [counties])}
+STATIC_ROOT = Path('static_api/medicare')
 
 def load_data():
     """Load all data files at startup"""
-    global ZIP_TO_COUNTY, COUNTY_CACHES
+    global ZIP_TO_COUNTY, COUNTY_CACHES, PLAN_STORE, PLAN_INDEX
 
-    # Load ZIP to county mapping
-    zip_file = Path('mock_api/NH/zip_to_county_multi.json')
-    with open(zip_file, 'r') as f:
-        zip_data = json.load(f)
-        for entry in zip_data:
-            ZIP_TO_COUNTY[entry['zip']] = entry
+    # ZIP to county mapping - NH's view of the shared binary index
+    ZIP_TO_COUNTY = load_zip_index(Path('mock_api'), check_stale=True).for_state('NH')
 
     print(f"Loaded {len(ZIP_TO_COUNTY)} ZIP codes")
 
@@ -33,8 +36,24 @@ def load_data():
         with open(county_file, 'r') as f:
             COUNTY_CACHES[county_name] = json.load(f)
 
+        # Summary responses splice this in instead of rebuilding it per request
+        COUNTY_CACHES[county_name]['summary_plans_json'] = encode_summary_plans(COUNTY_CACHES[county_name]['plans'])
+
     print(f"Loaded {len(COUNTY_CACHES)} county caches")
 
+    # Deduplicated plan table - each plan's details stored once
+    plan_store_file = Path('mock_api/NH/plans.json')
+    if plan_store_file.exists():
+        with open(plan_store_file, 'r') as f:
+            PLAN_STORE = json.load(f)['plans']
+
+    # Index plans by ID so plan lookups don't scan every county
+    if PLAN_STORE is not None:
+        PLAN_INDEX = {plan_id: (plan, plan['counties']) for plan_id, plan in PLAN_STORE.items()}
+    else:
+        PLAN_INDEX = build_plan_index(COUNTY_CACHES)
+    print(f"Indexed {len(PLAN_INDEX)} plans")
+
 @app.route('/api/nh/<zip_code>', methods=['GET'])
 def get_plans_by_zip(zip_code):
     """
@@ -53,15 +72,15 @@ def get_plans_by_zip(zip_code):
     # Get include_details parameter (default: true)
     include_details = request.args.get('include_details', 'true').lower() == 'true'
 
-    # Build response with counties
+    # Build response with counties (spliced in below as encoded fragments)
     response = {
         'zip_code': zip_code,
         'multi_county': zip_info['multi_county'],
-        'primary_county': zip_info['primary_county']['name'],
-        'counties': {}
+        'primary_county': zip_info['primary_county']['name']
     }
 
     # Load plans for each county
+    county_fragments = {}
     for county_info in zip_info['counties']:
         county_name = county_info['name']
 
@@ -73,44 +92,40 @@ def get_plans_by_zip(zip_code):
         # Filter plans based on include_details parameter
         if include_details:
             # Include full details
-            plans = county_data['plans']
+            plans_json = json.dumps(join_plan_details(county_data['plans'], PLAN_STORE))
         else:
-            # Summary only (faster response, smaller payload)
-            plans = [
-                {
-                    'contract_plan_segment_id': p['summary']['contract_plan_segment_id'],
-                    'plan_name': p['summary']['plan_name'],
-                    'plan_type': p['summary']['plan_type'],
-                    'organization': p['summary']['organization'],
-                    'has_scraped_details': p['has_scraped_details']
-                }
-                for p in county_data['plans']
-            ]
-
-        response['counties'][county_name] = {
+            # Summary only - projected and encoded once at startup
+            plans_json = county_data['summary_plans_json']
+
+        county_json = json.dumps({
             'fips': county_info['fips'],
             'percentage': county_info.get('percentage'),
-            'plan_count': len(plans),
-            'scraped_details_available': county_data['scraped_details_available'],
-            'plans': plans
-        }
+            'plan_count': len(county_data['plans']),
+            'scraped_details_available': county_data['scraped_details_available']
+        })
+        county_fragments[county_name] = splice_json(county_json, 'plans', plans_json)
 
-    return jsonify(response)
+    counties_json = '{' + ', '.join(
+        f'{json.dumps(county_name)}: {fragment}' for county_name, fragment in county_fragments.items()
+    ) + '}'
+    body = splice_json(json.dumps(response), 'counties', counties_json)
+
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/nh/plan/<plan_id>', methods=['GET'])
 def get_plan_detail(plan_id):
     """Get details for a specific plan"""
-    # Search through county caches
-    for county_name, county_data in COUNTY_CACHES.items():
-        for plan in county_data['plans']:
-            if plan['summary']['contract_plan_segment_id'] == plan_id:
-                return jsonify({
-                    'plan_id': plan_id,
-                    'county': county_name,
-                    'summary': plan['summary'],
-                    'details': plan['details'],
-                    'has_scraped_details': plan['has_scraped_details']
-                })
+    entry = PLAN_INDEX.get(plan_id)
+    if entry:
+        plan, counties = entry
+        return jsonify({
+            'plan_id': plan_id,
+            'county': counties[0],
+            'counties': counties,
+            'summary': plan['summary'],
+            'details': plan['details'],
+            'has_scraped_details': plan['has_scraped_details']
+        })
 
     return jsonify({
         'error': 'Plan not found',
@@ -134,6 +149,24 @@ def list_counties():
         'counties': sorted(counties, key=lambda x: x['name'])
     })
 
+@app.route('/medicare/<path:file_path>', methods=['GET'])
+def get_static_file(file_path):
+    """
+    Serve a static API file like S3 + CloudFront do - the .br/.gz sidecar
+    that matches Accept-Encoding if there is one, the plain JSON otherwise
+    """
+    root = STATIC_ROOT.resolve()
+    path = (root / file_path).resolve()
+    if root not in path.parents or not path.is_file():
+        return jsonify({'error': 'Not found', 'path': file_path}), 404
+
+    body_path, encoding = negotiate(path, request.headers.get('Accept-Encoding'))
+    response = send_file(body_path, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -156,12 +189,14 @@ if __name__ == '__main__':
     print("  GET /api/nh/<zip_code>?include_details=false  - Summary only")
     print("  GET /api/nh/plan/<plan_id>          - Get specific plan details")
     print("  GET /api/nh/counties                - List all counties")
+    print("  GET /medicare/<path>                - Static API file (.br/.gz by Accept-Encoding)")
     print("  GET /health                         - Health check")
     print("\nExamples:")
     print("  curl http://localhost:5000/api/nh/03462")
     print("  curl http://localhost:5000/api/nh/03602")
     print("  curl 'http://localhost:5000/api/nh/03602?include_details=false'")
     print("  curl http://localhost:5000/api/nh/plan/S4802_075_0")
+    print("  curl -sI -H 'Accept-Encoding: br' http://localhost:5000/medicare/zip/29401.json")
     print("\n" + "=" * 80)
 
     app.run(debug=True, port=5000)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark Lambda cold start: eager load_data() vs lazy per-state/per-county loading
+Each run is a fresh interpreter so nothing is warm between measurements
+"""
+
+import json
+import subprocess
+import sys
+
+RUNS = 5
+
+REQUESTS = [
+    ('AK ZIP', '/ak/99501', {'details': '0'}),
+    ('NH ZIP', '/nh/03602', {'details': '0'}),
+    ('NH ZIP (details)', '/nh/03602', {}),
+    ('NH plan detail', '/nh/plan/S4802_075_0', {}),
+]
+
+CHILD = '''
+import json, resource, sys, time
+start = time.perf_counter()
+import lambda_function
+if sys.argv[1] == 'eager':
+    lambda_function.load_data()
+event = {'httpMethod': 'GET', 'path': sys.argv[2], 'queryStringParameters': json.loads(sys.argv[3])}
+result = lambda_function.lambda_handler(event, None)
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'status': result['statusCode'],
+    'ms': elapsed * 1000,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+}))
+'''
+
+def cold_start(mode, path, query):
+    """Run one first request in a new process and return its measurements"""
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, mode, path, json.dumps(query)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    print("=" * 80)
+    print(f"Lambda Cold Start Benchmark (median of {RUNS} runs)")
+    print("=" * 80)
+    print(f"{'request':<20} {'eager ms':>10} {'lazy ms':>10} {'speedup':>8} {'eager RSS':>11} {'lazy RSS':>10}")
+
+    for name, path, query in REQUESTS:
+        results = {}
+        for mode in ['eager', 'lazy']:
+            runs = sorted((cold_start(mode, path, query) for _ in range(RUNS)), key=lambda r: r['ms'])
+            results[mode] = runs[RUNS // 2]
+
+        eager, lazy = results['eager'], results['lazy']
+        print(f"{name:<20} {eager['ms']:>10.1f} {lazy['ms']:>10.1f} {eager['ms'] / lazy['ms']:>7.1f}x "
+              f"{eager['max_rss_kb'] / 1024:>9.1f}MB {lazy['max_rss_kb'] / 1024:>8.1f}MB")
+
+if __name__ == '__main__':
+    main()
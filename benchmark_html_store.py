@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark storing scraped pages: one uncompressed file per scrape in
+scraped_html_all/ (the old scrapers) vs the content-addressed HtmlStore
+
+Each plan is "scraped" SCRAPES_PER_PLAN times, as retries and stealth re-runs
+did; only the last scrape of every RECHANGE_EVERY-th plan returns a changed page.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import html_store
+from benchmark_plan_parser import render_plan_page
+from html_store import HtmlStore
+
+SCRAPES_PER_PLAN = 3
+RECHANGE_EVERY = 10
+
+def corpus():
+    pages = []
+    for json_file in sorted(Path('scraped_json_all').glob('*.json')):
+        pages.append((json_file.stem, render_plan_page(json.loads(json_file.read_text()))))
+    return pages
+
+def scrapes(pages):
+    for attempt in range(SCRAPES_PER_PLAN):
+        for i, (name, html) in enumerate(pages):
+            changed = attempt == SCRAPES_PER_PLAN - 1 and i % RECHANGE_EVERY == 0
+            yield name, html + ('<!-- updated -->' if changed else '')
+
+def flat_files(root, pages):
+    written = 0
+    for name, html in scrapes(pages):
+        with open(root / f'{name}.html', 'w', encoding='utf-8') as f:
+            f.write(html)
+        written += len(html.encode('utf-8'))
+    return written, sum(p.stat().st_size for p in root.iterdir())
+
+def store(root, pages):
+    written = 0
+    with HtmlStore(root) as store:
+        for name, html in scrapes(pages):
+            entry = store.put(name, html)
+            written += entry['stored_size'] if entry['new'] else 0
+    index_size = store.index_path.stat().st_size
+    return written + index_size, sum(p.stat().st_size for p in root.rglob('*') if p.is_file())
+
+def main():
+    pages = corpus()
+    print("=" * 80)
+    print(f"HTML STORAGE BENCHMARK - {len(pages)} plans x {SCRAPES_PER_PLAN} scrapes "
+          f"({'zstd' if html_store.zstandard else 'gzip'} blobs)")
+    print("=" * 80)
+    if not pages:
+        print("No scraped_json_all/ pages to render")
+        return
+
+    results = {}
+    for label, fn in [('scraped_html_all/', flat_files), ('html_store/', store)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            written, on_disk = fn(Path(tmp), pages)
+            results[label] = (time.perf_counter() - start, written, on_disk)
+
+    for label, (elapsed, written, on_disk) in results.items():
+        print(f"{label:18s} {elapsed:6.2f}s  written {written / 1024 / 1024:7.2f} MB  "
+              f"on disk {on_disk / 1024 / 1024:7.2f} MB")
+
+    (_, flat_written, flat_disk), (_, store_written, store_disk) = results.values()
+    print(f"\nWrite volume: {flat_written / store_written:.1f}x smaller; "
+          f"footprint: {flat_disk / store_disk:.1f}x smaller (with every scrape's history kept)")
+
+if __name__ == '__main__':
+    main()
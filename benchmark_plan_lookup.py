@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: plan detail lookup, linear county scan vs plan ID index
+Synthesizes county caches of growing size and times both lookups
+"""
+
+import time
+
+from lambda_function import build_plan_index
+
+LOOKUPS = 2000
+
+def make_county_caches(num_counties, plans_per_county):
+    """Build synthetic county caches shaped like mock_api/{state}/counties"""
+    county_caches = {}
+    for c in range(num_counties):
+        plans = []
+        for p in range(plans_per_county):
+            # Every other plan is shared across all counties ("All Counties")
+            plan_id = f'S{p:04d}_000_0' if p % 2 == 0 else f'H{c:03d}{p:04d}_000_0'
+            plans.append({
+                'summary': {'contract_plan_segment_id': plan_id},
+                'details': None,
+                'has_scraped_details': False
+            })
+        county_caches[f'County{c:03d}'] = {'plans': plans}
+    return county_caches
+
+def linear_lookup(county_caches, plan_id):
+    """The original get_plan_detail search"""
+    for county_name, county_data in county_caches.items():
+        for plan in county_data['plans']:
+            if plan['summary']['contract_plan_segment_id'] == plan_id:
+                return plan, county_name
+    return None
+
+def time_lookups(fn, plan_ids):
+    start = time.perf_counter()
+    for plan_id in plan_ids:
+        fn(plan_id)
+    return (time.perf_counter() - start) / len(plan_ids) * 1e6
+
+def main():
+    print("=" * 80)
+    print("Plan Lookup Benchmark (microseconds per lookup)")
+    print("=" * 80)
+    print(f"{'counties':>9} {'plans/cty':>10} {'linear':>12} {'index':>10} {'build ms':>10}")
+
+    for num_counties, plans_per_county in [(10, 20), (50, 40), (100, 60), (260, 80), (500, 120)]:
+        county_caches = make_county_caches(num_counties, plans_per_county)
+
+        start = time.perf_counter()
+        index = build_plan_index(county_caches)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Worst case for the scan: plans that only appear in the last county
+        last = num_counties - 1
+        plan_ids = [f'H{last:03d}{p:04d}_000_0' for p in range(1, plans_per_county, 2)]
+        plan_ids = (plan_ids * (LOOKUPS // len(plan_ids) + 1))[:LOOKUPS]
+
+        linear_us = time_lookups(lambda pid: linear_lookup(county_caches, pid), plan_ids[:200])
+        index_us = time_lookups(index.get, plan_ids)
+
+        print(f"{num_counties:>9} {plans_per_county:>10} {linear_us:>12.1f} {index_us:>10.3f} {build_ms:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark plan_parser against the original copy-pasted extract_plan_data
+Runs over the saved HTML corpus in scraped_html_all/ and checks that every
+page parses to exactly the same JSON. Without a corpus, pages are rendered
+from scraped_json_all/ so the comparison can still run.
+
+Usage: python benchmark_plan_parser.py [--limit N]
+"""
+
+import argparse
+import html
+import json
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import plan_parser
+
+HTML_DIR = Path('./scraped_html_all')
+JSON_DIR = Path('./scraped_json_all')
+
+
+def original_extract_plan_data(html_content):
+    """The parser as it was in scrape_multithreaded.py, kept as the baseline"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # Replace <br> tags with newlines before parsing
+    for br in soup.find_all('br'):
+        br.replace_with('\n')
+
+    plan_data = {
+        'plan_info': {},
+        'premiums': {},
+        'deductibles': {},
+        'maximum_out_of_pocket': {},
+        'contact_info': {},
+        'benefits': {},
+        'drug_coverage': {},
+        'extra_benefits': {}
+    }
+
+    # Extract plan name and ID
+    plan_header_section = soup.find('div', class_='PlanDetailsPagePlanInfo')
+    if plan_header_section:
+        plan_name_h1 = plan_header_section.find('h1')
+        if plan_name_h1:
+            plan_data['plan_info']['name'] = plan_name_h1.get_text(strip=True)
+
+        plan_name_h2 = plan_header_section.find('h2')
+        if plan_name_h2:
+            plan_data['plan_info']['organization'] = plan_name_h2.get_text(strip=True)
+
+        list_items = plan_header_section.find_all('li')
+        for li in list_items:
+            text = li.get_text()
+            if 'Plan type:' in text:
+                plan_data['plan_info']['type'] = text.replace('Plan type:', '').strip()
+            elif 'Plan ID:' in text:
+                plan_data['plan_info']['id'] = text.replace('Plan ID:', '').strip()
+
+    # Extract all tables
+    tables = soup.find_all('table', class_='mct-c-table')
+
+    for table in tables:
+        caption = table.find('caption')
+        if not caption:
+            continue
+
+        table_title = caption.get_text(strip=True)
+
+        rows = table.find_all('tr')
+        table_data = {}
+
+        for row in rows:
+            header = row.find('th')
+            cell = row.find('td')
+
+            if header and cell:
+                header_text = header.get_text(strip=True)
+                header_text = re.sub(r"What's.*?\?", "", header_text).strip()
+
+                # Get cell text preserving newlines from <br> tags
+                cell_text = cell.get_text(separator='\n').strip()
+                # Clean up multiple consecutive newlines
+                cell_text = re.sub(r'\n\s*\n', '\n', cell_text)
+
+                table_data[header_text] = cell_text
+
+        # Categorize the table data
+        title_lower = table_title.lower()
+
+        if 'premium' in title_lower:
+            plan_data['premiums'].update(table_data)
+        elif 'deductible' in title_lower:
+            plan_data['deductibles'].update(table_data)
+        elif 'maximum you pay' in title_lower or 'moop' in title_lower:
+            plan_data['maximum_out_of_pocket'].update(table_data)
+        elif 'contact' in title_lower or 'address' in title_lower:
+            plan_data['contact_info'].update(table_data)
+        elif 'drug' in title_lower or 'pharmacy' in title_lower or 'tier' in title_lower or 'part b drug' in title_lower:
+            if 'drug_tables' not in plan_data['drug_coverage']:
+                plan_data['drug_coverage']['drug_tables'] = {}
+            plan_data['drug_coverage']['drug_tables'][table_title] = table_data
+        elif any(keyword in title_lower for keyword in ['hearing', 'dental', 'vision', 'fitness', 'transportation']):
+            plan_data['extra_benefits'][table_title] = table_data
+        else:
+            plan_data['benefits'][table_title] = table_data
+
+    return plan_data
+
+
+def render_table(title, rows):
+    """One mct-c-table with help buttons in the headers and <br> line breaks"""
+    out = [f'<table class="mct-c-table mct-c-table--borderless">\n<caption>\n  <span>{html.escape(title)}</span>\n</caption>\n<tbody>']
+    for i, (key, value) in enumerate(rows.items()):
+        help_button = f'<button class="mct-c-help-drawer__toggle">What\'s {html.escape(key.lower()[:20])}?</button>' if i % 2 else ''
+        lines = '<br>'.join(f'<span>{html.escape(line)}</span>' for line in str(value).split('\n'))
+        out.append(f'<tr>\n  <th scope="row">{html.escape(key)} {help_button}</th>\n  <td><div class="e2e-cell">{lines}</div></td>\n</tr>')
+    out.append('</tbody>\n</table>')
+    return '\n'.join(out)
+
+
+def render_plan_page(plan):
+    """An approximate Plan Finder page for a scraped plan JSON"""
+    info = plan.get('plan_info', {})
+    tables = [('Premiums', plan.get('premiums', {})), ('Deductibles', plan.get('deductibles', {})),
+              ('Maximum you pay', plan.get('maximum_out_of_pocket', {})),
+              ('Contact Information', plan.get('contact_info', {}))]
+    for group in ('benefits', 'extra_benefits'):
+        tables.extend(plan.get(group, {}).items())
+    tables.extend(plan.get('drug_coverage', {}).get('drug_tables', {}).items())
+
+    # The real pages carry lots of markup outside the plan details
+    chrome = '\n'.join(
+        f'<div class="nav-item"><a href="/link/{i}">Link {i}</a><br><span>Menu text {i}</span><!-- item {i} --></div>'
+        for i in range(400)
+    )
+    body = '\n'.join(render_table(title, rows) for title, rows in tables if isinstance(rows, dict))
+    return f'''<!DOCTYPE html>
+<html lang="en"><head><title>Plan details</title>
+<script>window.__STATE__ = {json.dumps({'id': info.get('id')})};</script>
+<style>.mct-c-table {{ width: 100%; }}</style></head>
+<body><header>{chrome}</header>
+<main>
+<div class="PlanDetailsPagePlanInfo e2e-plan-details-info">
+  <h1 class="mct-c-heading">{html.escape(info.get('name', ''))}</h1>
+  <h2>{html.escape(info.get('organization', ''))}</h2>
+  <ul>
+    <li><strong>Plan type:</strong> {html.escape(info.get('type', ''))}</li>
+    <li><strong>Plan ID:</strong> {html.escape(info.get('id', ''))}</li>
+  </ul>
+</div>
+{body}
+</main><footer>{chrome}</footer></body></html>'''
+
+
+def load_corpus(limit):
+    """Saved HTML pages, or pages rendered from the scraped JSON"""
+    html_files = sorted(HTML_DIR.glob('*.html'))[:limit] if HTML_DIR.exists() else []
+    if html_files:
+        return 'saved HTML', [f.read_text(encoding='utf-8') for f in html_files]
+
+    pages = []
+    for json_file in sorted(JSON_DIR.glob('*.json'))[:limit]:
+        with open(json_file) as f:
+            pages.append(render_plan_page(json.load(f)))
+    return 'rendered from scraped JSON', pages
+
+
+def time_parser(parse, pages):
+    start = time.perf_counter()
+    results = [parse(page) for page in pages]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared plan parser')
+    parser.add_argument('--limit', type=int, default=200, help='Pages to parse (default: 200)')
+    args = parser.parse_args()
+
+    source, pages = load_corpus(args.limit)
+    total_mb = sum(len(page) for page in pages) / 1024 / 1024
+
+    print("=" * 80)
+    print("Plan Parser Benchmark")
+    print("=" * 80)
+    print(f"Corpus: {len(pages)} pages ({source}), {total_mb:.1f} MB")
+    print(f"plan_parser backend: {plan_parser.BACKEND}\n")
+
+    base_time, expected = time_parser(original_extract_plan_data, pages)
+    candidates = [('original (html.parser)', original_extract_plan_data)]
+    for backend in ['bs4', 'lxml'] if plan_parser.etree is not None else ['bs4']:
+        candidates.append((f'plan_parser ({backend})',
+                           lambda page, backend=backend: plan_parser.extract_plan_data(page, backend=backend)))
+
+    print(f"{'parser':<26} {'total s':>9} {'ms/page':>9} {'pages/s':>9} {'speedup':>8} {'mismatches':>11}")
+    for name, parse in candidates:
+        elapsed, results = (base_time, expected) if parse is original_extract_plan_data else time_parser(parse, pages)
+        mismatches = sum(1 for got, want in zip(results, expected) if got != want)
+        print(f"{name:<26} {elapsed:>9.2f} {elapsed / len(pages) * 1000:>9.2f} {len(pages) / elapsed:>9.1f} "
+              f"{base_time / elapsed:>7.1f}x {mismatches:>11}")
+
+
+if __name__ == '__main__':
+    main()
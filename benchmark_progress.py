@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark progress tracking for a national run: rewriting scraping_progress.json
+every 10 plans (the old save_progress) vs the append-only ProgressJournal
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from progress_journal import ProgressJournal
+
+PLANS = 6581  # Plans in the CY2026 landscape
+SAVE_INTERVAL = 10
+
+def rewrite_snapshot(path):
+    """The old scrapers: append to the in-memory lists, dump everything every 10 plans"""
+    progress = {'completed': [], 'failed': []}
+    written = 0
+    for i in range(PLANS):
+        progress['completed'].append(f'H{i:04d}_001_0')
+        if (i + 1) % SAVE_INTERVAL == 0:
+            with open(path, 'w') as f:
+                json.dump(progress, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())  # Same durability as the journal
+            written += os.path.getsize(path)
+    return written
+
+def journal(path):
+    with ProgressJournal(path, fsync_every=SAVE_INTERVAL, fsync_interval=3600) as j:
+        for i in range(PLANS):
+            j.record(f'H{i:04d}_001_0', 'Alaska', True)
+        written = j.journal_path.stat().st_size
+    return written + os.path.getsize(path)
+
+def main():
+    print("=" * 80)
+    print(f"PROGRESS TRACKING BENCHMARK - {PLANS} plans, durable every {SAVE_INTERVAL}")
+    print("=" * 80)
+    for name, fn in [('Rewrite scraping_progress.json', rewrite_snapshot), ('Append-only journal', journal)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            written = fn(Path(tmp) / 'scraping_progress.json')
+            elapsed = time.perf_counter() - start
+        print(f"{name:32s} {elapsed:7.2f}s  {written / 1024 / 1024:8.1f} MB written")
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
 """
 Build county cache files for all states we have complete data for
+Plan details are written once per state to plans.json; county files reference them by ID
+
+Usage:
+    python build_all_county_caches.py                 # AK, NH, VT, WY
+    python build_all_county_caches.py NH VT           # selected states
+    python build_all_county_caches.py --all           # every state/territory in the landscape CSV
+    python build_all_county_caches.py --all --workers 4
+
+States are built in parallel on a process pool. The landscape CSV is parsed
+once (or read from its snapshot) before the pool starts, and scraped_json_all
+is listed once and split by state, so workers never re-read either.
 """
 
+import argparse
+import io
 import json
-import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from pathlib import Path
 from collections import defaultdict
-import sys
+
+from check_states import US_50_STATES
+from landscape import load_landscape
 
 STATE_CONFIGS = {
     'AK': {'name': 'Alaska', 'territory_name': 'Alaska'},
@@ -17,46 +35,85 @@ STATE_CONFIGS = {
 }
 
 def load_state_plans_from_csv(state_territory_name):
-    """Load all plans for a state from CSV"""
+    """Load all plans for a state from the shared landscape table"""
     plans_by_county = defaultdict(list)
     all_counties_plans = []
 
-    csv_path = Path('CY2026_Landscape_202511/CY2026_Landscape_202511.csv')
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['State Territory Name'] == state_territory_name:
-                county = row['County Name']
-                plan_id = row['ContractPlanSegmentID']
-
-                plan_info = {
-                    'contract_plan_segment_id': plan_id,
-                    'plan_name': row['Plan Name'],
-                    'plan_type': row['Plan Type'],
-                    'organization': row['Organization Marketing Name'],
-                    'part_c_premium': row['Part C Premium'],
-                    'part_d_total_premium': row['Part D Total Premium'],
-                    'overall_star_rating': row['Overall Star Rating'],
-                    'county': county,
-                    'snp_type': row['SNP Type'],
-                    'parent_organization': row['Parent Organization Name']
-                }
+    for row in load_landscape().iter_rows(state=state_territory_name):
+        county = row['County Name']
+        plan_id = row['ContractPlanSegmentID']
+
+        plan_info = {
+            'contract_plan_segment_id': plan_id,
+            'plan_name': row['Plan Name'],
+            'plan_type': row['Plan Type'],
+            'organization': row['Organization Marketing Name'],
+            'part_c_premium': row['Part C Premium'],
+            'part_d_total_premium': row['Part D Total Premium'],
+            'overall_star_rating': row['Overall Star Rating'],
+            'county': county,
+            'snp_type': row['SNP Type'],
+            'parent_organization': row['Parent Organization Name']
+        }
 
-                if county == 'All Counties':
-                    all_counties_plans.append(plan_info)
-                else:
-                    plans_by_county[county].append(plan_info)
+        if county == 'All Counties':
+            all_counties_plans.append(plan_info)
+        else:
+            plans_by_county[county].append(plan_info)
 
     return plans_by_county, all_counties_plans
 
-def load_scraped_plan_details(state_name):
+def state_configs_from_landscape():
+    """STATE_CONFIGS-style entries for every state/territory in the landscape CSV"""
+    table = load_landscape()
+    configs = {}
+    for territory_name in table.states():
+        first_row = table.row_indexes(state=territory_name)[0]
+        state_abbr = table.columns['State Territory Abbreviation'][first_row]
+        configs[state_abbr] = {
+            'name': territory_name.replace(' ', '_').replace('/', '_'),
+            'territory_name': territory_name
+        }
+    return configs
+
+def index_scraped_files(scraped_dir=Path('scraped_json_all')):
+    """List scraped_json_all once and group the files by state name prefix"""
+    files_by_state = defaultdict(list)
+    if scraped_dir.exists():
+        # Files are named like: Alaska-S4802_096_0.json
+        for json_file in sorted(scraped_dir.glob('*-*.json')):
+            files_by_state[json_file.stem.split('-', 1)[0]].append(json_file)
+    return files_by_state
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to a temp file and rename it, so readers never see a torn file
+
+    Files whose content is unchanged are left alone (mtime included), so the
+    return value tells callers whether anything was actually written.
+    """
+    text = json.dumps(data, **dump_kwargs)
+    try:
+        if path.read_text() == text:
+            return False
+    except OSError:
+        pass
+
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return True
+
+def load_scraped_plan_details(state_name, state_files=None):
     """Load all scraped plan detail JSONs for a state"""
-    scraped_dir = Path('scraped_json_all')
     plan_details = {}
 
-    # Files are named like: Alaska-S4802_096_0.json
-    state_files = list(scraped_dir.glob(f'{state_name}-*.json'))
+    if state_files is None:
+        state_files = index_scraped_files().get(state_name, [])
 
     print(f"  Found {len(state_files)} scraped plan detail files")
 
@@ -70,8 +127,13 @@ def load_scraped_plan_details(state_name):
 
     return plan_details
 
-def build_county_caches_for_state(state_abbr, state_config):
-    """Build enriched county cache files for one state"""
+def build_county_caches_for_state(state_abbr, state_config, scraped_files=None, scraped_details=None):
+    """Build enriched county cache files for one state
+
+    scraped_details may be passed in pre-loaded (see incremental_build.py);
+    otherwise every scraped file for the state is read. Paths of the files
+    whose content changed are returned in stats['written_files'].
+    """
 
     state_name = state_config['name']
     territory_name = state_config['territory_name']
@@ -82,7 +144,8 @@ def build_county_caches_for_state(state_abbr, state_config):
 
     # Load data
     county_plans, all_counties_plans = load_state_plans_from_csv(territory_name)
-    scraped_details = load_scraped_plan_details(state_name)
+    if scraped_details is None:
+        scraped_details = load_scraped_plan_details(state_name, scraped_files)
 
     print(f"  'All Counties' plans: {len(all_counties_plans)}")
     print(f"  Scraped plan details: {len(scraped_details)}")
@@ -97,9 +160,14 @@ def build_county_caches_for_state(state_abbr, state_config):
         'total_counties': 0,
         'plans_with_details': 0,
         'plans_without_details': 0,
-        'total_plans': 0
+        'total_plans': 0,
+        'written_files': []
     }
 
+    # Deduplicated plan table: each plan's scraped details are stored once
+    # per state and county files only reference them by ID
+    plan_store = {}
+
     # Build cache for each county
     for county, county_specific in county_plans.items():
         stats['total_counties'] += 1
@@ -111,45 +179,67 @@ def build_county_caches_for_state(state_abbr, state_config):
 
         stats['total_plans'] += len(all_plans_for_county)
 
-        # Enrich with scraped details
-        enriched_plans = []
+        # Reference plans by ID, keeping only the CSV summary in the county file
+        county_plan_refs = []
         for plan in all_plans_for_county:
             plan_id = plan['contract_plan_segment_id']
+            has_details = plan_id in scraped_details
+
+            if plan_id not in plan_store:
+                plan_store[plan_id] = {
+                    'summary': plan,
+                    'details': scraped_details.get(plan_id),
+                    'has_scraped_details': has_details,
+                    'counties': []
+                }
+            plan_store[plan_id]['counties'].append(county)
 
-            # Start with CSV data
-            enriched_plan = {
-                'summary': plan,
-                'details': None,
-                'has_scraped_details': False
-            }
-
-            # Add scraped details if available
-            if plan_id in scraped_details:
-                enriched_plan['details'] = scraped_details[plan_id]
-                enriched_plan['has_scraped_details'] = True
+            if has_details:
                 stats['plans_with_details'] += 1
             else:
                 stats['plans_without_details'] += 1
 
-            enriched_plans.append(enriched_plan)
+            county_plan_refs.append({
+                'summary': plan,
+                'has_scraped_details': has_details
+            })
 
         # Save county cache
         county_cache = {
             'state': state_name,
             'state_abbr': state_abbr,
             'county': county,
-            'plan_count': len(enriched_plans),
+            'plan_count': len(county_plan_refs),
             'all_counties_plan_count': len(all_counties_plans),
             'county_specific_plan_count': len(county_specific),
-            'scraped_details_available': sum(1 for p in enriched_plans if p['has_scraped_details']),
-            'plans': enriched_plans
+            'scraped_details_available': sum(1 for p in county_plan_refs if p['has_scraped_details']),
+            'plan_store': 'plans.json',
+            'plans': county_plan_refs
         }
 
         output_file = output_dir / f'{county}.json'
-        with open(output_file, 'w') as f:
-            json.dump(county_cache, f, indent=2)
+        if write_json_atomic(output_file, county_cache, indent=2):
+            stats['written_files'].append(str(output_file))
+
+        print(f"  ✓ {county:30s}: {len(county_plan_refs):3d} plans ({county_cache['scraped_details_available']:3d} with details)")
 
-        print(f"  ✓ {county:30s}: {len(enriched_plans):3d} plans ({county_cache['scraped_details_available']:3d} with details)")
+    # Save the state plan table next to the counties directory
+    for plan in plan_store.values():
+        plan['counties'].sort()
+
+    plan_table = {
+        'state': state_name,
+        'state_abbr': state_abbr,
+        'plan_count': len(plan_store),
+        'plans': dict(sorted(plan_store.items()))
+    }
+
+    plan_table_file = output_dir.parent / 'plans.json'
+    # Compact - this file holds nearly all of the state's bytes
+    if write_json_atomic(plan_table_file, plan_table, separators=(',', ':')):
+        stats['written_files'].append(str(plan_table_file))
+
+    print(f"  ✓ Plan table: {len(plan_store)} plans ({plan_table_file.stat().st_size / 1024:.1f} KB)")
 
     # Summary for this state
     print(f"\n  Counties: {stats['total_counties']}")
@@ -159,14 +249,51 @@ def build_county_caches_for_state(state_abbr, state_config):
 
     coverage = (stats['plans_with_details'] / stats['total_plans'] * 100) if stats['total_plans'] > 0 else 0
     print(f"  Coverage: {coverage:.1f}%")
+    print(f"  Files written: {len(stats['written_files'])} (others unchanged)")
 
     return stats
 
-def main():
+def build_state_job(state_abbr, state_config, scraped_files):
+    """Process pool entry point: build one state and return its captured log"""
+    start = time.perf_counter()
+    log = io.StringIO()
+    with redirect_stdout(log):
+        stats = build_county_caches_for_state(state_abbr, state_config, scraped_files)
+    return state_abbr, stats, time.perf_counter() - start, log.getvalue()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build county cache files')
+    parser.add_argument('states', nargs='*', help='State abbreviations to build (default: %s)' % ' '.join(STATE_CONFIGS))
+    parser.add_argument('--all', action='store_true', help='Build every state/territory in the landscape CSV')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
     print("=" * 80)
     print("Building County Caches for All States")
     print("=" * 80)
 
+    # Parse the landscape once up front; this also refreshes its snapshot so
+    # workers (forked or spawned) load it without touching the CSV again
+    start = time.perf_counter()
+    load_landscape()
+    print(f"Landscape loaded in {time.perf_counter() - start:.2f}s")
+
+    configs = state_configs_from_landscape() if args.all or args.states else dict(STATE_CONFIGS)
+    if args.states:
+        wanted = [abbr.upper() for abbr in args.states]
+        unknown = [abbr for abbr in wanted if abbr not in configs]
+        if unknown:
+            parser.error(f"not in the landscape CSV: {', '.join(unknown)}")
+        configs = {abbr: configs[abbr] for abbr in wanted}
+
+    if args.all:
+        covered = US_50_STATES & {config['territory_name'] for config in configs.values()}
+        print(f"50 US States coverage: {len(covered)}/50 (+{len(configs) - len(covered)} territories)")
+
+    files_by_state = index_scraped_files()
+    workers = max(1, min(args.workers, len(configs)))
+    print(f"Building {len(configs)} states with {workers} worker(s)")
+
     overall_stats = {
         'states': 0,
         'counties': 0,
@@ -174,16 +301,39 @@ def main():
         'with_details': 0,
         'missing_details': 0
     }
+    timings = {}
+    overall_start = time.perf_counter()
 
-    # Build caches for each state
-    for state_abbr, config in STATE_CONFIGS.items():
-        stats = build_county_caches_for_state(state_abbr, config)
+    def record(state_abbr, stats, elapsed):
+        timings[state_abbr] = elapsed
         overall_stats['states'] += 1
         overall_stats['counties'] += stats['total_counties']
         overall_stats['plans'] += stats['total_plans']
         overall_stats['with_details'] += stats['plans_with_details']
         overall_stats['missing_details'] += stats['plans_without_details']
 
+    # Build caches for each state
+    if workers == 1:
+        for state_abbr, config in configs.items():
+            start = time.perf_counter()
+            stats = build_county_caches_for_state(state_abbr, config, files_by_state.get(config['name'], []))
+            record(state_abbr, stats, time.perf_counter() - start)
+            print(f"  ⏱ {state_abbr} built in {timings[state_abbr]:.2f}s")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=load_landscape) as executor:
+            futures = [
+                executor.submit(build_state_job, state_abbr, config, files_by_state.get(config['name'], []))
+                for state_abbr, config in configs.items()
+            ]
+            # Print each state's log in one block as it finishes
+            for future in as_completed(futures):
+                state_abbr, stats, elapsed, log = future.result()
+                print(log, end='')
+                record(state_abbr, stats, elapsed)
+                print(f"  ⏱ {state_abbr} built in {elapsed:.2f}s")
+
+    wall_time = time.perf_counter() - overall_start
+
     # Final summary
     print("\n" + "=" * 80)
     print("OVERALL SUMMARY")
@@ -196,6 +346,11 @@ def main():
 
     coverage = (overall_stats['with_details'] / overall_stats['plans'] * 100) if overall_stats['plans'] > 0 else 0
     print(f"Overall coverage: {coverage:.1f}%")
+
+    print("\nPer-state build time:")
+    for state_abbr, elapsed in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"  {state_abbr:4s} {elapsed:7.2f}s")
+    print(f"Wall time: {wall_time:.2f}s (sum of state times: {sum(timings.values()):.2f}s)")
     print("\n✓ County cache files ready for deployment!")
 
 if __name__ == "__main__":
@@ -4,10 +4,11 @@ Build ZIP to plans mapping for South Carolina.
 Maps each SC ZIP code to the list of plan IDs available in that ZIP.
 """
 import json
-import csv
 from pathlib import Path
 from collections import defaultdict
 
+from landscape import load_landscape
+
 # Files
 UNIFIED_ZIP_FILE = Path('./unified_zip_to_fips.json')
 CSV_PATH = Path('./downloaded_data/CY2026_Landscape_202511/CY2026_Landscape_202511.csv')
@@ -19,19 +20,13 @@ def load_fips_county_map():
     """Map FIPS codes to county names for South Carolina."""
     fips_to_county = {}
     
-    with open(CSV_PATH, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            state = row.get('State Territory Name', '')
-            if state != 'South Carolina':
-                continue
-            
-            county = row.get('County Name', '').strip()
-            # Note: CSV doesn't have FIPS directly, we'll use county name
-            if county:
-                # Create a simple mapping - in practice we'd need actual FIPS
-                # but for now we'll just use county names
-                fips_to_county[county] = county
+    for county in load_landscape(CSV_PATH).counties('South Carolina'):
+        county = (county or '').strip()  # None in a short CSV row
+        # Note: CSV doesn't have FIPS directly, we'll use county name
+        if county:
+            # Create a simple mapping - in practice we'd need actual FIPS
+            # but for now we'll just use county names
+            fips_to_county[county] = county
     
     return fips_to_county
 
@@ -40,18 +35,14 @@ def load_county_plans():
     """Map county names to plan IDs for South Carolina."""
     county_plans = defaultdict(set)
     
-    with open(CSV_PATH, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            state = row.get('State Territory Name', '')
-            if state != 'South Carolina':
-                continue
-            
-            county = row.get('County Name', '').strip()
-            plan_id = row.get('ContractPlanSegmentID', '').strip()
-            
-            if county and plan_id:
-                county_plans[county].add(plan_id)
+    table = load_landscape(CSV_PATH)
+    rows = table.row_indexes(state='South Carolina')
+    for county, plan_id in zip(table.column('County Name', rows), table.column('ContractPlanSegmentID', rows)):
+        county = (county or '').strip()  # Short CSV rows are padded with None
+        plan_id = (plan_id or '').strip()
+        
+        if county and plan_id:
+            county_plans[county].add(plan_id)
     
     return county_plans
 
@@ -5,38 +5,34 @@ For each ZIP code, returns all counties it could be in, with plans for each coun
 """
 
 import json
-import csv
 from pathlib import Path
 from collections import defaultdict
 
+from landscape import load_landscape
+
 def load_nh_plans_from_csv():
-    """Load all NH plans from the CSV, organized by county"""
+    """Load all NH plans from the shared landscape table, organized by county"""
     plans_by_county = defaultdict(list)
     all_counties_plans = []
 
-    csv_path = Path('CY2026_Landscape_202511/CY2026_Landscape_202511.csv')
-
-    with open(csv_path, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['State Territory Name'] == 'New Hampshire':
-                county = row['County Name']
-
-                plan_info = {
-                    'contract_plan_segment_id': row['ContractPlanSegmentID'],
-                    'plan_name': row['Plan Name'],
-                    'plan_type': row['Plan Type'],
-                    'organization': row['Organization Marketing Name'],
-                    'part_c_premium': row['Part C Premium'],
-                    'part_d_total_premium': row['Part D Total Premium'],
-                    'overall_star_rating': row['Overall Star Rating'],
-                    'county': county
-                }
+    for row in load_landscape().iter_rows(state='New Hampshire'):
+        county = row['County Name']
+
+        plan_info = {
+            'contract_plan_segment_id': row['ContractPlanSegmentID'],
+            'plan_name': row['Plan Name'],
+            'plan_type': row['Plan Type'],
+            'organization': row['Organization Marketing Name'],
+            'part_c_premium': row['Part C Premium'],
+            'part_d_total_premium': row['Part D Total Premium'],
+            'overall_star_rating': row['Overall Star Rating'],
+            'county': county
+        }
 
-                if county == 'All Counties':
-                    all_counties_plans.append(plan_info)
-                else:
-                    plans_by_county[county].append(plan_info)
+        if county == 'All Counties':
+            all_counties_plans.append(plan_info)
+        else:
+            plans_by_county[county].append(plan_info)
 
     return plans_by_county, all_counties_plans
 
@@ -39,6 +39,24 @@ async function getPlansForZip(state, zipCode, includeDetails = false) {
     }
 }
 
+/**
+ * Get plans for a ZIP code without knowing its state
+ * One round-trip: the response lists every state the ZIP belongs to, with
+ * each state's /{state}/{zip} response under `results`
+ * @param {string} zipCode - ZIP code
+ * @param {boolean} includeDetails - Include full plan details (default: false for faster response)
+ * @returns {Promise<Object>} {zip_code, multi_state, states, results}
+ */
+async function getPlansForZipAnyState(zipCode, includeDetails = false) {
+    const url = `${API_BASE_URL}/zip/${zipCode}${includeDetails ? '' : '?details=0'}`;
+
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`API Error: ${response.status} ${response.statusText}`);
+    }
+    return await response.json();
+}
+
 /**
  * Get details for a specific plan
  * @param {string} state - State abbreviation
@@ -274,10 +292,9 @@ function highlightZipCodesOnPage() {
             parent.title = `Click to find Medicare plans for ${zipCode}`;
 
             parent.addEventListener('click', async () => {
-                // Determine state (you'd need logic here based on page context or asking user)
-                const state = 'nh'; // Example
-                const data = await getPlansForZip(state, zipCode, false);
-                showTooltip(parent, data);
+                // No state needed - the API resolves every state the ZIP is in
+                const { results } = await getPlansForZipAnyState(zipCode, false);
+                showTooltip(parent, results[0]);
             });
         }
     });
@@ -311,6 +328,7 @@ function highlightZipCodesOnPage() {
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         getPlansForZip,
+        getPlansForZipAnyState,
         getPlanDetail,
         listStates,
         listCounties
@@ -0,0 +1,29 @@
+/**
+ * CloudFront Function (viewer request) - serve the precompressed sidecars
+ *
+ * The deploy uploads every static JSON file with a .br and .gz sidecar
+ * (Content-Encoding br / gzip, see precompress.py). S3 can't negotiate, so
+ * this rewrites /medicare/....json to the sidecar the viewer accepts. The
+ * cache policy must include the normalized Accept-Encoding (enable
+ * "Cache compressed objects: Brotli, Gzip"); CloudFront then forwards it as
+ * br, gzip or nothing, which is all this needs to look at.
+ *
+ * Every .json object must have both sidecars before this is attached: run
+ * `python precompress.py` (it refuses to run without brotli) and upload all
+ * of static_api/ once.
+ */
+function handler(event) {
+    var request = event.request;
+    var header = request.headers['accept-encoding'];
+    if (!request.uri.endsWith('.json') || !header) {
+        return request;
+    }
+
+    var accepted = header.value;
+    if (accepted.indexOf('br') !== -1) {
+        request.uri += '.br';
+    } else if (accepted.indexOf('gzip') !== -1) {
+        request.uri += '.gz';
+    }
+    return request;
+}
@@ -22,7 +22,11 @@ rm -rf lambda_package lambda_package.zip
 mkdir -p lambda_package
 
 # Copy Lambda function
-cp lambda_function.py lambda_package/
+cp lambda_function.py zip_index.py lambda_package/
+
+# Pack the ZIP -> county mappings into the binary index the function maps
+echo "  Building ZIP index..."
+python3 zip_index.py mock_api
 
 # Copy all state data
 echo "  Copying state data..."
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Hash-based delta deploy of static_api/ to S3 + CloudFront
+
+`aws s3 sync --size-only` misses a changed file whose size happens to match
+(a premium going from $10.00 to $12.00) and lists the whole bucket prefix on
+every run to find out what to compare. Instead, .deploy_manifest.json records
+the SHA-256 of every object this script uploaded, keyed by S3 key (the path
+under static_api/, e.g. medicare/zip/29401.json). A deploy:
+
+  1. hashes the build output - a file whose size and mtime match the manifest
+     reuses its recorded hash, so an unchanged tree costs a stat() per file
+  2. plans uploads (new or changed hash) and, with --delete, deletes (keys in
+     the manifest that are no longer built); nothing is listed in S3
+  3. uploads with bounded parallelism (--workers), each object with its
+     Content-Type, Content-Encoding (.br/.gz sidecars) and Cache-Control
+  4. invalidates exactly the keys that changed or were deleted in CloudFront;
+     new keys were never cached and are skipped. Over MAX_INVALIDATION_PATHS
+     the list collapses to the narrowest directory wildcards that fit. Keys
+     are kept in the manifest's pending_invalidation until an invalidation
+     succeeds, so a run whose invalidation failed (or was skipped with
+     --no-invalidate) has them invalidated by the next one
+
+The manifest is saved even when an upload fails, so a rerun only retries
+what did not make it. It belongs to one bucket: deploying to another starts
+from an empty manifest. Deleting the file forces a full upload; --seed
+records the current tree as deployed without uploading anything (for a
+bucket known to be in sync already).
+
+S3 is driven through the aws CLI like the other deploy scripts;
+--endpoint-url points it at an S3-compatible stub (MinIO, LocalStack) for
+testing, and deploy() takes any client with put/delete/invalidate methods.
+
+Usage:
+    python deploy_planner.py --dry-run                        # show the plan
+    python deploy_planner.py --delete                         # deploy everything that changed
+    python deploy_planner.py --include 'medicare/zip/29*' --include 'medicare/zip_minified/29*'
+    python deploy_planner.py --endpoint-url http://localhost:9000 --no-invalidate
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from precompress import BUILD_FILES, ENCODINGS
+
+BUCKET = 'purlpal-medicare-api'
+DISTRIBUTION_ID = 'E3SHXUEGZALG4E'
+STATIC_DIR = Path('./static_api')
+MANIFEST_PATH = Path('.deploy_manifest.json')
+
+# Bump when the manifest layout changes so the next run uploads everything
+MANIFEST_FORMAT = 1
+
+# CloudFront allows 3000 individual paths and 15 wildcards in progress at once
+MAX_INVALIDATION_PATHS = 1000
+MAX_INVALIDATION_WILDCARDS = 15
+
+DEFAULT_CACHE_CONTROL = 'max-age=3600'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Names that change whenever their content does: shared plan tables, versioned mappings
+IMMUTABLE_KEY_RE = re.compile(r'(.*/)?plans_[A-Z]{2}\.[0-9a-f]{16}\.json(\.br|\.gz)?|(.*/)?mappings/v\d+/.*')
+
+SUFFIX_ENCODINGS = {suffix: encoding for encoding, suffix in ENCODINGS.items()}
+
+
+def load_manifest(bucket, path=MANIFEST_PATH):
+    """({key: {'sha256', 'size', 'mtime_ns'}} last deployed to this bucket, keys still to invalidate)"""
+    try:
+        manifest = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}, []
+    if manifest.get('format') != MANIFEST_FORMAT or manifest.get('bucket') != bucket:
+        return {}, []
+    return manifest['objects'], manifest.get('pending_invalidation', [])
+
+
+def save_manifest(bucket, objects, path=MANIFEST_PATH, pending_invalidation=()):
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps({'format': MANIFEST_FORMAT, 'bucket': bucket,
+                                    'objects': dict(sorted(objects.items())),
+                                    'pending_invalidation': sorted(set(pending_invalidation))}, indent=1))
+    os.replace(tmp_path, path)
+
+
+def matches(key, include):
+    return not include or any(fnmatch.fnmatchcase(key, pattern) for pattern in include)
+
+
+def local_files(root, include=None):
+    """{key: path} of the deployable files under root (no build bookkeeping or temp files)"""
+    root = Path(root)
+    files = {}
+    for path in sorted(root.rglob('*')):
+        if not path.is_file() or path.name.startswith('.') or path.name in BUILD_FILES:
+            continue
+        key = path.relative_to(root).as_posix()
+        if matches(key, include):
+            files[key] = path
+    return files
+
+
+def hash_tree(files, previous):
+    """{key: {'sha256', 'size', 'mtime_ns'}}, reusing hashes of files whose size and mtime match"""
+    entries = {}
+    for key, path in files.items():
+        stat = path.stat()
+        old = previous.get(key)
+        if old and (old['size'], old['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            entries[key] = old
+        else:
+            entries[key] = {
+                'sha256': hashlib.sha256(path.read_bytes()).hexdigest(),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns
+            }
+    return entries
+
+
+def plan_deploy(current, deployed, include=None, delete=False):
+    """{'upload': [keys], 'delete': [keys], 'unchanged': count}
+
+    Only keys matching include are considered for deletion, so a deploy of
+    one state never deletes another's objects.
+    """
+    upload = sorted(key for key, entry in current.items()
+                    if deployed.get(key, {}).get('sha256') != entry['sha256'])
+    removed = sorted(key for key in deployed if key not in current and matches(key, include)) if delete else []
+    return {'upload': upload, 'delete': removed, 'unchanged': len(current) - len(upload)}
+
+
+def object_headers(key):
+    """Content-Type, Content-Encoding and Cache-Control of an object"""
+    base, suffix = os.path.splitext(key)
+    encoding = SUFFIX_ENCODINGS.get(suffix)
+    if encoding is None:
+        base = key
+    headers = {'content_type': mimetypes.guess_type(base)[0] or 'application/octet-stream'}
+    if encoding:
+        headers['content_encoding'] = encoding
+    headers['cache_control'] = IMMUTABLE_CACHE_CONTROL if IMMUTABLE_KEY_RE.fullmatch(key) else DEFAULT_CACHE_CONTROL
+    return headers
+
+
+def invalidation_paths(keys, max_paths=MAX_INVALIDATION_PATHS, max_wildcards=MAX_INVALIDATION_WILDCARDS):
+    """CloudFront paths for these keys: each key, or directory wildcards if there are too many"""
+    paths = sorted(f'/{key}' for key in keys)
+    if len(paths) <= max_paths:
+        return paths
+    parts = [key.split('/') for key in keys]
+    for depth in range(max(len(p) for p in parts) - 1, 0, -1):
+        directories = sorted({'/'.join(p[:min(depth, len(p) - 1)]) for p in parts})
+        if '' in directories:
+            break  # A top-level key: /* covers everything else
+        # A wildcard on a directory covers its subdirectories
+        directories = [d for d in directories if not any(d.startswith(f'{o}/') for o in directories)]
+        if len(directories) <= max_wildcards:
+            return [f'/{d}/*' for d in directories]
+    return ['/*']
+
+
+class AwsCli:
+    """S3 uploads and CloudFront invalidations through the aws CLI"""
+
+    def __init__(self, bucket, distribution_id=None, endpoint_url=None):
+        self.bucket = bucket
+        self.distribution_id = distribution_id
+        self.endpoint = ['--endpoint-url', endpoint_url] if endpoint_url else []
+
+    def _run(self, cmd):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"{' '.join(cmd[:3])} failed")
+        return result.stdout
+
+    def put(self, path, key, content_type, cache_control, content_encoding=None):
+        cmd = ['aws', 's3', 'cp', str(path), f's3://{self.bucket}/{key}', *self.endpoint,
+               '--content-type', content_type, '--cache-control', cache_control, '--quiet']
+        if content_encoding:
+            cmd += ['--content-encoding', content_encoding]
+        self._run(cmd)
+
+    def delete(self, key):
+        self._run(['aws', 's3', 'rm', f's3://{self.bucket}/{key}', *self.endpoint, '--quiet'])
+
+    def invalidate(self, paths):
+        """Invalidation ID"""
+        return self._run(['aws', 'cloudfront', 'create-invalidation', '--distribution-id', self.distribution_id,
+                          '--paths', *paths, '--query', 'Invalidation.Id', '--output', 'text']).strip()
+
+
+def deploy(client, root=STATIC_DIR, bucket=BUCKET, manifest_path=MANIFEST_PATH, include=None,
+           delete=False, workers=16, dry_run=False, invalidate=True, seed=False):
+    """Upload what changed since the last deploy; returns the plan with what was done
+
+    client needs put(path, key, **object_headers(key)), delete(key) and
+    invalidate(paths) -> id (only called when invalidate is set).
+    """
+    deployed, pending = load_manifest(bucket, manifest_path)
+    files = local_files(root, include)
+    current = hash_tree(files, deployed)
+    plan = plan_deploy(current, deployed, include, delete)
+    plan.update({'uploaded': [], 'deleted': [], 'failed': {}, 'invalidation': [], 'invalidation_id': None})
+    if dry_run:
+        plan['invalidation'] = invalidation_paths(
+            sorted(set(pending + [k for k in plan['upload'] if k in deployed] + plan['delete'])))
+        return plan
+
+    objects = dict(deployed)
+    if seed:
+        objects.update(current)
+        save_manifest(bucket, objects, manifest_path, pending)
+        return plan
+
+    def upload(key):
+        client.put(files[key], key, **object_headers(key))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(upload, key): key for key in plan['upload']}
+            futures.update({executor.submit(client.delete, key): key for key in plan['delete']})
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    plan['failed'][key] = str(e)
+                    continue
+                if key in current:
+                    objects[key] = current[key]
+                    plan['uploaded'].append(key)
+                else:
+                    objects.pop(key, None)
+                    plan['deleted'].append(key)
+    finally:
+        # Keep what made it even if interrupted: the rerun retries only the rest,
+        # and invalidates what this run replaced in case it never gets to
+        stale = sorted(set(pending + [key for key in plan['uploaded'] if key in deployed] + plan['deleted']))
+        save_manifest(bucket, objects, manifest_path, stale)
+
+    plan['uploaded'].sort()
+    plan['deleted'].sort()
+    plan['invalidation'] = invalidation_paths(stale)
+    if invalidate and plan['invalidation']:
+        try:
+            plan['invalidation_id'] = client.invalidate(plan['invalidation'])
+        except Exception as e:  # The keys stay pending in the manifest for the next run
+            plan['failed']['CloudFront invalidation'] = f"{e} (paths: {' '.join(plan['invalidation'])})"
+        else:
+            save_manifest(bucket, objects, manifest_path)
+    return plan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Upload only the static API files whose content changed')
+    parser.add_argument('--root', default=str(STATIC_DIR), help='Build output directory (default: static_api)')
+    parser.add_argument('--bucket', default=BUCKET)
+    parser.add_argument('--distribution-id', default=DISTRIBUTION_ID)
+    parser.add_argument('--endpoint-url', help='S3-compatible endpoint (e.g. a local MinIO) instead of AWS')
+    parser.add_argument('--manifest', default=str(MANIFEST_PATH))
+    parser.add_argument('--include', action='append', help='Only keys matching this glob (repeatable)')
+    parser.add_argument('--delete', action='store_true', help='Delete deployed keys that are no longer built')
+    parser.add_argument('--workers', type=int, default=16, help='Parallel uploads (default: 16)')
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without uploading')
+    parser.add_argument('--no-invalidate', action='store_true', help='Skip the CloudFront invalidation')
+    parser.add_argument('--seed', action='store_true',
+                        help='Record the current tree as deployed without uploading (bucket already in sync)')
+    args = parser.parse_args(argv)
+
+    client = AwsCli(args.bucket, args.distribution_id, args.endpoint_url)
+    start = time.perf_counter()
+    plan = deploy(client, Path(args.root), args.bucket, Path(args.manifest), args.include, args.delete,
+                  args.workers, args.dry_run, not args.no_invalidate, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(plan['upload'])} to upload, {len(plan['delete'])} to delete, {plan['unchanged']} unchanged")
+    if args.dry_run:
+        for key in plan['upload']:
+            print(f"  upload {key}")
+        for key in plan['delete']:
+            print(f"  delete {key}")
+        print(f"Invalidation: {len(plan['invalidation'])} paths")
+        return 0
+    if args.seed:
+        print(f"  ✓ Recorded {len(plan['upload'])} objects as deployed in {args.manifest}")
+        return 0
+
+    print(f"  ✓ Uploaded {len(plan['uploaded'])}, deleted {len(plan['deleted'])} in {elapsed:.1f}s")
+    for key, error in sorted(plan['failed'].items()):
+        print(f"  ✗ {key}: {error}")
+    if plan['invalidation_id']:
+        print(f"  ✓ Invalidated {len(plan['invalidation'])} paths: {plan['invalidation_id']}")
+    elif plan['invalidation']:
+        print(f"  Invalidation skipped ({len(plan['invalidation'])} paths, kept pending in {args.manifest})")
+    return 1 if plan['failed'] else 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 """
 Deploy South Carolina Medicare API to production.
-Uploads all 525 SC ZIP files and minified versions to S3 + CloudFront.
+Uploads the SC ZIP files and minified versions that changed since the last
+deploy to S3 + CloudFront, each with its precompressed .br/.gz sidecars
+(Content-Encoding br / gzip), through deploy_planner.py.
 """
-import subprocess
+import os
 import json
 from pathlib import Path
 from datetime import datetime
 
+from deploy_planner import AwsCli, deploy
+from precompress import precompress
+
 BUCKET = "purlpal-medicare-api"
 DISTRIBUTION_ID = "E3SHXUEGZALG4E"
 BASE_PATH = "medicare"
+# Regular and minified SC ZIP files with their .br/.gz sidecars, as keys under static_api/
+SC_PATTERNS = [f'{BASE_PATH}/zip/29*', f'{BASE_PATH}/zip_minified/29*']
 
 def get_sc_zips():
     """Get list of all SC ZIP codes."""
@@ -18,111 +25,28 @@ def get_sc_zips():
         all_zips = json.load(f)
     return [z for z, info in all_zips.items() if 'SC' in info.get('states', [])]
 
-def deploy_regular_files(sc_zips):
-    """Deploy regular ZIP files."""
+def deploy_files():
+    """Upload the SC files (and sidecars) whose content changed and invalidate exactly those paths."""
     print("\n" + "="*80)
-    print("DEPLOYING REGULAR ZIP FILES")
+    print("DEPLOYING SC FILES")
     print("="*80)
     
-    # Use AWS CLI sync for efficiency
-    print(f"\nUploading {len(sc_zips)} SC ZIP files...")
-    
-    cmd = [
-        'aws', 's3', 'sync',
-        'static_api/medicare/zip/',
-        f's3://{BUCKET}/{BASE_PATH}/zip/',
-        '--exclude', '*',
-        '--include', '29*.json',
-        '--content-type', 'application/json',
-        '--size-only'
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        print("✓ Regular files uploaded successfully")
-        if result.stdout:
-            print(result.stdout)
-    else:
-        print("✗ Error uploading regular files")
-        print(result.stderr)
-        return False
-    
-    return True
-
-def deploy_minified_files():
-    """Deploy minified ZIP files."""
-    print("\n" + "="*80)
-    print("DEPLOYING MINIFIED ZIP FILES")
-    print("="*80)
+    # Content hashes in .deploy_manifest.json, not sizes: same-size edits are uploaded too
+    client = AwsCli(BUCKET, DISTRIBUTION_ID)
+    plan = deploy(client, root=Path('static_api'), bucket=BUCKET, include=SC_PATTERNS, workers=16)
     
-    minified_dir = Path('static_api/medicare/zip_minified')
-    if not minified_dir.exists():
-        print("⚠ No minified directory found, skipping")
-        return True
-    
-    # Count SC minified files
-    sc_minified = list(minified_dir.glob('29*.json'))
-    print(f"\nUploading {len(sc_minified)} minified files...")
-    
-    cmd = [
-        'aws', 's3', 'sync',
-        'static_api/medicare/zip_minified/',
-        f's3://{BUCKET}/{BASE_PATH}/zip_minified/',
-        '--exclude', '*',
-        '--include', '29*.json',
-        '--content-type', 'application/json',
-        '--size-only'
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        print("✓ Minified files uploaded successfully")
-        if result.stdout:
-            print(result.stdout)
-    else:
-        print("⚠ Error uploading minified files (non-critical)")
-        print(result.stderr)
-    
-    return True
-
-def invalidate_cloudfront():
-    """Invalidate CloudFront cache."""
-    print("\n" + "="*80)
-    print("INVALIDATING CLOUDFRONT CACHE")
-    print("="*80)
+    print(f"\n{len(plan['upload'])} changed, {plan['unchanged']} unchanged")
+    print(f"✓ Uploaded {len(plan['uploaded'])} files")
+    for key, error in sorted(plan['failed'].items()):
+        print(f"✗ {key}: {error}")
+    
+    if plan['invalidation_id']:
+        print(f"✓ CloudFront invalidation created for {len(plan['invalidation'])} paths")
+        print(f"  Invalidation ID: {plan['invalidation_id']}")
+    elif not plan['invalidation']:
+        print("✓ Nothing cached needed invalidating")
     
-    # Invalidate SC ZIPs with wildcard
-    paths = [
-        f'/{BASE_PATH}/zip/29*.json',
-        f'/{BASE_PATH}/zip_minified/29*.json'
-    ]
-    
-    print(f"\nInvalidating paths:")
-    for p in paths:
-        print(f"  - {p}")
-    
-    cmd = [
-        'aws', 'cloudfront', 'create-invalidation',
-        '--distribution-id', DISTRIBUTION_ID,
-        '--paths', *paths
-    ]
-    
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        print("✓ CloudFront invalidation created")
-        data = json.loads(result.stdout)
-        inv_id = data['Invalidation']['Id']
-        print(f"  Invalidation ID: {inv_id}")
-        print(f"  Status: {data['Invalidation']['Status']}")
-    else:
-        print("✗ Error creating invalidation")
-        print(result.stderr)
-        return False
-    
-    return True
+    return not plan['failed']
 
 def verify_deployment(sample_zips):
     """Verify a sample of deployed files."""
@@ -172,15 +96,22 @@ def main():
     print(f"Destination: s3://{BUCKET}/{BASE_PATH}/")
     print(f"CDN: https://medicare.purlpal-api.com/{BASE_PATH}/")
     
-    # Deploy
-    if not deploy_regular_files(sc_zips):
-        print("\n✗ Deployment failed!")
+    # Precompress at max levels once here, instead of by the CDN per request
+    sc_files = [zip_dir / f'{z}.json' for z in sc_zips if (zip_dir / f'{z}.json').exists()]
+    sc_files += sorted(Path('static_api/medicare/zip_minified').glob('29*.json'))
+    try:
+        totals = precompress(sc_files, workers=os.cpu_count())
+    except RuntimeError as e:
+        print(f"\n✗ {e}")
         return 1
+    print(f"Precompressed {totals['files']} files: gzip {totals['gzip']/1024/1024:.1f} MB"
+          + (f", br {totals['br']/1024/1024:.1f} MB" if totals['br'] else '')
+          + f" ({len(totals['changed'])} sidecars updated)")
     
-    deploy_minified_files()
-    
-    if not invalidate_cloudfront():
-        print("\n⚠ Cache invalidation failed, but files are deployed")
+    # Deploy
+    if not deploy_files():
+        print("\n✗ Deployment failed - rerun to retry the failed files")
+        return 1
     
     # Verify sample
     sample_zips = ['29401', '29002', '29577', '29803', '29928']
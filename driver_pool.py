@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Reusable pool of long-lived Selenium drivers, one per worker thread.
+
+Starting Chrome costs seconds, far more than loading one plan page, so the
+scrapers keep each worker's driver alive across pages instead of creating
+and quitting one per plan. A driver is recycled after max_pages pages or
+when its Chrome process tree grows past max_memory_mb (needs psutil; the
+memory check is skipped without it), is health-checked before every page,
+and is replaced transparently if it has crashed.
+
+Usage:
+    pool = DriverPool(lambda worker_id: create_driver(USER_AGENTS[worker_id % len(USER_AGENTS)]),
+                      max_pages=50, max_memory_mb=1500)
+
+    html = pool.run(lambda driver: load_page(driver, url))   # retries once on a crashed driver
+    ...
+    pool.close()
+"""
+
+import itertools
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is optional
+    psutil = None
+
+
+def chrome_memory_mb(driver):
+    """RSS of chromedriver and every Chrome process it started, in MB"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+    except (AttributeError, psutil.Error):
+        return None
+
+
+def is_alive(driver):
+    """Cheap round trip to the browser; False if the session or Chrome is gone"""
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception:
+        return False
+
+
+class PooledDriver:
+    """A driver plus the bookkeeping needed to decide when to recycle it"""
+
+    def __init__(self, driver, worker_id):
+        self.driver = driver
+        self.worker_id = worker_id
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """One long-lived driver per worker thread, recycled and restarted as needed"""
+
+    def __init__(self, create_driver, max_pages=50, max_memory_mb=None, memory_usage=chrome_memory_mb):
+        self.create_driver = create_driver  # worker_id -> driver
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.memory_usage = memory_usage
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._worker_ids = itertools.count()
+        self._active = set()
+
+        self.stats = {
+            'created': 0,
+            'pages': 0,
+            'recycled_pages': 0,
+            'recycled_memory': 0,
+            'restarted_crashed': 0
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _discard(self, pooled):
+        """Quit a driver and forget it"""
+        with self._lock:
+            self._active.discard(pooled)
+        if getattr(self._local, 'pooled', None) is pooled:
+            self._local.pooled = None
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def get(self):
+        """This thread's driver: created on first use, replaced if it has died"""
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is not None and not is_alive(pooled.driver):
+            self._discard(pooled)
+            self._count('restarted_crashed')
+            pooled = None
+
+        if pooled is None:
+            if not hasattr(self._local, 'worker_id'):
+                self._local.worker_id = next(self._worker_ids)
+            pooled = PooledDriver(self.create_driver(self._local.worker_id), self._local.worker_id)
+            self._local.pooled = pooled
+            with self._lock:
+                self._active.add(pooled)
+            self._count('created')
+        return pooled.driver
+
+    def release(self):
+        """Count a finished page and recycle the driver if it is due"""
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is None:
+            return
+        pooled.pages += 1
+        self._count('pages')
+
+        if self.max_pages and pooled.pages >= self.max_pages:
+            self._discard(pooled)
+            self._count('recycled_pages')
+        elif self.max_memory_mb:
+            memory = self.memory_usage(pooled.driver)
+            if memory is not None and memory > self.max_memory_mb:
+                self._discard(pooled)
+                self._count('recycled_memory')
+
+    def run(self, fn, retries=1):
+        """Call fn(driver) with this thread's driver
+
+        If fn fails because the browser crashed, the driver is replaced and fn
+        is retried (up to `retries` times). Other errors, such as page load
+        timeouts, are raised as usual and the driver is kept.
+        """
+        for attempt in itertools.count():
+            driver = self.get()
+            try:
+                result = fn(driver)
+            except Exception:
+                if is_alive(driver):
+                    self.release()
+                    raise
+                self._discard(self._local.pooled)
+                self._count('restarted_crashed')
+                if attempt >= retries:
+                    raise
+                continue
+            self.release()
+            return result
+
+    def close(self):
+        """Quit every driver the pool started"""
+        with self._lock:
+            active = list(self._active)
+        for pooled in active:
+            self._discard(pooled)
+
+    def summary(self):
+        """One line of pool statistics for the scraper's final report"""
+        s = self.stats
+        return (f"Drivers started: {s['created']} for {s['pages']} pages "
+                f"(recycled: {s['recycled_pages']} by page count, {s['recycled_memory']} by memory; "
+                f"crashed and restarted: {s['restarted_crashed']})")
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
-import csv
 import json
 import os
 from collections import defaultdict
 
+from landscape import load_landscape
+
 input_file = './CY2026_Landscape_202511/CY2026_Landscape_202511.csv'
 output_dir = './state_data'
 
@@ -13,45 +14,42 @@ os.makedirs(output_dir, exist_ok=True)
 # Read the CSV and organize by state
 state_plans = defaultdict(dict)
 
-with open(input_file, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-
-    for row in reader:
-        state = row['State Territory Name']
-        contract_plan_segment_id = row['ContractPlanSegmentID']
-        county = row['County Name']
+for row in load_landscape(input_file).iter_rows():
+    state = row['State Territory Name']
+    contract_plan_segment_id = row['ContractPlanSegmentID']
+    county = row['County Name']
 
-        # If we haven't seen this ContractPlanSegmentID for this state, add it
-        if contract_plan_segment_id not in state_plans[state]:
-            # Generate URL by replacing underscore with dash
-            # Format: 2026-H5521-296-0 from H5521_296_0
-            url_path = contract_plan_segment_id.replace('_', '-')
-            url = f"https://www.medicare.gov/plan-compare/#/plan-details/2026-{url_path}?year=2026&lang=en"
+    # If we haven't seen this ContractPlanSegmentID for this state, add it
+    if contract_plan_segment_id not in state_plans[state]:
+        # Generate URL by replacing underscore with dash
+        # Format: 2026-H5521-296-0 from H5521_296_0
+        url_path = contract_plan_segment_id.replace('_', '-')
+        url = f"https://www.medicare.gov/plan-compare/#/plan-details/2026-{url_path}?year=2026&lang=en"
 
-            # Check if this plan is marked as "All Counties"
-            all_counties = (county == "All Counties")
+        # Check if this plan is marked as "All Counties"
+        all_counties = (county == "All Counties")
 
-            state_plans[state][contract_plan_segment_id] = {
-                "State": row['State Territory Name'],
-                "State Territory Abbreviation": row['State Territory Abbreviation'],
-                "Contract Category Type": row['Contract Category Type'],
-                "ContractPlanSegmentID": contract_plan_segment_id,
-                "ContractPlanID": row['ContractPlanID'],
-                "Segment ID": row['Segment ID'],
-                "Parent Organization Name": row['Parent Organization Name'],
-                "Contract Name": row['Contract Name'],
-                "Organization Marketing Name": row['Organization Marketing Name'],
-                "Organization Type": row['Organization Type'],
-                "Plan Name": row['Plan Name'],
-                "Plan Type": row['Plan Type'],
-                "In-Network Maximum Out-of-Pocket (MOOP) Amount": row['In-Network Maximum Out-of-Pocket (MOOP) Amount'],
-                "all_counties": all_counties,
-                "url": url
-            }
-        else:
-            # If we've seen this plan before, update all_counties if we find it marked as such
-            if county == "All Counties":
-                state_plans[state][contract_plan_segment_id]["all_counties"] = True
+        state_plans[state][contract_plan_segment_id] = {
+            "State": row['State Territory Name'],
+            "State Territory Abbreviation": row['State Territory Abbreviation'],
+            "Contract Category Type": row['Contract Category Type'],
+            "ContractPlanSegmentID": contract_plan_segment_id,
+            "ContractPlanID": row['ContractPlanID'],
+            "Segment ID": row['Segment ID'],
+            "Parent Organization Name": row['Parent Organization Name'],
+            "Contract Name": row['Contract Name'],
+            "Organization Marketing Name": row['Organization Marketing Name'],
+            "Organization Type": row['Organization Type'],
+            "Plan Name": row['Plan Name'],
+            "Plan Type": row['Plan Type'],
+            "In-Network Maximum Out-of-Pocket (MOOP) Amount": row['In-Network Maximum Out-of-Pocket (MOOP) Amount'],
+            "all_counties": all_counties,
+            "url": url
+        }
+    else:
+        # If we've seen this plan before, update all_counties if we find it marked as such
+        if county == "All Counties":
+            state_plans[state][contract_plan_segment_id]["all_counties"] = True
 
 # Write one JSON file per state
 for state, plans in sorted(state_plans.items()):
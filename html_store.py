@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, compressed store for scraped plan pages
+
+Scrapers used to write every rendered page uncompressed to
+scraped_html_all/<State>-<id>.html, and retries and stealth re-runs rewrote
+the same bytes over and over. HtmlStore keeps each distinct page once:
+
+- blobs/<ab>/<sha256>.html.zst - the page compressed with zstd (or .html.gz
+  when the zstandard package is not installed), named by the SHA-256 of the
+  uncompressed HTML. A page identical to one already stored costs no write.
+- index.jsonl - one line per scrape, {'name', 'plan_id', 'state', 'time',
+  'sha256', 'blob', 'size', 'stored_size'}, appended like the progress
+  journal. The newest line for a name is that page's current version; older
+  lines are its history. Every append holds an exclusive flock on the index,
+  so the scrapers and an import can share a store; it first cuts a torn last
+  line left by a crash. The index is fsynced every `fsync_every` appends or
+  `fsync_interval` seconds and on close().
+
+reprocess_html.py streams pages out of the store, and can skip unchanged
+pages from the index alone, since the hash is the blob's name.
+
+Usage:
+    store = HtmlStore()
+    store.put('Alaska-H0001_001_0', html)
+    html = store.get('Alaska-H0001_001_0')
+
+Import an existing scraped_html_all/ (file mtimes become scrape times):
+    python html_store.py --import scraped_html_all [--delete]
+"""
+
+import argparse
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # Fall back to gzip; zstd blobs then need zstandard to read
+    zstandard = None
+
+store_dir = Path('./html_store')
+
+ZSTD_LEVEL = 12
+GZIP_LEVEL = 6
+
+
+def compress(data):
+    """(compressed bytes, blob suffix) with the best codec available"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), '.html.zst'
+    return gzip.compress(data, GZIP_LEVEL, mtime=0), '.html.gz'
+
+
+def decompress(data, blob):
+    if blob.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f'{blob} is zstd-compressed: pip install zstandard')
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def read_blob(root, entry):
+    """HTML of an index entry; a plain function so worker processes can call it"""
+    blob_path = Path(root) / entry['blob']
+    return decompress(blob_path.read_bytes(), entry['blob']).decode('utf-8')
+
+
+class HtmlStore:
+    """Scraped pages by name, deduplicated by content hash and compressed"""
+
+    def __init__(self, root=store_dir, fsync_every=32, fsync_interval=2.0):
+        self.root = Path(root)
+        self.index_path = self.root / 'index.jsonl'
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._latest = None  # name -> newest index entry, loaded on first use
+        self._index_fd = None  # Opened on the first put
+        self._pending = 0
+        self._synced_at = time.monotonic()
+
+    def _find_blob(self, sha256):
+        """Relative path of the stored blob for a hash, with any codec"""
+        for suffix in ('.html.zst', '.html.gz'):
+            blob = f'blobs/{sha256[:2]}/{sha256}{suffix}'
+            if (self.root / blob).exists():
+                return blob
+        return None
+
+    def _trim_torn_tail(self, fd):
+        """Cut a torn last line (a crash mid-append) so the next entry starts on a line of its own"""
+        size = os.fstat(fd).st_size
+        if not size or os.pread(fd, 1, size - 1) == b'\n':
+            return
+        # Find the last newline, reading backwards in blocks
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            newline = os.pread(fd, end - start, start).rfind(b'\n')
+            if newline >= 0:
+                os.ftruncate(fd, start + newline + 1)
+                return
+            end = start
+        os.ftruncate(fd, 0)
+
+    def _append(self, line):
+        """Append one index line under an exclusive lock shared with other processes (self._lock held)"""
+        if self._index_fd is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._index_fd = os.open(self.index_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        fcntl.flock(self._index_fd, fcntl.LOCK_EX)
+        try:
+            self._trim_torn_tail(self._index_fd)
+            os.write(self._index_fd, line)  # One write, so a line is never split between writers
+        finally:
+            fcntl.flock(self._index_fd, fcntl.LOCK_UN)
+        self._pending += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self):
+        os.fsync(self._index_fd)
+        self._pending = 0
+        self._synced_at = time.monotonic()
+
+    def close(self):
+        """fsync the index appends of this store and close it"""
+        with self._lock:
+            if self._index_fd is not None:
+                if self._pending:
+                    self._sync()
+                os.close(self._index_fd)
+                self._index_fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def put(self, name, html, scraped_at=None):
+        """Store one scraped page; returns its index entry ('new' tells whether a blob was written)"""
+        data = html.encode('utf-8') if isinstance(html, str) else html
+        sha256 = hashlib.sha256(data).hexdigest()
+        state, _, plan_id = name.rpartition('-')
+
+        blob = self._find_blob(sha256)
+        new = blob is None
+        if new:
+            compressed, suffix = compress(data)
+            blob = f'blobs/{sha256[:2]}/{sha256}{suffix}'
+            blob_path = self.root / blob
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = blob_path.with_name(f'.{blob_path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp_path.write_bytes(compressed)
+            os.replace(tmp_path, blob_path)
+            stored_size = len(compressed)
+        else:
+            stored_size = (self.root / blob).stat().st_size
+
+        entry = {
+            'name': name,
+            'plan_id': plan_id,
+            'state': state,
+            'time': round(scraped_at if scraped_at is not None else time.time(), 3),
+            'sha256': sha256,
+            'blob': blob,
+            'size': len(data),
+            'stored_size': stored_size
+        }
+        with self._lock:
+            self._append((json.dumps(entry) + '\n').encode('utf-8'))
+            if self._latest is not None and entry['time'] >= self._latest.get(name, {'time': 0})['time']:
+                self._latest[name] = entry
+        return dict(entry, new=new)
+
+    def entries(self):
+        """Every index entry, oldest first (a torn last line from a crash is skipped)"""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def latest(self):
+        """{name: newest index entry}"""
+        with self._lock:
+            if self._latest is None:
+                latest = {}
+                for entry in self.entries():
+                    if entry['time'] >= latest.get(entry['name'], {'time': 0})['time']:
+                        latest[entry['name']] = entry
+                self._latest = latest
+            return dict(self._latest)
+
+    def history(self, name):
+        """Index entries of one page, oldest first"""
+        return sorted((e for e in self.entries() if e['name'] == name), key=lambda e: e['time'])
+
+    def get(self, name):
+        """Newest HTML stored for a page, or None"""
+        entry = self.latest().get(name)
+        return read_blob(self.root, entry) if entry else None
+
+    def iter_pages(self, names=None):
+        """Yield (entry, html) for the newest version of each page (or of the given names)"""
+        latest = self.latest()
+        for name in sorted(latest if names is None else names):
+            if name in latest:
+                yield latest[name], read_blob(self.root, latest[name])
+
+    def stats(self):
+        """Sizes for a report: pages, scrapes, blobs, bytes as scraped and bytes on disk"""
+        latest = self.latest()
+        scrapes = raw_bytes = 0
+        blobs = {}
+        for entry in self.entries():
+            scrapes += 1
+            raw_bytes += entry['size']
+            blobs[entry['sha256']] = entry['stored_size']
+        return {
+            'pages': len(latest),
+            'scrapes': scrapes,
+            'blobs': len(blobs),
+            'scraped_bytes': raw_bytes,
+            'stored_bytes': sum(blobs.values())
+        }
+
+
+def import_directory(store, html_dir, delete=False):
+    """Move an existing directory of <State>-<id>.html pages into the store"""
+    counts = {'pages': 0, 'new_blobs': 0, 'bytes': 0}
+    for html_file in sorted(Path(html_dir).glob('*.html')):
+        entry = store.put(html_file.stem, html_file.read_bytes(), scraped_at=html_file.stat().st_mtime)
+        counts['pages'] += 1
+        counts['new_blobs'] += entry['new']
+        counts['bytes'] += entry['size']
+        if delete:
+            html_file.unlink()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Content-addressed store for scraped plan pages')
+    parser.add_argument('--store', default=str(store_dir), help='Store directory (default: html_store)')
+    parser.add_argument('--import', dest='import_dir', metavar='DIR', help='Import DIR/*.html into the store')
+    parser.add_argument('--delete', action='store_true', help='Delete imported files')
+    args = parser.parse_args(argv)
+
+    store = HtmlStore(args.store)
+    start = time.perf_counter()
+    if args.import_dir:
+        with store:
+            counts = import_directory(store, args.import_dir, args.delete)
+        print(f"Imported {counts['pages']} pages ({counts['bytes'] / 1024 / 1024:.1f} MB) from {args.import_dir}/ "
+              f"in {time.perf_counter() - start:.1f}s: {counts['new_blobs']} new blobs")
+
+    stats = store.stats()
+    ratio = stats['scraped_bytes'] / stats['stored_bytes'] if stats['stored_bytes'] else 0
+    print(f"HTML store {store.root}/ ({'zstd' if zstandard else 'gzip'}): {stats['pages']} pages, "
+          f"{stats['scrapes']} scrapes, {stats['blobs']} distinct blobs")
+    print(f"  Scraped: {stats['scraped_bytes'] / 1024 / 1024:.1f} MB, on disk: "
+          f"{stats['stored_bytes'] / 1024 / 1024:.1f} MB ({ratio:.1f}x smaller)")
+    return stats
+
+
+if __name__ == '__main__':
+    main()
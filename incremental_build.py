@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Incremental rebuild driven by a content-hash build manifest
+
+.build_manifest.json records a SHA-256 for every scraped plan JSON, every
+landscape row group (the CSV rows of one state/county) and every static ZIP
+file. Each run recomputes the hashes - files whose size and mtime match the
+manifest reuse their recorded hash - and compares them:
+
+  - a changed scraped plan or landscape group rebuilds that state's county
+    caches; only the changed plan JSONs are re-read, the other plans' details
+    come from the state's existing plans.json
+  - a changed ZIP file in static_api/medicare/zip is re-minified on its own;
+    when a zip_shared/ layout exists, every ZIP of its primary state is
+    re-minified into it so the state's plan table covers them all, and the
+    dictionary the files are stamped with is published to mappings/v<N>/
+  - every static file written gets fresh .br/.gz sidecars (precompress.py)
+
+Only outputs whose content actually changed are written, and their paths are
+listed in .changed_files.txt for the deploy step (incremental_update.sh).
+
+Usage:
+    python incremental_build.py              # AK, NH, VT, WY
+    python incremental_build.py NH           # selected states
+    python incremental_build.py --all        # every state in the landscape CSV
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from build_all_county_caches import (
+    STATE_CONFIGS, build_county_caches_for_state, index_scraped_files,
+    load_scraped_plan_details, state_configs_from_landscape, write_json_atomic
+)
+from landscape import load_landscape
+from precompress import precompress
+
+MANIFEST_PATH = Path('.build_manifest.json')
+CHANGED_FILES_PATH = Path('.changed_files.txt')
+
+# Bump when the manifest layout changes so the next run rebuilds everything
+MANIFEST_FORMAT = 1
+
+ZIP_DIR = Path('static_api/medicare/zip')
+MINIFIED_DIR = Path('static_api/medicare/zip_minified')
+SHARED_DIR = Path('static_api/medicare/zip_shared')
+ZIP_FILE_RE = re.compile(r'\d{5}\.json')
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Previous build manifest, or an empty one if missing or outdated"""
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {'scraped': {}, 'landscape': {}, 'zip': {}}
+    if manifest.get('format') != MANIFEST_FORMAT:
+        return {'scraped': {}, 'landscape': {}, 'zip': {}}
+    return manifest
+
+
+def hash_files(paths, previous):
+    """{file name: {'size', 'mtime_ns', 'sha256'}}, reusing hashes of unchanged files"""
+    entries = {}
+    for path in paths:
+        stat = path.stat()
+        old = previous.get(path.name)
+        if old and (old['size'], old['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            entries[path.name] = old
+        else:
+            entries[path.name] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': hashlib.sha256(path.read_bytes()).hexdigest()
+            }
+    return entries
+
+
+def hash_landscape_groups(table, states):
+    """{state: {county: sha256 of that county's CSV rows}}"""
+    columns = list(table.columns.values())
+    groups = defaultdict(dict)
+    for (state, county), rows in table.by_county.items():
+        if state not in states:
+            continue
+        digest = hashlib.sha256()
+        for i in rows:
+            # Cells missing from a short row are None (landscape.parse_csv)
+            digest.update('\x1f'.join('' if values[i] is None else values[i] for values in columns).encode())
+            digest.update(b'\x1e')
+        groups[state][county] = digest.hexdigest()
+    return dict(groups)
+
+
+def changed_names(old, new):
+    """File names added, removed or whose content hash differs"""
+    return {
+        name for name in old.keys() | new.keys()
+        if old.get(name, {}).get('sha256') != new.get(name, {}).get('sha256')
+    }
+
+
+def load_previous_details(state_abbr):
+    """Scraped details already stored in a state's plans.json"""
+    try:
+        with open(f'mock_api/{state_abbr}/plans.json') as f:
+            plans = json.load(f)['plans']
+    except (OSError, ValueError, KeyError):
+        return {}  # Not built yet, or the legacy inline-details layout
+    return {plan_id: plan['details'] for plan_id, plan in plans.items() if plan.get('has_scraped_details')}
+
+
+def collect_scraped_details(state_abbr, state_name, state_files, changed):
+    """Details for every scraped plan, re-reading only the changed files"""
+    previous = load_previous_details(state_abbr)
+    details = {}
+    reread = []
+    for path in state_files:
+        plan_id = path.stem.split('-', 1)[1]
+        if path.name in changed or plan_id not in previous:
+            reread.append(path)
+        else:
+            details[plan_id] = previous[plan_id]
+    details.update(load_scraped_plan_details(state_name, reread))
+    return details, len(reread)
+
+
+def minify_zip_files(changed):
+    """Re-minify the changed static ZIP files; returns the paths written or removed"""
+    if not changed:
+        return []
+    sys.path.insert(0, str(Path(__file__).parent / 'minification'))
+    import minify_state_endpoint
+    if minify_state_endpoint.MAPPING_VERSION is None:
+        print("  ⚠ Skipping minification, no mapping files (run minification/build_dictionary.py)")
+        return []
+    minify_zip_file = minify_state_endpoint.minify_zip_file
+
+    outputs = []
+    for name in sorted(changed):
+        input_file = ZIP_DIR / name
+        output_file = MINIFIED_DIR / f'{input_file.stem}_minified.json'
+        if input_file.exists():
+            minify_zip_file(input_file, output_file)
+            outputs.append(str(output_file))
+        elif output_file.exists():
+            output_file.unlink()  # ZIP removed upstream
+            outputs.append(str(output_file))
+
+    if SHARED_DIR.is_dir():
+        outputs.extend(minify_shared_zips(minify_state_endpoint, changed))
+    outputs.extend(minify_state_endpoint.publish_mappings(MINIFIED_DIR.parent))
+    return outputs
+
+
+def minify_shared_zips(minify_state_endpoint, changed):
+    """Rebuild the zip_shared/ files of the states whose ZIPs changed; returns the paths written or removed"""
+    outputs = []
+    for name in sorted(changed):
+        output_file = SHARED_DIR / name
+        if not (ZIP_DIR / name).exists() and output_file.exists():
+            output_file.unlink()  # ZIP removed upstream
+            outputs.append(str(output_file))
+
+    # A state's plan table must cover every ZIP pointing at it
+    zip_states = minify_state_endpoint.load_zip_states(ZIP_DIR)
+    states = {zip_states[Path(name).stem]['primary_state'] for name in changed if Path(name).stem in zip_states}
+    state_zips = sorted(zip_code for zip_code, entry in zip_states.items()
+                        if entry['primary_state'] and entry['primary_state'] in states)
+    if state_zips:
+        totals = minify_state_endpoint.minify_zips(state_zips, ZIP_DIR, SHARED_DIR, os.cpu_count(), 'shared')
+        outputs.extend(str(SHARED_DIR / f'{zip_code}.json') for zip_code in state_zips)
+        outputs.extend(str(SHARED_DIR / table['name']) for table in totals['tables'].values())
+        removed = totals['removed_tables']
+        print(f"  ✓ Rebuilt the shared layout of {', '.join(sorted(states))}: {len(state_zips)} ZIP files")
+    else:
+        removed = minify_state_endpoint.prune_plan_tables(SHARED_DIR, {})
+    outputs.extend(str(SHARED_DIR / name) for name in removed)
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rebuild only the outputs whose inputs changed')
+    parser.add_argument('states', nargs='*', help='State abbreviations to consider (default: %s)' % ' '.join(STATE_CONFIGS))
+    parser.add_argument('--all', action='store_true', help='Consider every state/territory in the landscape CSV')
+    parser.add_argument('--gzip-only', action='store_true',
+                        help='Write only .gz sidecars when brotli is missing (not for the CloudFront deploy)')
+    args = parser.parse_args(argv)
+
+    print("=" * 80)
+    print("Incremental Build")
+    print("=" * 80)
+    overall_start = time.perf_counter()
+
+    configs = state_configs_from_landscape() if args.all or args.states else dict(STATE_CONFIGS)
+    if args.states:
+        wanted = [abbr.upper() for abbr in args.states]
+        unknown = [abbr for abbr in wanted if abbr not in configs]
+        if unknown:
+            parser.error(f"not in the landscape CSV: {', '.join(unknown)}")
+        configs = {abbr: configs[abbr] for abbr in wanted}
+    territory_names = {config['territory_name'] for config in configs.values()}
+    state_names = {config['name'] for config in configs.values()}
+
+    old = load_manifest()
+    files_by_state = index_scraped_files()
+
+    # Hash the inputs of the states being considered; other states keep
+    # their previous entries so a later --all run still sees their changes
+    scraped = {name: entry for name, entry in old['scraped'].items() if name.split('-', 1)[0] not in state_names}
+    for state_name in state_names:
+        scraped.update(hash_files(files_by_state.get(state_name, []), old['scraped']))
+
+    table = load_landscape()
+    landscape = {state: groups for state, groups in old['landscape'].items() if state not in territory_names}
+    landscape.update(hash_landscape_groups(table, territory_names))
+
+    zip_files = sorted(p for p in ZIP_DIR.glob('*.json') if ZIP_FILE_RE.fullmatch(p.name)) if ZIP_DIR.exists() else []
+    zips = hash_files(zip_files, old['zip'])
+
+    changed_scraped = changed_names(old['scraped'], scraped)
+    changed_zips = changed_names(old['zip'], zips)
+    print(f"Scraped plan files changed: {len(changed_scraped)}")
+    print(f"Static ZIP files changed: {len(changed_zips)}")
+
+    # A state is rebuilt if any of its plans or landscape rows changed
+    affected = []
+    for state_abbr, config in configs.items():
+        reasons = []
+        if any(name.split('-', 1)[0] == config['name'] for name in changed_scraped):
+            reasons.append('scraped plans')
+        if old['landscape'].get(config['territory_name']) != landscape.get(config['territory_name']):
+            reasons.append('landscape rows')
+        if not Path(f'mock_api/{state_abbr}/plans.json').exists():
+            reasons.append('not built')
+        if reasons:
+            affected.append((state_abbr, config, reasons))
+    print(f"States to rebuild: {', '.join(abbr for abbr, _, _ in affected) or 'none'}")
+
+    written = []
+    for state_abbr, config, reasons in affected:
+        start = time.perf_counter()
+        state_files = files_by_state.get(config['name'], [])
+        details, reread = collect_scraped_details(state_abbr, config['name'], state_files, changed_scraped)
+        stats = build_county_caches_for_state(state_abbr, config, state_files, scraped_details=details)
+        written.extend(stats['written_files'])
+        print(f"  ⏱ {state_abbr} ({', '.join(reasons)}): re-read {reread}/{len(state_files)} plans, "
+              f"wrote {len(stats['written_files'])} files in {time.perf_counter() - start:.2f}s")
+
+    minified = minify_zip_files(changed_zips)
+    if minified:
+        print(f"  ✓ Re-minified {len(minified)} ZIP files")
+    written.extend(minified)
+
+    static_files = [path for path in written if path.startswith('static_api/')]
+    if static_files:
+        sidecars = precompress(static_files, workers=os.cpu_count(), gzip_only=args.gzip_only)['changed']
+        print(f"  ✓ Precompressed {len(static_files)} static files ({len(sidecars)} .br/.gz sidecars)")
+        written.extend(sidecars)
+
+    write_json_atomic(MANIFEST_PATH, {
+        'format': MANIFEST_FORMAT,
+        'scraped': scraped,
+        'landscape': landscape,
+        'zip': zips
+    }, separators=(',', ':'))
+
+    changed_files = sorted(set(written))
+    CHANGED_FILES_PATH.write_text(''.join(f'{path}\n' for path in changed_files))
+
+    print("\n" + "=" * 80)
+    print(f"Changed files: {len(changed_files)} (listed in {CHANGED_FILES_PATH})")
+    print(f"Total time: {time.perf_counter() - overall_start:.2f}s")
+    print("=" * 80)
+    return changed_files
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,13 @@
 Investigate network requests to find API endpoints
 """
 from playwright.sync_api import sync_playwright
+from pathlib import Path
+from urllib.parse import urlsplit
 import json
 
+# Plan API response bodies are kept here, replayable with scrape_api.py --replay
+recorded_dir = Path('recorded_api')
+
 def capture_network_traffic(url):
     """Capture all network requests while loading a page"""
 
@@ -34,6 +39,12 @@ def capture_network_traffic(url):
                 'method': response.request.method
             })
 
+            # plan-compare/plan/2026/H2001/068/1 -> recorded_api/plan/2026/H2001/068/1.json
+            if '/api/v1/data/plan-compare/plan/' in response.url and response.status == 200:
+                recorded = recorded_dir / (urlsplit(response.url).path.split('/plan-compare/', 1)[1] + '.json')
+                recorded.parent.mkdir(parents=True, exist_ok=True)
+                recorded.write_bytes(response.body())
+
         page.on('request', handle_request)
         page.on('response', handle_response)
 
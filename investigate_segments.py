@@ -1,35 +1,33 @@
 #!/usr/bin/env python3
-import csv
 from collections import defaultdict
 
+from landscape import load_landscape
+
 input_file = './CY2026_Landscape_202511/CY2026_Landscape_202511.csv'
 
 # Track plans by ContractPlanID to see which have multiple segments
 plans_by_contract_plan_id = defaultdict(list)
 
-with open(input_file, 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-
-    for row in reader:
-        contract_plan_id = row['ContractPlanID']
-        segment_id = row['Segment ID']
-        contract_plan_segment_id = row['ContractPlanSegmentID']
+for row in load_landscape(input_file).iter_rows():
+    contract_plan_id = row['ContractPlanID']
+    segment_id = row['Segment ID']
+    contract_plan_segment_id = row['ContractPlanSegmentID']
 
-        # Store unique combinations
-        key = (contract_plan_id, segment_id, contract_plan_segment_id)
-        if key not in plans_by_contract_plan_id[contract_plan_id]:
-            plans_by_contract_plan_id[contract_plan_id].append({
-                'ContractPlanID': contract_plan_id,
-                'Segment ID': segment_id,
-                'ContractPlanSegmentID': contract_plan_segment_id,
-                'State': row['State Territory Name'],
-                'County': row['County Name'],
-                'Plan Name': row['Plan Name'],
-                'Plan Type': row['Plan Type'],
-                'Part C Premium': row['Part C Premium'],
-                'Part D Total Premium': row['Part D Total Premium'],
-                'MOOP': row['In-Network Maximum Out-of-Pocket (MOOP) Amount']
-            })
+    # Store unique combinations
+    key = (contract_plan_id, segment_id, contract_plan_segment_id)
+    if key not in plans_by_contract_plan_id[contract_plan_id]:
+        plans_by_contract_plan_id[contract_plan_id].append({
+            'ContractPlanID': contract_plan_id,
+            'Segment ID': segment_id,
+            'ContractPlanSegmentID': contract_plan_segment_id,
+            'State': row['State Territory Name'],
+            'County': row['County Name'],
+            'Plan Name': row['Plan Name'],
+            'Plan Type': row['Plan Type'],
+            'Part C Premium': row['Part C Premium'],
+            'Part D Total Premium': row['Part D Total Premium'],
+            'MOOP': row['In-Network Maximum Out-of-Pocket (MOOP) Amount']
+        })
 
 # Find plans with multiple segments
 multi_segment_plans = {k: v for k, v in plans_by_contract_plan_id.items() if len(v) > 1}
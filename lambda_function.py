@@ -6,8 +6,11 @@ Supports: AK, NH, VT, WY
 
 import json
 import os
+from collections import OrderedDict
 from pathlib import Path
 
+from zip_index import load_zip_index
+
 # State configurations
 STATES = {
     'ak': {'name': 'Alaska', 'abbr': 'AK'},
@@ -15,54 +18,275 @@ STATES = {
     'vt': {'name': 'Vermont', 'abbr': 'VT'},
     'wy': {'name': 'Wyoming', 'abbr': 'WY'}
 }
+STATE_KEYS = {config['abbr']: state_key for state_key, config in STATES.items()}
+
+# In Lambda, data files will be in /var/task/ or we'll bundle them
+DATA_DIR = Path(__file__).parent / 'mock_api'
+
+# Bounds on what a warm container keeps resident
+MAX_RESIDENT_STATES = int(os.environ.get('MAX_RESIDENT_STATES', '16'))
+MAX_RESIDENT_COUNTIES = int(os.environ.get('MAX_RESIDENT_COUNTIES', '128'))
+MAX_RESPONSE_CACHE_BYTES = int(os.environ.get('MAX_RESPONSE_CACHE_BYTES', str(64 * 1024 * 1024)))
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def keys(self):
+        return list(self._entries)
+
+    def values(self):
+        return list(self._entries.values())
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+class ResponseCache:
+    """LRU of encoded response bodies, bounded by their total size
+
+    Entries are tagged with the data version they were built from; a lookup
+    with a different version is a miss, so reloaded data never serves stale
+    bodies.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # {key: (version, body)}
+
+    def get(self, key, version):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, version, body):
+        if len(body) > self.max_bytes:
+            return
+        self.discard(key)
+        self._entries[key] = (version, body)
+        self.total_bytes += len(body)
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.total_bytes -= len(evicted)
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[1])
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
 
 # Global cache - persists across warm Lambda invocations
-_ZIP_TO_COUNTY = {}  # {state: {zip: data}}
-_COUNTY_CACHES = {}  # {state: {county: data}}
-_LOADED = False
+# States load the first time one of their routes is hit, counties the first
+# time one of their ZIPs is requested
+_STATE_DATA = LRUCache(MAX_RESIDENT_STATES)  # {state: {'version', 'zips', 'counties', 'plan_store', 'plan_index'}}
+_COUNTY_CACHES = LRUCache(MAX_RESIDENT_COUNTIES)  # {(state, county): data}
+_RESPONSE_CACHE = ResponseCache(MAX_RESPONSE_CACHE_BYTES)  # {(state, zip, details): body}
+_ZIP_INDEXES = {}  # {data dir: ZipIndex} - the mmap'ed national ZIP -> county index
+
+def build_plan_index(county_caches):
+    """Index one state's county caches by plan ID -> (plan, counties served)"""
+    index = {}
+    for county_name in sorted(county_caches):
+        for plan in county_caches[county_name]['plans']:
+            plan_id = plan['summary']['contract_plan_segment_id']
+            if plan_id in index:
+                index[plan_id][1].append(county_name)
+            else:
+                index[plan_id] = (plan, [county_name])
+    return index
+
+def join_plan_details(county_plans, plan_store):
+    """Attach full details from the state plan table to a county's plan entries"""
+    if plan_store is None:
+        return county_plans  # Older county files carry details inline
+
+    plans = []
+    for p in county_plans:
+        stored = plan_store.get(p['summary']['contract_plan_segment_id'], {})
+        plans.append({
+            'summary': p['summary'],
+            'details': stored.get('details'),
+            'has_scraped_details': p['has_scraped_details']
+        })
+    return plans
+
+def encode_summary_plans(county_plans):
+    """JSON-encoded details=0 projection of a county's plans"""
+    return json.dumps([
+        {
+            'contract_plan_segment_id': p['summary']['contract_plan_segment_id'],
+            'plan_name': p['summary']['plan_name'],
+            'plan_type': p['summary']['plan_type'],
+            'organization': p['summary']['organization'],
+            'has_scraped_details': p['has_scraped_details']
+        }
+        for p in county_plans
+    ])
 
-def load_data():
-    """Load all data files for all states - called once per cold start"""
-    global _ZIP_TO_COUNTY, _COUNTY_CACHES, _LOADED
+def splice_json(object_json, key, value_json):
+    """Append an already-encoded value as the last key of an encoded JSON object
+
+    Produces the same text json.dumps() would for the combined object.
+    """
+    separator = '' if object_json == '{}' else ', '
+    return f'{object_json[:-1]}{separator}{json.dumps(key)}: {value_json}}}'
+
+def data_version(state_dir):
+    """Version tag for a state's cached response bodies
+
+    DATA_VERSION (set it per deploy) when present; otherwise the size and
+    mtime of the state's plan table (api_info.json or the counties directory
+    for older layouts) and of the shared ZIP index - a constant number of
+    stat() calls, however many counties the state has.
+
+    Taken once when the state loads and fixed while it stays resident: new
+    files on disk are only picked up after the state is evicted, the
+    container is replaced, or invalidate_response_cache() is called.
+    """
+    version = os.environ.get('DATA_VERSION')
+    if version:
+        return version
+    parts = []
+    for path in [next((p for p in [state_dir / 'plans.json', state_dir / 'api_info.json', state_dir / 'counties']
+                       if p.exists()), None), state_dir.parent / 'zip_index.bin']:
+        if path is not None and path.exists():
+            stat = path.stat()
+            parts.append(f'{path.name}:{stat.st_size}:{stat.st_mtime_ns}')
+    return '|'.join(parts)
+
+def get_zip_index():
+    """The ZIP -> county index of DATA_DIR, opened on first use"""
+    zip_index = _ZIP_INDEXES.get(DATA_DIR)
+    if zip_index is None:
+        zip_index = _ZIP_INDEXES[DATA_DIR] = load_zip_index(DATA_DIR)
+    return zip_index
+
+def load_state(state_key):
+    """Load a state's ZIP mapping and plan table on first use"""
+    state_data = _STATE_DATA.get(state_key)
+    if state_data is not None:
+        return state_data
+
+    state_dir = DATA_DIR / STATES[state_key]['abbr']
+    state_data = {
+        'version': data_version(state_dir),
+        'zips': {},
+        'counties': [],
+        'plan_store': None,
+        'plan_index': None
+    }
+
+    # ZIP to county mapping - a view of the shared binary index, nothing to parse
+    state_data['zips'] = get_zip_index().for_state(STATES[state_key]['abbr'])
+
+    # County files are only listed here - each is read on first request
+    county_dir = state_dir / 'counties'
+    if county_dir.exists():
+        state_data['counties'] = sorted(f.stem for f in county_dir.glob('*.json'))
+
+    # Deduplicated plan table - each plan's details stored once per state
+    plan_store_file = state_dir / 'plans.json'
+    if plan_store_file.exists():
+        with open(plan_store_file, 'r') as f:
+            state_data['plan_store'] = json.load(f)['plans']
+
+    _STATE_DATA.put(state_key, state_data)
+    return state_data
+
+def load_county(state_key, county_name):
+    """Load one county cache on first use; None if the state has no such county"""
+    county_data = _COUNTY_CACHES.get((state_key, county_name))
+    if county_data is not None:
+        return county_data
 
-    if _LOADED:
-        return  # Already loaded
+    county_file = DATA_DIR / STATES[state_key]['abbr'] / 'counties' / f'{county_name}.json'
+    if not county_file.exists():
+        return None
 
-    # In Lambda, data files will be in /var/task/ or we'll bundle them
-    base_path = Path(__file__).parent
+    with open(county_file, 'r') as f:
+        county_data = json.load(f)
 
+    # Summary responses splice this in instead of rebuilding it per request
+    county_data['summary_plans_json'] = encode_summary_plans(county_data['plans'])
+
+    _COUNTY_CACHES.put((state_key, county_name), county_data)
+    return county_data
+
+def get_plan_index(state_key):
+    """Plan ID -> (plan, counties) index for a state, built on first use"""
+    state_data = load_state(state_key)
+
+    if state_data['plan_index'] is None:
+        if state_data['plan_store'] is not None:
+            state_data['plan_index'] = {
+                plan_id: (plan, plan['counties'])
+                for plan_id, plan in state_data['plan_store'].items()
+            }
+        else:
+            # Older layout without plans.json: the index needs every county
+            state_data['plan_index'] = build_plan_index({
+                county_name: load_county(state_key, county_name)
+                for county_name in state_data['counties']
+            })
+
+    return state_data['plan_index']
+
+def load_data():
+    """Eagerly load every state and county - optional warm-up, routes load lazily"""
     total_zips = 0
     total_counties = 0
 
-    # Load data for each state
-    for state_key, state_config in STATES.items():
-        state_abbr = state_config['abbr']
-
-        # Load ZIP to county mapping
-        zip_file = base_path / f'mock_api/{state_abbr}/zip_to_county_multi.json'
-        if zip_file.exists():
-            with open(zip_file, 'r') as f:
-                zip_data = json.load(f)
-                _ZIP_TO_COUNTY[state_key] = {entry['zip']: entry for entry in zip_data}
-                total_zips += len(zip_data)
-
-        # Pre-load all county caches for this state
-        county_dir = base_path / f'mock_api/{state_abbr}/counties'
-        if county_dir.exists():
-            _COUNTY_CACHES[state_key] = {}
-            for county_file in county_dir.glob('*.json'):
-                county_name = county_file.stem
-                with open(county_file, 'r') as f:
-                    _COUNTY_CACHES[state_key][county_name] = json.load(f)
-                    total_counties += 1
-
-    _LOADED = True
+    for state_key in STATES:
+        state_data = load_state(state_key)
+        total_zips += len(state_data['zips'])
+        for county_name in state_data['counties']:
+            load_county(state_key, county_name)
+            total_counties += 1
+        get_plan_index(state_key)
+        warm_response_cache(state_key)
+
     print(f"Loaded {len(STATES)} states, {total_zips} ZIP codes, {total_counties} county caches")
 
+def warm_response_cache(state_key, include_details=False):
+    """Pre-encode ZIP responses for a state so first hits are cache hits"""
+    for zip_code in load_state(state_key)['zips']:
+        get_plans_by_zip(state_key, zip_code, include_details)
+
+def invalidate_response_cache():
+    """Drop every cached response body, e.g. after deploying new data"""
+    _RESPONSE_CACHE.clear()
+
 def get_plans_by_zip(state_key, zip_code, include_details=True):
     """Get all available plans for a ZIP code in a specific state"""
-    load_data()
-
     # Validate state
     if state_key not in STATES:
         return {
@@ -74,8 +298,10 @@ def get_plans_by_zip(state_key, zip_code, include_details=True):
             })
         }
 
+    state_data = load_state(state_key)
+
     # Validate ZIP
-    if state_key not in _ZIP_TO_COUNTY or zip_code not in _ZIP_TO_COUNTY[state_key]:
+    if zip_code not in state_data['zips']:
         return {
             'statusCode': 404,
             'body': json.dumps({
@@ -85,60 +311,103 @@ def get_plans_by_zip(state_key, zip_code, include_details=True):
             })
         }
 
-    zip_info = _ZIP_TO_COUNTY[state_key][zip_code]
+    # Repeat hits are a dict lookup returning the already-encoded body
+    cache_key = (state_key, zip_code, include_details)
+    body = _RESPONSE_CACHE.get(cache_key, state_data['version'])
+    if body is not None:
+        return {
+            'statusCode': 200,
+            'body': body
+        }
 
-    # Build response with counties
+    zip_info = state_data['zips'][zip_code]
+
+    # Build response with counties (spliced in below as encoded fragments)
     response = {
         'zip_code': zip_code,
         'state': STATES[state_key]['name'],
         'state_abbr': STATES[state_key]['abbr'],
         'multi_county': zip_info['multi_county'],
-        'primary_county': zip_info['primary_county']['name'],
-        'counties': {}
+        'primary_county': zip_info['primary_county']['name']
     }
 
     # Load plans for each county
+    county_fragments = {}
     for county_info in zip_info['counties']:
         county_name = county_info['name']
 
-        if state_key not in _COUNTY_CACHES or county_name not in _COUNTY_CACHES[state_key]:
+        county_data = load_county(state_key, county_name)
+        if county_data is None:
             continue
 
-        county_data = _COUNTY_CACHES[state_key][county_name]
-
         # Filter plans based on include_details parameter
         if include_details:
-            plans = county_data['plans']
+            plans_json = json.dumps(join_plan_details(county_data['plans'], state_data['plan_store']))
         else:
-            # Summary only (faster response, smaller payload)
-            plans = [
-                {
-                    'contract_plan_segment_id': p['summary']['contract_plan_segment_id'],
-                    'plan_name': p['summary']['plan_name'],
-                    'plan_type': p['summary']['plan_type'],
-                    'organization': p['summary']['organization'],
-                    'has_scraped_details': p['has_scraped_details']
-                }
-                for p in county_data['plans']
-            ]
-
-        response['counties'][county_name] = {
+            # Summary only - projected and encoded once when the county loaded
+            plans_json = county_data['summary_plans_json']
+
+        county_json = json.dumps({
             'fips': county_info['fips'],
             'percentage': county_info.get('percentage'),
-            'plan_count': len(plans),
-            'scraped_details_available': county_data['scraped_details_available'],
-            'plans': plans
+            'plan_count': len(county_data['plans']),
+            'scraped_details_available': county_data['scraped_details_available']
+        })
+        county_fragments[county_name] = splice_json(county_json, 'plans', plans_json)
+
+    counties_json = '{' + ', '.join(
+        f'{json.dumps(county_name)}: {fragment}' for county_name, fragment in county_fragments.items()
+    ) + '}'
+    body = splice_json(json.dumps(response), 'counties', counties_json)
+    _RESPONSE_CACHE.put(cache_key, state_data['version'], body)
+
+    return {
+        'statusCode': 200,
+        'body': body
+    }
+
+def get_plans_by_national_zip(zip_code, include_details=True):
+    """Get plans for a ZIP in every state it belongs to, from one index lookup"""
+    states = [entry['state'] for entry in get_zip_index().lookup_all(zip_code) if entry['state'] in STATE_KEYS]
+    if not states:
+        return {
+            'statusCode': 404,
+            'body': json.dumps({
+                'error': 'ZIP code not found',
+                'zip_code': zip_code
+            })
+        }
+
+    # Each state's part is the (cached) body its /{state}/{zip} route returns;
+    # a state that cannot serve the ZIP is listed as unavailable, not spliced in
+    parts = {state: get_plans_by_zip(STATE_KEYS[state], zip_code, include_details) for state in states}
+    served = [state for state in states if parts[state]['statusCode'] == 200]
+    unavailable = [state for state in states if state not in served]
+    if not served:
+        return {
+            'statusCode': 404,
+            'body': json.dumps({
+                'error': 'ZIP code not found',
+                'zip_code': zip_code,
+                'unavailable_states': unavailable
+            })
         }
 
+    results_json = '[' + ', '.join(parts[state]['body'] for state in served) + ']'
+    response = {
+        'zip_code': zip_code,
+        'multi_state': len(served) > 1,
+        'states': served
+    }
+    if unavailable:
+        response['unavailable_states'] = unavailable
     return {
         'statusCode': 200,
-        'body': json.dumps(response)
+        'body': splice_json(json.dumps(response), 'results', results_json)
     }
 
 def get_plan_detail(state_key, plan_id):
     """Get details for a specific plan in a state"""
-    load_data()
-
     # Validate state
     if state_key not in STATES:
         return {
@@ -149,22 +418,22 @@ def get_plan_detail(state_key, plan_id):
             })
         }
 
-    # Search through county caches for this state
-    if state_key in _COUNTY_CACHES:
-        for county_name, county_data in _COUNTY_CACHES[state_key].items():
-            for plan in county_data['plans']:
-                if plan['summary']['contract_plan_segment_id'] == plan_id:
-                    return {
-                        'statusCode': 200,
-                        'body': json.dumps({
-                            'plan_id': plan_id,
-                            'state': STATES[state_key]['name'],
-                            'county': county_name,
-                            'summary': plan['summary'],
-                            'details': plan['details'],
-                            'has_scraped_details': plan['has_scraped_details']
-                        })
-                    }
+    # O(1) lookup in the state's plan index
+    entry = get_plan_index(state_key).get(plan_id)
+    if entry:
+        plan, counties = entry
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'plan_id': plan_id,
+                'state': STATES[state_key]['name'],
+                'county': counties[0],
+                'counties': counties,
+                'summary': plan['summary'],
+                'details': plan['details'],
+                'has_scraped_details': plan['has_scraped_details']
+            })
+        }
 
     return {
         'statusCode': 404,
@@ -177,8 +446,6 @@ def get_plan_detail(state_key, plan_id):
 
 def list_counties(state_key):
     """List all counties with plan counts for a state"""
-    load_data()
-
     # Validate state
     if state_key not in STATES:
         return {
@@ -190,13 +457,13 @@ def list_counties(state_key):
         }
 
     counties = []
-    if state_key in _COUNTY_CACHES:
-        for county_name, county_data in _COUNTY_CACHES[state_key].items():
-            counties.append({
-                'name': county_name,
-                'plan_count': county_data['plan_count'],
-                'scraped_details_available': county_data['scraped_details_available']
-            })
+    for county_name in load_state(state_key)['counties']:
+        county_data = load_county(state_key, county_name)
+        counties.append({
+            'name': county_name,
+            'plan_count': county_data['plan_count'],
+            'scraped_details_available': county_data['scraped_details_available']
+        })
 
     return {
         'statusCode': 200,
@@ -210,12 +477,11 @@ def list_counties(state_key):
 
 def list_states():
     """List all available states"""
-    load_data()
-
     states_info = []
     for state_key, state_config in STATES.items():
-        zip_count = len(_ZIP_TO_COUNTY.get(state_key, {}))
-        county_count = len(_COUNTY_CACHES.get(state_key, {}))
+        state_data = load_state(state_key)
+        zip_count = len(state_data['zips'])
+        county_count = len(state_data['counties'])
 
         states_info.append({
             'key': state_key,
@@ -233,11 +499,35 @@ def list_states():
         })
     }
 
+def health_check():
+    """Report what this container currently has resident - loads nothing"""
+    resident = {state_key: [] for state_key in _STATE_DATA.keys()}
+    for state_key, county_name in _COUNTY_CACHES.keys():
+        resident.setdefault(state_key, []).append(county_name)
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'status': 'healthy',
+            'states_available': len(STATES),
+            'states_loaded': len(_STATE_DATA),
+            'zip_codes_loaded': sum(len(state_data['zips']) for state_data in _STATE_DATA.values()),
+            'counties_loaded': len(_COUNTY_CACHES),
+            'cached_responses': len(_RESPONSE_CACHE),
+            'cached_response_bytes': _RESPONSE_CACHE.total_bytes,
+            'max_resident_states': MAX_RESIDENT_STATES,
+            'max_resident_counties': MAX_RESIDENT_COUNTIES,
+            'resident': {state_key: sorted(counties) for state_key, counties in resident.items()}
+        })
+    }
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler
 
     Routes:
+      GET /zip/{zip_code}             - Get plans for ZIP code in every state it spans
+      GET /zip/{zip_code}?details=0   - Summary only
       GET /nh/{zip_code}              - Get plans for ZIP code
       GET /nh/{zip_code}?details=0    - Summary only
       GET /nh/plan/{plan_id}          - Get specific plan
@@ -269,23 +559,17 @@ def lambda_handler(event, context):
     try:
         # Health check
         if not path_parts or path_parts == ['health']:
-            load_data()
-            total_zips = sum(len(zips) for zips in _ZIP_TO_COUNTY.values())
-            total_counties = sum(len(counties) for counties in _COUNTY_CACHES.values())
-            response = {
-                'statusCode': 200,
-                'body': json.dumps({
-                    'status': 'healthy',
-                    'states_loaded': len(STATES),
-                    'zip_codes_loaded': total_zips,
-                    'counties_loaded': total_counties
-                })
-            }
+            response = health_check()
 
         # Route: GET /states
         elif path_parts == ['states']:
             response = list_states()
 
+        # Route: GET /zip/{zip_code} - no state needed
+        elif len(path_parts) == 2 and path_parts[0] == 'zip':
+            include_details = query_params.get('details', '1') != '0'
+            response = get_plans_by_national_zip(path_parts[1], include_details)
+
         # Route: GET /{state}/counties
         elif len(path_parts) >= 2 and path_parts[1] == 'counties':
             state_key = path_parts[0].lower()
@@ -312,6 +596,7 @@ def lambda_handler(event, context):
                     'path': path,
                     'available_routes': [
                         'GET /states',
+                        'GET /zip/{zip_code}',
                         'GET /{state}/{zip_code}',
                         'GET /{state}/{zip_code}?details=0',
                         'GET /{state}/plan/{plan_id}',
@@ -349,6 +634,7 @@ if __name__ == '__main__':
         {'name': 'VT ZIP', 'path': '/vt/05401', 'query': {'details': '0'}},
         {'name': 'WY ZIP', 'path': '/wy/82001', 'query': {'details': '0'}},
         {'name': 'AK ZIP', 'path': '/ak/99501', 'query': {'details': '0'}},
+        {'name': 'ZIP without state', 'path': '/zip/03602', 'query': {'details': '0'}},
         {'name': 'NH plan detail', 'path': '/nh/plan/S4802_075_0', 'query': {}},
         {'name': 'NH counties', 'path': '/nh/counties', 'query': {}},
     ]
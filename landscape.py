@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the CY2026 Landscape CSV.
+
+The CSV is parsed once into a columnar in-memory table indexed by state,
+(state, county) and plan ID, and cached on disk as a binary snapshot next to
+the CSV. Build scripts query the table instead of re-reading the CSV with
+csv.DictReader, so a multi-state rebuild does one CSV read instead of N.
+
+Usage:
+    from landscape import load_landscape
+
+    table = load_landscape()
+    for row in table.iter_rows(state='New Hampshire'):
+        print(row['ContractPlanSegmentID'], row['County Name'])
+
+Run directly to (re)build the snapshot:
+    python landscape.py [path/to/CY2026_Landscape_202511.csv]
+"""
+
+import csv
+import os
+import pickle
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Scripts have historically looked in both places
+CSV_CANDIDATES = [
+    Path('CY2026_Landscape_202511/CY2026_Landscape_202511.csv'),
+    Path('downloaded_data/CY2026_Landscape_202511/CY2026_Landscape_202511.csv'),
+]
+
+# Bump when the snapshot layout changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 1
+
+# Tables already loaded in this process, keyed by resolved CSV path
+_TABLES = {}
+
+
+def find_csv():
+    """Return the first landscape CSV that exists (or the default path)"""
+    for path in CSV_CANDIDATES:
+        if path.exists():
+            return path
+    return CSV_CANDIDATES[0]
+
+
+def snapshot_path(csv_path):
+    """Binary snapshot lives next to the CSV it was built from"""
+    return Path(csv_path).with_suffix('.snapshot.pickle')
+
+
+class LandscapeTable:
+    """Columnar view of the landscape CSV with state/county/plan indexes"""
+
+    def __init__(self, columns, source):
+        self.columns = columns  # {column name: [value per row]}
+        self.source = source    # {'path', 'size', 'mtime_ns'} of the CSV
+        self.row_count = len(next(iter(columns.values()), []))
+        self._build_indexes()
+
+    def _build_indexes(self):
+        self.by_state = defaultdict(list)
+        self.by_county = defaultdict(list)
+        self.by_plan = defaultdict(list)
+
+        states = self.columns['State Territory Name']
+        counties = self.columns['County Name']
+        plan_ids = self.columns['ContractPlanSegmentID']
+
+        for i in range(self.row_count):
+            self.by_state[states[i]].append(i)
+            self.by_county[(states[i], counties[i])].append(i)
+            self.by_plan[plan_ids[i]].append(i)
+
+        self.by_state = dict(self.by_state)
+        self.by_county = dict(self.by_county)
+        self.by_plan = dict(self.by_plan)
+
+    def states(self):
+        """All state/territory names in the CSV, sorted"""
+        return sorted(s for s in self.by_state if s)
+
+    def counties(self, state):
+        """All county names listed for a state (including 'All Counties')"""
+        return sorted({county for s, county in self.by_county if s == state})
+
+    def row_indexes(self, state=None, county=None, plan_id=None):
+        """Row numbers matching the given filters, in CSV order"""
+        if plan_id is not None:
+            rows = self.by_plan.get(plan_id, [])
+            if state is not None:
+                states = self.columns['State Territory Name']
+                rows = [i for i in rows if states[i] == state]
+            if county is not None:
+                counties = self.columns['County Name']
+                rows = [i for i in rows if counties[i] == county]
+            return rows
+        if state is not None and county is not None:
+            return self.by_county.get((state, county), [])
+        if state is not None:
+            return self.by_state.get(state, [])
+        if county is not None:
+            counties = self.columns['County Name']
+            return [i for i in range(self.row_count) if counties[i] == county]
+        return range(self.row_count)
+
+    def column(self, name, rows=None):
+        """Values of one column, optionally restricted to some row numbers"""
+        values = self.columns[name]
+        if rows is None:
+            return values
+        return [values[i] for i in rows]
+
+    def row(self, i):
+        """One row as a dict, like csv.DictReader yields"""
+        return {name: values[i] for name, values in self.columns.items()}
+
+    def iter_rows(self, state=None, county=None, plan_id=None):
+        """Yield matching rows as dicts, like csv.DictReader yields"""
+        for i in self.row_indexes(state=state, county=county, plan_id=plan_id):
+            yield self.row(i)
+
+
+def parse_csv(csv_path):
+    """Read the CSV once into columns, interning repeated strings"""
+    interned = {}
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [[] for _ in header]
+        for record in reader:
+            if not record:
+                continue  # Blank line - csv.DictReader skips these too
+            if len(record) < len(header):
+                record += [None] * (len(header) - len(record))  # Missing fields are None, as in DictReader
+            for values, value in zip(columns, record):
+                values.append(interned.setdefault(value, value))
+    return dict(zip(header, columns))
+
+
+def _source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': str(Path(csv_path).resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read_snapshot(path, source):
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if snapshot.get('format') != SNAPSHOT_FORMAT:
+        return None
+    if (snapshot['source']['size'], snapshot['source']['mtime_ns']) != (source['size'], source['mtime_ns']):
+        return None  # CSV changed since the snapshot was written
+    return snapshot['columns']
+
+
+def _write_snapshot(path, source, columns):
+    # Write to a temp file first so a killed build never leaves a torn snapshot
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'format': SNAPSHOT_FORMAT, 'source': source, 'columns': columns}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_landscape(csv_path=None, use_snapshot=True):
+    """Load the landscape table, from the snapshot when it is up to date"""
+    csv_path = Path(csv_path) if csv_path else find_csv()
+    key = str(csv_path.resolve())
+    if key in _TABLES:
+        return _TABLES[key]
+
+    source = _source_info(csv_path)
+    snap_path = snapshot_path(csv_path)
+
+    columns = _read_snapshot(snap_path, source) if use_snapshot else None
+    if columns is None:
+        columns = parse_csv(csv_path)
+        if use_snapshot:
+            try:
+                _write_snapshot(snap_path, source, columns)
+            except OSError as e:
+                print(f"  ⚠ Could not write landscape snapshot {snap_path}: {e}")
+
+    table = LandscapeTable(columns, source)
+    _TABLES[key] = table
+    return table
+
+
+def main():
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else find_csv()
+
+    start = time.perf_counter()
+    columns = parse_csv(csv_path)
+    parse_time = time.perf_counter() - start
+
+    snap_path = snapshot_path(csv_path)
+    _write_snapshot(snap_path, _source_info(csv_path), columns)
+
+    _TABLES.clear()
+    start = time.perf_counter()
+    table = load_landscape(csv_path)
+    load_time = time.perf_counter() - start
+
+    print(f"Landscape CSV: {csv_path}")
+    print(f"  Rows: {table.row_count:,}")
+    print(f"  States/territories: {len(table.states())}")
+    print(f"  Unique plans: {len(table.by_plan):,}")
+    print(f"  CSV parse: {parse_time:.2f}s")
+    print(f"  Snapshot load + index: {load_time:.2f}s")
+    print(f"  Snapshot: {snap_path} ({snap_path.stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Learn the minified format's dictionary from the static ZIP files.
+
+key_mapping.json and value_mapping.json used to be curated by hand, so
+strings nobody listed (the "$115 copay" values, the long MOOP keys) were
+emitted verbatim. This scans every plan in static_api/medicare/zip, ranks
+each key and string value by the bytes a code would save - occurrences x
+(length - code length), less the dictionary entry itself - and writes the
+ones that pay for themselves:
+
+  - key_mapping.json    {"version", "mapping": {key: code}}
+  - value_mapping.json  {"version", "values", "organizations", "plan_types",
+                         "addresses", "network_types": {code: string}}
+
+Values are filed under the category of the key they most often appear under,
+so codes keep the prefixes clients decode by (v, o, t, a, nt). A string that
+stays in the dictionary keeps its code, and the version only goes up when
+the dictionary changes; minify_state_endpoint.py stamps the version into
+every file ("dv") and publishes each version under mappings/v<N>/.
+
+Finally the minified size of every state is reported, with the previous
+dictionary and with the new one.
+
+Usage: python3 build_dictionary.py [--input DIR] [--output DIR]
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import minify_state_endpoint as minifier
+
+MIN_COUNT = 2
+MAX_KEYS = 1024
+MAX_VALUES = 4096
+
+# Value categories: key a value sits under -> (category, code prefix)
+VALUE_CATEGORIES = {
+    'organization': 'organizations',
+    'type': 'plan_types',
+    'Plan address': 'addresses',
+}
+CODE_PREFIXES = {'values': 'v', 'organizations': 'o', 'plan_types': 't', 'addresses': 'a', 'network_types': 'nt'}
+
+# Keys minify_zip_file writes itself; a learned key code must not shadow them
+RESERVED_KEYS = {'z', 'mc', 'ms', 's', 'ps', 'c', 'p', 'pc', 'dv', 'f', 'n', 'r', 'pa', 'pt'}
+
+BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def json_len(text):
+    return len(json.dumps(text))
+
+
+def base36(n):
+    digits = BASE36[n % 36]
+    while n >= 36:
+        n = n // 36 - 1
+        digits = BASE36[n % 36] + digits
+    return digits
+
+
+class Corpus:
+    """Counts of every key and string value in the plans of the ZIP files"""
+
+    def __init__(self):
+        self.keys = Counter()
+        self.values = Counter()
+        self.value_keys = defaultdict(Counter)  # value -> keys it appears under
+        self.network_types = Counter()
+        self.files = 0
+
+    def add_object(self, obj, key=None):
+        if isinstance(obj, dict):
+            for child_key, value in obj.items():
+                self.keys[child_key] += 1
+                self.add_object(value, child_key)
+        elif isinstance(obj, list):
+            for item in obj:
+                self.add_object(item, key)
+        elif isinstance(obj, str):
+            self.values[obj] += 1
+            self.value_keys[obj][key] += 1
+
+    def add_zip(self, data):
+        self.files += 1
+        for plan in data.get('plans', []):
+            self.add_object(plan)
+            match = re.search(r'\(([^)]+)\)\s*$', plan.get('plan_info', {}).get('name') or '')
+            if match:
+                self.network_types[match.group(1)] += 1
+
+    def category(self, value):
+        key = self.value_keys[value].most_common(1)[0][0]
+        return VALUE_CATEGORIES.get(key, 'values')
+
+
+def assign_codes(counts, previous, make_code, taken, limit):
+    """{string: code} for the strings whose code saves more than its dictionary entry costs
+
+    Strings are ranked by gross savings so the most valuable get the shortest
+    codes; a string already in the previous dictionary keeps its code.
+    """
+    ranked = sorted(
+        (item for item in counts.items() if item[1] >= MIN_COUNT),
+        key=lambda item: (-item[1] * json_len(item[0]), item[0])
+    )
+    previous = {text: code for text, code in previous.items() if code not in taken}
+    used = set(taken) | set(previous.values())
+    codes = {}
+    next_code = 0
+    for text, count in ranked:
+        if len(codes) >= limit:
+            break
+        code = previous.get(text)
+        if code is None:
+            while make_code(next_code) in used:
+                next_code += 1
+            code = make_code(next_code)
+        if count * (json_len(text) - json_len(code)) - (json_len(text) + json_len(code) + 1) <= 0:
+            continue
+        if code == make_code(next_code):
+            next_code += 1
+        used.add(code)
+        codes[text] = code
+    return codes
+
+
+def load_previous(mapping_dir):
+    """(key mapping, value mapping) written by the last run, or None"""
+    try:
+        with open(Path(mapping_dir) / 'key_mapping.json') as f:
+            key_data = json.load(f)
+        with open(Path(mapping_dir) / 'value_mapping.json') as f:
+            value_data = json.load(f)
+    except FileNotFoundError:
+        return None
+    return key_data, value_data
+
+
+def build_dictionary(corpus, previous=None, max_keys=MAX_KEYS, max_values=MAX_VALUES):
+    """(key_mapping, value_mapping) documents for a scanned corpus"""
+    previous_keys, previous_values = previous or ({'mapping': {}}, {})
+
+    key_mapping = assign_codes(corpus.keys, previous_keys['mapping'], base36,
+                               RESERVED_KEYS | set(corpus.keys), max_keys)
+
+    by_category = defaultdict(Counter)
+    for value, count in corpus.values.items():
+        by_category[corpus.category(value)][value] = count
+    by_category['network_types'] = corpus.network_types
+
+    value_mapping = {}
+    for category, prefix in CODE_PREFIXES.items():
+        reverse = {value: code for code, value in previous_values.get(category, {}).items()}
+        codes = assign_codes(by_category[category], reverse, lambda n, prefix=prefix: f'{prefix}{n}',
+                             set(corpus.values), max_values)
+        value_mapping[category] = {code: value for value, code in codes.items()}
+
+    version = previous_keys.get('version', 0)
+    if previous is None or key_mapping != previous_keys['mapping'] or any(
+            value_mapping[category] != previous_values.get(category) for category in CODE_PREFIXES):
+        version += 1
+    return {'version': version, 'mapping': key_mapping}, dict({'version': version}, **value_mapping)
+
+
+def write_json(path, data):
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(data, separators=(',', ':')))
+    os.replace(tmp_path, path)
+
+
+def minified_size(data):
+    return len(json.dumps(minifier.minify_zip_data(data), separators=(',', ':')))
+
+
+def zip_files(zip_dir):
+    return sorted(p for p in Path(zip_dir).glob('*.json') if minifier.ZIP_FILE_RE.fullmatch(p.name))
+
+
+def size_report(zip_dir, zip_states, previous_sizes, mapping_dir):
+    """{state: {'zips', 'original', 'previous', 'minified'}} with the new dictionary loaded"""
+    minifier.load_mappings(mapping_dir)
+    report = defaultdict(lambda: {'zips': 0, 'original': 0, 'previous': 0, 'minified': 0})
+    for path in zip_files(zip_dir):
+        with open(path) as f:
+            size = minified_size(json.load(f))
+        entry = zip_states.get(path.stem, {'states': [], 'primary_state': None})
+        for state in entry['states'] or [entry['primary_state']]:
+            totals = report[state or '??']
+            totals['zips'] += 1
+            totals['original'] += path.stat().st_size
+            totals['previous'] += previous_sizes.get(path.stem, 0)
+            totals['minified'] += size
+    return dict(report)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Learn key/value mappings for the minified format')
+    parser.add_argument('--input', default=str(minifier.STATIC_DIR / 'zip'), help='ZIP JSON directory')
+    parser.add_argument('--output', default=str(minifier.SCRIPT_DIR), help='Where to write the mapping files')
+    parser.add_argument('--max-keys', type=int, default=MAX_KEYS)
+    parser.add_argument('--max-values', type=int, default=MAX_VALUES, help='Per value category')
+    args = parser.parse_args(argv)
+
+    zip_dir, output_dir = Path(args.input), Path(args.output)
+    previous = load_previous(output_dir)
+    if previous:
+        minifier.load_mappings(output_dir)
+
+    # One pass: count the corpus, and size it with the current dictionary
+    start = time.perf_counter()
+    corpus = Corpus()
+    previous_sizes = {}
+    for path in zip_files(zip_dir):
+        with open(path) as f:
+            data = json.load(f)
+        corpus.add_zip(data)
+        if previous:
+            previous_sizes[path.stem] = minified_size(data)
+    if not corpus.files:
+        print(f"Error: no ZIP files in {zip_dir}")
+        raise SystemExit(1)
+    print(f"Scanned {corpus.files} ZIP files in {time.perf_counter() - start:.1f}s: "
+          f"{len(corpus.keys)} distinct keys, {len(corpus.values)} distinct values")
+
+    key_data, value_data = build_dictionary(corpus, previous, args.max_keys, args.max_values)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_json(output_dir / 'key_mapping.json', key_data)
+    write_json(output_dir / 'value_mapping.json', value_data)
+    changed = not previous or previous[0].get('version') != key_data['version']
+    dictionary_size = sum((output_dir / name).stat().st_size for name in ['key_mapping.json', 'value_mapping.json'])
+    print(f"Dictionary v{key_data['version']} ({'new' if changed else 'unchanged'}): "
+          f"{len(key_data['mapping'])} keys, "
+          + ', '.join(f"{len(value_data[c])} {c}" for c in CODE_PREFIXES)
+          + f" - {dictionary_size / 1024:.1f} KB, fetched once per version")
+
+    report = size_report(zip_dir, minifier.load_zip_states(zip_dir), previous_sizes, output_dir)
+    print(f"\n{'State':6s} {'ZIPs':>6s} {'Original':>11s} {'Previous':>11s} {'Minified':>11s} {'Reduction':>10s}")
+    for state, totals in sorted(report.items()):
+        previous_mb = f"{totals['previous'] / 1024 / 1024:8.2f} MB" if previous else f"{'-':>11s}"
+        reduction = (1 - totals['minified'] / totals['original']) * 100 if totals['original'] else 0
+        print(f"{state:6s} {totals['zips']:6d} {totals['original'] / 1024 / 1024:8.2f} MB {previous_mb} "
+              f"{totals['minified'] / 1024 / 1024:8.2f} MB {reduction:9.1f}%")
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -3,32 +3,82 @@
 Minify Medicare plan JSON files for a state with _minified.json suffix.
 Creates files in static_api/medicare/zip_minified/ directory.
 
-Usage: python3 minify_state_endpoint.py MD
+ZIPs are selected through static_api/medicare/zip_states.json, a ZIP -> states
+index that is refreshed from the headers of new or changed ZIP files only, and
+minified across a process pool. Each file is read once; every string value is
+translated with a single lookup in VALUE_LOOKUP.
+
+The mappings are learned from the corpus by build_dictionary.py and versioned;
+each minified file names the dictionary that decodes it in "dv", and a run
+publishes the mappings both to mappings/ and to the immutable mappings/v<N>/.
+
+--layout shared writes static_api/medicare/zip_shared/ instead: one plan table
+per state, plans_<ST>.<hash>.json, named by its content so it can be cached
+for good, and per-ZIP files holding only the ZIP's counties, the table name
+("tb") and the indices of its plans in that table ("p"). ZIPs go with the table
+of their primary state; a ZIP without one is skipped. A table is removed once
+no ZIP file in the directory names it any more. The default --layout inline keeps writing
+zip_minified/<zip>_minified.json with every plan's body inline.
+
+Usage: python3 minify_state_endpoint.py MD [DE VA ...] [--workers N] [--layout shared]
+       python3 minify_state_endpoint.py --all
 """
 
+import argparse
+import hashlib
 import json
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Load mappings
 SCRIPT_DIR = Path(__file__).parent
-with open(SCRIPT_DIR / 'key_mapping.json') as f:
-    KEY_MAPPING = json.load(f)['mapping']
+STATIC_DIR = SCRIPT_DIR.parent / 'static_api' / 'medicare'
+ZIP_STATES_FILE = 'zip_states.json'
+OUTPUT_DIRS = {'inline': 'zip_minified', 'shared': 'zip_shared'}
+ZIP_FILE_RE = re.compile(r'\d{5}\.json')
+
+# The builder writes the header fields first, so they are in the first few KB
+HEADER_BYTES = 16384
+STATES_RE = re.compile(r'"states"\s*:\s*(\[[^\]]*\])')
+PRIMARY_STATE_RE = re.compile(r'"primary_state"\s*:\s*("[^"]*"|null)')
+
+MAPPING_DIR = SCRIPT_DIR
+MAPPING_VERSION = None  # Set once the mapping files are loaded
+KEY_MAPPING = VALUE_LOOKUP = NETWORK_TYPE_REVERSE = {}
+
 
-with open(SCRIPT_DIR / 'value_mapping.json') as f:
-    value_data = json.load(f)
-    VALUE_MAPPING = value_data['values']
-    ORG_MAPPING = value_data['organizations']
-    TYPE_MAPPING = value_data['plan_types']
-    ADDR_MAPPING = value_data['addresses']
-    NETWORK_TYPE_MAPPING = value_data['network_types']
+def load_mappings(mapping_dir=SCRIPT_DIR):
+    """(Re)load key_mapping.json and value_mapping.json into the lookup tables"""
+    global MAPPING_DIR, MAPPING_VERSION, KEY_MAPPING, VALUE_LOOKUP, NETWORK_TYPE_REVERSE
+    with open(Path(mapping_dir) / 'key_mapping.json') as f:
+        key_data = json.load(f)
 
-# Reverse mappings for lookup
-VALUE_REVERSE = {v: k for k, v in VALUE_MAPPING.items()}
-ORG_REVERSE = {v: k for k, v in ORG_MAPPING.items()}
-TYPE_REVERSE = {v: k for k, v in TYPE_MAPPING.items()}
-ADDR_REVERSE = {v: k for k, v in ADDR_MAPPING.items()}
-NETWORK_TYPE_REVERSE = {v: k for k, v in NETWORK_TYPE_MAPPING.items()}
+    with open(Path(mapping_dir) / 'value_mapping.json') as f:
+        value_data = json.load(f)
+
+    # Reverse mappings for lookup
+    value_reverse = {v: k for k, v in value_data['values'].items()}
+    org_reverse = {v: k for k, v in value_data['organizations'].items()}
+    type_reverse = {v: k for k, v in value_data['plan_types'].items()}
+    addr_reverse = {v: k for k, v in value_data['addresses'].items()}
+
+    # One table for every string value, with the precedence of the old cascade:
+    # values, then organizations, then plan types, then addresses
+    VALUE_LOOKUP = {**addr_reverse, **type_reverse, **org_reverse, **value_reverse}
+    NETWORK_TYPE_REVERSE = {v: k for k, v in value_data['network_types'].items()}
+    KEY_MAPPING = key_data['mapping']
+    MAPPING_VERSION = key_data.get('version', 0)  # Hand-curated files predate versions
+    MAPPING_DIR = Path(mapping_dir)
+    return MAPPING_VERSION
+
+
+try:
+    load_mappings()
+except FileNotFoundError:
+    pass  # Run build_dictionary.py first; minify_zip_file() raises until then
 
 
 def extract_network_type(plan_name):
@@ -52,48 +102,27 @@ def minify_value(value):
     """Convert a value to its minified form if it exists in mappings."""
     if not isinstance(value, str):
         return value
-    
-    # Check value mappings
-    if value in VALUE_REVERSE:
-        return VALUE_REVERSE[value]
-    
-    # Check organization mappings
-    if value in ORG_REVERSE:
-        return ORG_REVERSE[value]
-    
-    # Check type mappings
-    if value in TYPE_REVERSE:
-        return TYPE_REVERSE[value]
-    
-    # Check address mappings
-    if value in ADDR_REVERSE:
-        return ADDR_REVERSE[value]
-    
-    return value
+    return VALUE_LOOKUP.get(value, value)
 
 
 def minify_object(obj):
     """Recursively minify an object."""
     if isinstance(obj, dict):
-        result = {}
-        for key, value in obj.items():
-            min_key = minify_key(key)
-            min_value = minify_object(value)
-            result[min_key] = min_value
-        return result
+        return {KEY_MAPPING.get(key, key): minify_object(value) for key, value in obj.items()}
     elif isinstance(obj, list):
         return [minify_object(item) for item in obj]
     elif isinstance(obj, str):
-        return minify_value(obj)
+        return VALUE_LOOKUP.get(obj, obj)
     else:
         return obj
 
 
-def minify_zip_file(input_path, output_path):
-    """Minify a ZIP JSON file."""
-    with open(input_path) as f:
-        data = json.load(f)
-    
+def minify_zip_data(data):
+    """Minified form of a loaded ZIP JSON file."""
+    if MAPPING_VERSION is None:
+        raise FileNotFoundError(2, 'No mapping files loaded - run build_dictionary.py',
+                                str(SCRIPT_DIR / 'key_mapping.json'))
+
     # Minify the structure
     minified = {
         'z': data['zip_code'],
@@ -103,7 +132,8 @@ def minify_zip_file(input_path, output_path):
         'ps': data.get('primary_state'),
         'c': [],  # counties
         'p': [],  # plans
-        'pc': data.get('plan_count', 0)
+        'pc': data.get('plan_count', 0),
+        'dv': MAPPING_VERSION  # Dictionary version that decodes this file
     }
     
     # Minify counties
@@ -128,6 +158,13 @@ def minify_zip_file(input_path, output_path):
             min_plan['pt'] = network_type
         
         minified['p'].append(min_plan)
+    return minified
+
+
+def minify_zip_file(input_path, output_path):
+    """Minify a ZIP JSON file."""
+    with open(input_path) as f:
+        minified = minify_zip_data(json.load(f))
     
     # Write minified output (compact JSON)
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -137,95 +174,284 @@ def minify_zip_file(input_path, output_path):
     return input_path.stat().st_size, output_path.stat().st_size
 
 
-def get_state_zips(state):
-    """Get list of ZIP codes for a state by scanning ZIP files."""
-    zip_dir = Path('../static_api/medicare/zip')
-    state_zips = []
-    
-    print(f"  Scanning ZIP files in {zip_dir}...")
-    
-    for zip_file in zip_dir.glob('*.json'):
-        try:
-            with open(zip_file) as f:
-                data = json.load(f)
-                # Check if this state is in the states list
-                if state in data.get('states', []) or state == data.get('primary_state'):
-                    state_zips.append(zip_file.stem)
-        except Exception as e:
-            continue
-    
-    return sorted(state_zips)
+def read_zip_states(zip_file):
+    """(states, primary_state) of a ZIP file, from its header when possible"""
+    with open(zip_file, 'rb') as f:
+        header = f.read(HEADER_BYTES).decode('utf-8', errors='ignore')
+    states = STATES_RE.search(header)
+    primary_state = PRIMARY_STATE_RE.search(header)
+    if states and primary_state:
+        return json.loads(states.group(1)), json.loads(primary_state.group(1))
+
+    with open(zip_file) as f:
+        data = json.load(f)
+    return data.get('states', []), data.get('primary_state')
 
 
-def main():
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python minify_state_endpoint.py <state_abbrev>")
-        print("Example: python minify_state_endpoint.py MD")
-        sys.exit(1)
-    
-    state = sys.argv[1].upper()
-    
-    # Input/output directories
-    input_dir = Path('../static_api/medicare/zip')
-    output_dir = Path('../static_api/medicare/zip_minified')
+def load_zip_states(zip_dir=None, index_path=None):
+    """{zip: {'states', 'primary_state', 'size', 'mtime_ns'}} for every ZIP file
+
+    Entries whose file size and mtime are unchanged come from the index file;
+    only new or changed files are read, and the refreshed index is saved.
+    """
+    zip_dir = Path(zip_dir or STATIC_DIR / 'zip')
+    index_path = Path(index_path or zip_dir.parent / ZIP_STATES_FILE)
+    try:
+        previous = json.loads(index_path.read_text())['zips']
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    zips = {}
+    refreshed = 0
+    for zip_file in sorted(zip_dir.glob('*.json')):
+        if not ZIP_FILE_RE.fullmatch(zip_file.name):
+            continue  # Variants like 29401_ebony.json
+        stat = zip_file.stat()
+        entry = previous.get(zip_file.stem)
+        if not entry or (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            try:
+                states, primary_state = read_zip_states(zip_file)
+            except (OSError, ValueError) as e:
+                print(f"  Error reading {zip_file.name}: {e}")
+                continue
+            entry = {'states': states, 'primary_state': primary_state,
+                     'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            refreshed += 1
+        zips[zip_file.stem] = entry
+
+    if refreshed or zips.keys() != previous.keys():
+        tmp_path = index_path.with_name(f'.{index_path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps({'format': 1, 'zips': zips}, separators=(',', ':')))
+        os.replace(tmp_path, index_path)
+        print(f"  ZIP index {index_path}: {refreshed} of {len(zips)} ZIP files read")
+    return zips
+
+
+def get_state_zips(state, zip_states=None):
+    """Get list of ZIP codes for a state from the ZIP -> states index."""
+    if zip_states is None:
+        zip_states = load_zip_states()
+    return sorted(
+        zip_code for zip_code, entry in zip_states.items()
+        if state in entry['states'] or state == entry['primary_state']
+    )
+
+
+def minify_job(zip_code, input_dir, output_dir):
+    """Minify one ZIP in a worker: (zip_code, original size, minified size, error)"""
+    try:
+        orig_size, min_size = minify_zip_file(input_dir / f'{zip_code}.json',
+                                              output_dir / f'{zip_code}_minified.json')
+        return zip_code, orig_size, min_size, None
+    except Exception as e:
+        return zip_code, 0, 0, str(e)
+
+
+def minify_shared_job(zip_code, input_dir):
+    """Minify one ZIP in a worker, split from its plans: (zip_code, header, plan JSONs, original size, error)"""
+    input_file = input_dir / f'{zip_code}.json'
+    try:
+        with open(input_file) as f:
+            minified = minify_zip_data(json.load(f))
+        plans = [json.dumps(plan, separators=(',', ':')) for plan in minified.pop('p')]
+        return zip_code, minified, plans, input_file.stat().st_size, None
+    except Exception as e:
+        return zip_code, None, [], 0, str(e)
+
+
+def write_atomic(path, text):
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+def write_plan_table(output_dir, state, plans):
+    """Write a state's plan table under its content hash; returns (file name, size)"""
+    body = f'{{"dv":{json.dumps(MAPPING_VERSION)},"st":{json.dumps(state)},"p":[{",".join(plans)}]}}'
+    name = f'plans_{state}.{hashlib.sha256(body.encode()).hexdigest()[:16]}.json'
+    if not (output_dir / name).exists():
+        write_atomic(output_dir / name, body)
+    return name, len(body)
+
+
+def prune_plan_tables(output_dir, written):
+    """Remove plan tables that no ZIP file points at; returns their names
+
+    written is {zip_code: table name} for the ZIP files of this run. The other
+    ZIP files - other states', and ones that failed this run and kept their
+    previous version - are only read if there is an older table to decide on.
+    """
+    referenced = set(written.values())
+    old_tables = [table for table in output_dir.glob('plans_*.json') if table.name not in referenced]
+    if old_tables:
+        for zip_file in output_dir.glob('*.json'):
+            if ZIP_FILE_RE.fullmatch(zip_file.name) and zip_file.stem not in written:
+                try:
+                    referenced.add(json.loads(zip_file.read_text())['tb'])
+                except (OSError, ValueError, KeyError):
+                    continue
+    removed = sorted(table.name for table in old_tables if table.name not in referenced)
+    for name in removed:
+        (output_dir / name).unlink()
+    return removed
+
+
+def publish_mappings(static_dir=STATIC_DIR):
+    """Copy the loaded dictionary to mappings/ and mappings/v<N>/; returns the paths written
+
+    mappings/ is the current dictionary, mappings/v<N>/ never changes so
+    clients can cache it forever. Files already up to date are not rewritten.
+    """
+    written = []
+    for mapping_dir in [Path(static_dir) / 'mappings', Path(static_dir) / 'mappings' / f'v{MAPPING_VERSION}']:
+        mapping_dir.mkdir(parents=True, exist_ok=True)
+        for name in ['key_mapping.json', 'value_mapping.json']:
+            data = (MAPPING_DIR / name).read_bytes()
+            target = mapping_dir / name
+            if not target.exists() or target.read_bytes() != data:
+                tmp_path = target.with_name(f'.{name}.{os.getpid()}.tmp')
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, target)
+                written.append(str(target))
+    return written
+
+
+def map_jobs(fn, jobs, workers):
+    """Results of fn over the job columns, in order, from a process pool when workers > 1"""
+    if workers == 1:
+        yield from map(fn, *jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_mappings, initargs=(MAPPING_DIR,)) as executor:
+        yield from executor.map(fn, *jobs, chunksize=32)
+
+
+def minify_zips(zip_codes, input_dir, output_dir, workers=1, layout='inline'):
+    """Minify ZIP files across a process pool; returns totals and throughput"""
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Get ZIP codes for this state
-    print(f"Finding ZIP codes for {state}...")
-    state_zips = get_state_zips(state)
-    
-    if not state_zips:
-        print(f"Error: No ZIP codes found for {state}")
-        sys.exit(1)
-    
-    print(f"Minifying {len(state_zips)} ZIP files for {state}...")
-    
-    total_original = 0
-    total_minified = 0
-    processed = 0
-    
-    for i, zip_code in enumerate(state_zips, 1):
-        input_file = input_dir / f'{zip_code}.json'
-        output_file = output_dir / f'{zip_code}_minified.json'
-        
-        if not input_file.exists():
+    workers = max(1, min(workers, len(zip_codes)))
+    totals = {'processed': 0, 'failed': 0, 'original': 0, 'minified': 0}
+    start = time.perf_counter()
+
+    if layout == 'inline':
+        jobs = (zip_codes, [input_dir] * len(zip_codes), [output_dir] * len(zip_codes))
+        results = ((zip_code, None, None, orig_size, min_size, error)
+                   for zip_code, orig_size, min_size, error in map_jobs(minify_job, jobs, workers))
+    else:
+        jobs = (zip_codes, [input_dir] * len(zip_codes))
+        results = ((zip_code, header, plans, orig_size, 0, error)
+                   for zip_code, header, plans, orig_size, error in map_jobs(minify_shared_job, jobs, workers))
+
+    tables = {}  # state -> {plan JSON: index in the state's table}
+    zip_plans = {}  # zip_code -> (state, header, plan indices)
+    for i, (zip_code, header, plans, orig_size, min_size, error) in enumerate(results, 1):
+        if header is not None and not header['ps']:
+            error = 'no primary_state, so no plan table to point at'
+        if error:
+            totals['failed'] += 1
+            print(f"  Error processing {zip_code}: {error}")
             continue
-        
-        try:
-            orig_size, min_size = minify_zip_file(input_file, output_file)
-            total_original += orig_size
-            total_minified += min_size
-            processed += 1
-            
-            if i % 50 == 0:
-                print(f"  Processed {i}/{len(state_zips)}...")
-        except Exception as e:
-            print(f"  Error processing {zip_code}: {e}")
-    
+        totals['processed'] += 1
+        totals['original'] += orig_size
+        totals['minified'] += min_size
+        if header is not None:
+            table = tables.setdefault(header['ps'], {})
+            indices = [table.setdefault(plan, len(table)) for plan in plans]
+            zip_plans[zip_code] = (header['ps'], header, indices)
+            totals['inline'] = totals.get('inline', 0) + len(json.dumps(header, separators=(',', ':'))) \
+                + sum(len(plan) + 1 for plan in plans) + len(',"p":[]')
+        if i % 500 == 0:
+            print(f"  Processed {i}/{len(zip_codes)}...")
+
+    if layout == 'shared':
+        totals['tables'] = {}
+        for state, table in tables.items():
+            name, size = write_plan_table(output_dir, state, list(table))
+            totals['tables'][state] = {'name': name, 'plans': len(table), 'size': size}
+            totals['minified'] += size
+        totals['zip_bytes'] = 0
+        written = {}
+        for zip_code, (state, header, indices) in zip_plans.items():
+            written[zip_code] = totals['tables'][state]['name']
+            body = json.dumps(dict(header, tb=written[zip_code], p=indices), separators=(',', ':'))
+            write_atomic(output_dir / f'{zip_code}.json', body)
+            totals['zip_bytes'] += len(body)
+        totals['minified'] += totals['zip_bytes']
+        totals['removed_tables'] = prune_plan_tables(output_dir, written)
+
+    elapsed = time.perf_counter() - start
+    totals['seconds'] = elapsed
+    totals['files_per_second'] = totals['processed'] / elapsed if elapsed > 0 else 0
+    totals['mb_per_second'] = totals['original'] / 1024 / 1024 / elapsed if elapsed > 0 else 0
+    totals['workers'] = workers
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Minify static ZIP files for one or more states')
+    parser.add_argument('states', nargs='*', help='State abbreviations, e.g. MD DE')
+    parser.add_argument('--all', action='store_true', help='Minify every ZIP file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    parser.add_argument('--input', default=str(STATIC_DIR / 'zip'), help='ZIP JSON directory')
+    parser.add_argument('--output', help='Minified output directory (default: zip_minified/ or zip_shared/)')
+    parser.add_argument('--layout', choices=sorted(OUTPUT_DIRS), default='inline',
+                        help='inline: plans in every ZIP file; shared: per-state plan tables + plan indices')
+    args = parser.parse_args(argv)
+    if not args.states and not args.all:
+        parser.error('give state abbreviations (e.g. MD) or --all')
+    if MAPPING_VERSION is None:
+        parser.error(f'no mapping files in {SCRIPT_DIR} - run build_dictionary.py first')
+
+    states = [state.upper() for state in args.states]
+    input_dir = Path(args.input)
+    output_dir = Path(args.output or STATIC_DIR / OUTPUT_DIRS[args.layout])
+
+    # Get ZIP codes for these states; a ZIP in two of them is minified once.
+    # A state's plan table must cover every ZIP pointing at it, so the shared
+    # layout takes the ZIPs whose primary state was asked for
+    print(f"Finding ZIP codes for {', '.join(states) or 'all states'}...")
+    zip_states = load_zip_states(input_dir)
+    if args.all:
+        state_zips = sorted(zip_states)
+    elif args.layout == 'shared':
+        state_zips = sorted(zip_code for zip_code, entry in zip_states.items() if entry['primary_state'] in states)
+    else:
+        state_zips = sorted({zip_code for state in states for zip_code in get_state_zips(state, zip_states)})
+
+    if not state_zips:
+        print(f"Error: No ZIP codes found for {', '.join(states) or 'any state'}")
+        raise SystemExit(1)
+
+    print(f"Minifying {len(state_zips)} ZIP files...")
+    totals = minify_zips(state_zips, input_dir, output_dir, args.workers, args.layout)
+    total_original, total_minified = totals['original'], totals['minified']
     reduction = (1 - total_minified / total_original) * 100 if total_original > 0 else 0
-    
+
     print(f"\nComplete!")
-    print(f"  Processed: {processed} ZIP files")
+    print(f"  Processed: {totals['processed']} ZIP files" + (f" ({totals['failed']} failed)" if totals['failed'] else ''))
     print(f"  Original size: {total_original / 1024:.1f} KB")
     print(f"  Minified size: {total_minified / 1024:.1f} KB")
     print(f"  Reduction: {reduction:.1f}%")
+    print(f"  Throughput: {totals['files_per_second']:.0f} files/s, {totals['mb_per_second']:.1f} MB/s "
+          f"({totals['seconds']:.2f}s, {totals['workers']} workers)")
+    if args.layout == 'shared' and totals['processed']:
+        for state, table in sorted(totals['tables'].items()):
+            print(f"  {table['name']}: {table['plans']} plans, {table['size'] / 1024:.1f} KB")
+        print(f"  Per lookup: {totals['zip_bytes'] / totals['processed'] / 1024:.2f} KB ZIP file "
+              f"(inline: {totals['inline'] / totals['processed'] / 1024:.1f} KB) + its state's table, cached once")
     print(f"\nOutput directory: {output_dir}")
     
-    # Copy mapping files to the minified directory
-    import shutil
-    mapping_dir = output_dir.parent / 'mappings'
-    mapping_dir.mkdir(exist_ok=True)
-    shutil.copy(SCRIPT_DIR / 'key_mapping.json', mapping_dir)
-    shutil.copy(SCRIPT_DIR / 'value_mapping.json', mapping_dir)
-    print(f"Mapping files copied to {mapping_dir}")
+    publish_mappings(output_dir.parent)
+    print(f"Mapping files (dictionary v{MAPPING_VERSION}) copied to {output_dir.parent / 'mappings'}")
     
     # Show example endpoint
     if state_zips:
         example_zip = state_zips[0]
         print(f"\nExample endpoint:")
-        print(f"  https://medicare.purlpal-api.com/medicare/zip_minified/{example_zip}_minified.json")
+        if args.layout == 'shared':
+            print(f"  https://medicare.purlpal-api.com/medicare/zip_shared/{example_zip}.json")
+        else:
+            print(f"  https://medicare.purlpal-api.com/medicare/zip_minified/{example_zip}_minified.json")
+    return totals
 
 
 if __name__ == '__main__':
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Decide when a plan details page has finished rendering.
+
+The scrapers used to wait for the h1 and the first mct-c-table and then
+sleep a fixed 5 seconds on every page. PageReadiness replaces that sleep:
+it polls a cheap snapshot of the page (document.readyState, number of
+mct-c-table tables and their rows, and the number of network requests the
+page has made so far) and returns as soon as the snapshot has stopped
+changing for `stable_for` seconds - the tables are all there and the network
+has gone quiet. It never waits longer than `ceiling` seconds, which defaults
+to the old fixed sleep, so a slow page is no worse off than before.
+
+Every wait is recorded, so the scrapers can report how long pages actually
+needed and how much time the old fixed sleep would have wasted.
+
+Usage:
+    READINESS = PageReadiness(ceiling=5.0, log_path='page_readiness.jsonl')
+
+    wait.until(EC.presence_of_element_located((By.CLASS_NAME, "mct-c-table")))
+    READINESS.wait(driver, url)
+    html_content = driver.page_source
+    ...
+    print(READINESS.summary())
+"""
+
+import json
+import threading
+import time
+
+FIXED_SLEEP = 5.0  # What every page used to wait after the tables appeared
+
+# One round trip per poll: everything that changes while the page is still rendering
+SNAPSHOT_SCRIPT = """
+const tables = document.querySelectorAll('table.mct-c-table');
+let rows = 0;
+tables.forEach(t => { rows += t.rows.length; });
+const requests = window.performance ? performance.getEntriesByType('resource').length : 0;
+return [document.readyState, tables.length, rows, requests];
+"""
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class PageReadiness:
+    """Wait until the plan tables stop changing, up to a ceiling, and keep timings"""
+
+    def __init__(self, ceiling=FIXED_SLEEP, stable_for=0.75, poll_interval=0.25, log_path=None):
+        self.ceiling = ceiling
+        self.stable_for = stable_for
+        self.poll_interval = poll_interval
+        self.log_path = log_path
+
+        self._lock = threading.Lock()
+        self.waits = []      # Seconds each page needed after its first table appeared
+        self.ceiling_hits = 0
+
+    def snapshot(self, driver):
+        return tuple(driver.execute_script(SNAPSHOT_SCRIPT))
+
+    def wait(self, driver, url=None):
+        """Block until the page is stable or the ceiling is reached
+
+        Returns the seconds waited.
+        """
+        start = time.monotonic()
+        deadline = start + self.ceiling
+        last = self.snapshot(driver)
+        stable_since = start
+
+        while True:
+            now = time.monotonic()
+            if last[0] == 'complete' and now - stable_since >= self.stable_for:
+                hit_ceiling = False
+                break
+            if now >= deadline:
+                hit_ceiling = True
+                break
+            time.sleep(min(self.poll_interval, deadline - now))
+            current = self.snapshot(driver)
+            if current != last:
+                last = current
+                stable_since = time.monotonic()
+
+        waited = time.monotonic() - start
+        self.record(waited, hit_ceiling, url, tables=last[1])
+        return waited
+
+    def record(self, waited, hit_ceiling, url=None, tables=None):
+        with self._lock:
+            self.waits.append(waited)
+            self.ceiling_hits += hit_ceiling
+            if self.log_path:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps({
+                        'url': url,
+                        'wait_s': round(waited, 3),
+                        'ceiling_hit': hit_ceiling,
+                        'tables': tables,
+                        'time': time.time()
+                    }) + '\n')
+
+    def summary(self):
+        """One line of readiness statistics for the scraper's final report"""
+        with self._lock:
+            waits = list(self.waits)
+            ceiling_hits = self.ceiling_hits
+        if not waits:
+            return "Page readiness: no pages loaded"
+        saved = sum(FIXED_SLEEP - w for w in waits)
+        return (f"Page readiness: {len(waits)} pages, waited avg {sum(waits) / len(waits):.2f}s "
+                f"(p50 {percentile(waits, 0.5):.2f}s, p95 {percentile(waits, 0.95):.2f}s, "
+                f"ceiling {self.ceiling:.1f}s hit {ceiling_hits}x); "
+                f"{saved:.0f}s saved vs fixed {FIXED_SLEEP:.0f}s sleep")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Parse the 35 missing SC plan HTML files and update their JSON data.
+Parse the missing SC plan HTML files (saved by scrape_missing_raw.py) and update their JSON data.
 """
 import json
 from pathlib import Path
@@ -9,18 +9,6 @@ from bs4 import BeautifulSoup
 RAW_DIR = Path('raw_sc_plans')
 JSON_DIR = Path('scraped_json_all')
 
-MISSING_PLANS = [
-    "H3146_036_0", "H3146_038_0", "H3146_040_0", "H5216_466_0",
-    "H5521_140_0", "H5521_245_0", "H5521_249_0", "H5521_251_0",
-    "H5521_319_0", "H5521_500_0", "H5525_049_0", "H6345_002_0",
-    "H7020_010_1", "H7020_010_2", "H7020_011_1", "H7020_011_2",
-    "H7849_136_1", "H7849_136_2", "H8003_001_0", "H8003_002_0",
-    "H8003_004_0", "H8003_005_0", "H8145_069_0", "H8176_004_1",
-    "S4802_070_0", "S4802_144_0", "S5601_018_0", "S5617_218_0",
-    "S5617_359_0", "S5884_134_0", "S5884_155_0", "S5884_188_0",
-    "S5921_354_0", "S5921_391_0", "S5953_001_0"
-]
-
 def extract_table_data(soup, section_id):
     """Extract data from a table section."""
     section = soup.find('div', id=section_id)
@@ -147,15 +135,16 @@ def main():
     print("="*80)
     print("PARSING MISSING SC PLAN HTML FILES")
     print("="*80)
-    print(f"Plans to parse: {len(MISSING_PLANS)}\n")
+    missing_plans = sorted(f.stem for f in RAW_DIR.glob('*.html'))
+    print(f"Plans to parse: {len(missing_plans)}\n")
     
     success = 0
-    for plan_id in MISSING_PLANS:
+    for plan_id in missing_plans:
         if parse_plan(plan_id):
             success += 1
     
     print(f"\n{'='*80}")
-    print(f"PARSING COMPLETE: {success}/{len(MISSING_PLANS)} successful")
+    print(f"PARSING COMPLETE: {success}/{len(missing_plans)} successful")
     print(f"{'='*80}\n")
     
     # Final count
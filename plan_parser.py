@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Shared parser for Medicare Plan Finder plan detail pages.
+
+Every scraper used to carry its own copy of extract_plan_data, each parsing
+the whole page with BeautifulSoup's pure-Python html.parser, rewriting every
+<br> in the document and recompiling its regexes per row. This module parses
+with lxml when it is installed (falling back to BeautifulSoup otherwise),
+only visits the PlanDetailsPagePlanInfo header and the mct-c-table tables,
+treats <br> as a newline while collecting a cell's text, and compiles its
+patterns once.
+
+The default output is identical to the original scrape_multithreaded.py
+parser. The variants the other scrapers grew are kept as options:
+
+    extract_plan_data(html)                                  # scrape_multithreaded, scrape_all_plans
+    extract_plan_data(html, categorize=categorize_table_legacy)  # scrape_optimized and friends
+    extract_plan_data(html, cell_text=cell_text_compact)     # scrape_all_plans_parallel
+    extract_plan_data(html, cell_text=cell_text_stripped)    # parse_plan_html
+
+The variants match their old copies except that <script> text inside a cell
+is no longer picked up, and a <br> inside a header list item always reads as
+a newline.
+
+Benchmark: python benchmark_plan_parser.py
+"""
+
+import re
+
+try:
+    from lxml import etree
+except ImportError:  # BeautifulSoup fallback
+    etree = None
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+BACKEND = 'lxml' if etree is not None else 'bs4'
+
+# Bump whenever a change alters the parsed output, so reprocess_html.py
+# knows to reparse the saved HTML corpus
+PARSER_VERSION = 1
+
+HELP_TEXT_RE = re.compile(r"What's.*?\?")
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+NEWLINES_RE = re.compile(r'\n+')
+
+# Stands in for a <br> in the list of text pieces collected from an element
+BR = object()
+
+# BeautifulSoup's get_text() skips the text inside these elements
+SKIPPED_TAGS = {'script', 'style', 'template'}
+
+if etree is not None:
+    _HTML_PARSER = etree.HTMLParser(encoding='utf-8')
+    _PLAN_INFO_XPATH = etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' PlanDetailsPagePlanInfo ')]"
+    )
+    _TABLES_XPATH = etree.XPath(
+        "//table[contains(concat(' ', normalize-space(@class), ' '), ' mct-c-table ')]"
+    )
+
+
+def _lxml_parts(element, parts):
+    """Text pieces under an lxml element in document order, <br> as BR"""
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        if isinstance(child.tag, str):  # Comments and PIs have a function as tag
+            if child.tag == 'br':
+                parts.append(BR)
+            elif child.tag not in SKIPPED_TAGS:
+                _lxml_parts(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    return parts
+
+
+def _bs4_parts(tag, parts):
+    """Text pieces under a BeautifulSoup tag in document order, <br> as BR"""
+    for child in tag.children:
+        if isinstance(child, Tag):
+            if child.name == 'br':
+                parts.append(BR)
+            else:
+                _bs4_parts(child, parts)
+        elif type(child) in (NavigableString, CData):  # Not comments, scripts etc.
+            parts.append(str(child))
+    return parts
+
+
+def text_strip(parts):
+    """Like get_text(strip=True): stripped pieces joined, <br> dropped"""
+    return ''.join(part.strip() for part in parts if part is not BR)
+
+
+def text_raw(parts):
+    """Like get_text() after replacing each <br> with a newline"""
+    return ''.join('\n' if part is BR else part for part in parts)
+
+
+def cell_text_lines(parts):
+    """One line per text piece, blank lines collapsed (the original cell format)"""
+    text = '\n'.join('\n' if part is BR else part for part in parts).strip()
+    return BLANK_LINES_RE.sub('\n', text)
+
+
+def cell_text_compact(parts):
+    """Stripped pieces joined directly, lines only at <br> (scrape_all_plans_parallel)"""
+    text = ''.join('\n' if part is BR else part.strip() for part in parts)
+    return NEWLINES_RE.sub('\n', text).strip()
+
+
+def cell_text_stripped(parts):
+    """get_text(strip=True) of the cell, <br> dropped (parse_plan_html)"""
+    return text_strip(parts)
+
+
+def categorize_table(plan_data, table_title, table_data):
+    """File a table into plan_data by keywords in its lowercased caption"""
+    title_lower = table_title.lower()
+
+    if 'premium' in title_lower:
+        plan_data['premiums'].update(table_data)
+    elif 'deductible' in title_lower:
+        plan_data['deductibles'].update(table_data)
+    elif 'maximum you pay' in title_lower or 'moop' in title_lower:
+        plan_data['maximum_out_of_pocket'].update(table_data)
+    elif 'contact' in title_lower or 'address' in title_lower:
+        plan_data['contact_info'].update(table_data)
+    elif 'drug' in title_lower or 'pharmacy' in title_lower or 'tier' in title_lower or 'part b drug' in title_lower:
+        if 'drug_tables' not in plan_data['drug_coverage']:
+            plan_data['drug_coverage']['drug_tables'] = {}
+        plan_data['drug_coverage']['drug_tables'][table_title] = table_data
+    elif any(keyword in title_lower for keyword in ['hearing', 'dental', 'vision', 'fitness', 'transportation']):
+        plan_data['extra_benefits'][table_title] = table_data
+    else:
+        plan_data['benefits'][table_title] = table_data
+
+
+def categorize_table_legacy(plan_data, table_title, table_data):
+    """File a table by exact caption words (scrape_optimized.py and the batch/stealth scrapers)"""
+    if 'Premiums' in table_title:
+        plan_data['premiums'].update(table_data)
+    elif 'Deductibles' in table_title:
+        plan_data['deductibles'].update(table_data)
+    elif 'Maximum you pay' in table_title:
+        plan_data['maximum_out_of_pocket'].update(table_data)
+    elif 'Contact Information' in table_title:
+        plan_data['contact_info'].update(table_data)
+    elif 'Drug' in table_title:
+        plan_data['drug_coverage'][table_title] = table_data
+    elif 'Extra' in table_title or 'Additional' in table_title:
+        plan_data['extra_benefits'][table_title] = table_data
+    else:
+        plan_data['benefits'][table_title] = table_data
+
+
+def _page_lxml(html_content):
+    """Text pieces of the plan header and the mct-c-table tables, via lxml"""
+    data = html_content.encode('utf-8')
+    root = etree.fromstring(data, _HTML_PARSER) if data.strip() else None
+    if root is None:
+        return None, []
+
+    def parts(element):
+        return None if element is None else _lxml_parts(element, [])
+
+    header = None
+    sections = _PLAN_INFO_XPATH(root)
+    if sections:
+        section = sections[0]
+        header = (parts(section.find('.//h1')), parts(section.find('.//h2')),
+                  [parts(li) for li in section.iter('li')])
+
+    tables = []
+    for table in _TABLES_XPATH(root):
+        caption = table.find('.//caption')
+        if caption is None:
+            continue
+        rows = []
+        for row in table.iter('tr'):
+            header_cell, cell = row.find('.//th'), row.find('.//td')
+            if header_cell is not None and cell is not None:
+                rows.append((parts(header_cell), parts(cell)))
+        tables.append((parts(caption), rows))
+
+    return header, tables
+
+
+def _page_bs4(html_content):
+    """Text pieces of the plan header and the mct-c-table tables, via BeautifulSoup"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    def parts(tag):
+        return None if tag is None else _bs4_parts(tag, [])
+
+    header = None
+    section = soup.find('div', class_='PlanDetailsPagePlanInfo')
+    if section is not None:
+        header = (parts(section.find('h1')), parts(section.find('h2')),
+                  [parts(li) for li in section.find_all('li')])
+
+    tables = []
+    for table in soup.find_all('table', class_='mct-c-table'):
+        caption = table.find('caption')
+        if caption is None:
+            continue
+        rows = []
+        for row in table.find_all('tr'):
+            header_cell, cell = row.find('th'), row.find('td')
+            if header_cell is not None and cell is not None:
+                rows.append((parts(header_cell), parts(cell)))
+        tables.append((parts(caption), rows))
+
+    return header, tables
+
+
+def extract_plan_data(html_content, categorize=categorize_table, cell_text=cell_text_lines, backend=None):
+    """Extract all plan data from HTML content"""
+    backend = backend or BACKEND
+    # libxml2 normalizes \r\n to \n in text; html.parser keeps it as is
+    if backend == 'lxml' and '\r' not in html_content:
+        header, tables = _page_lxml(html_content)
+    else:
+        header, tables = _page_bs4(html_content)
+
+    plan_data = {
+        'plan_info': {},
+        'premiums': {},
+        'deductibles': {},
+        'maximum_out_of_pocket': {},
+        'contact_info': {},
+        'benefits': {},
+        'drug_coverage': {},
+        'extra_benefits': {}
+    }
+
+    # Extract plan name and ID
+    if header is not None:
+        name_parts, organization_parts, list_items = header
+        if name_parts is not None:
+            plan_data['plan_info']['name'] = text_strip(name_parts)
+        if organization_parts is not None:
+            plan_data['plan_info']['organization'] = text_strip(organization_parts)
+
+        for li_parts in list_items:
+            text = text_raw(li_parts)
+            if 'Plan type:' in text:
+                plan_data['plan_info']['type'] = text.replace('Plan type:', '').strip()
+            elif 'Plan ID:' in text:
+                plan_data['plan_info']['id'] = text.replace('Plan ID:', '').strip()
+
+    # Extract all tables
+    for caption_parts, rows in tables:
+        table_title = text_strip(caption_parts)
+        table_data = {}
+
+        for header_parts, cell_parts in rows:
+            header_text = HELP_TEXT_RE.sub('', text_strip(header_parts)).strip()
+            table_data[header_text] = cell_text(cell_parts)
+
+        categorize(plan_data, table_title, table_data)
+
+    return plan_data
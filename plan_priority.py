@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Rank plans for scraping by how many API lookups would return them without details
+
+The scrapers used to work through state_data/ in file order, and the one-off
+scripts hardcoded which plans mattered (PRIORITY_PLANS, MISSING_PLANS). The
+priority of a plan is computed from data instead:
+
+- reach: how many ZIP codes (and counties) the plan is offered in, from the
+  landscape table. A ZIP lookup returns every plan of the ZIP's counties, so
+  reach is the number of lookups that return the plan. ZIPs are counted from
+  mock_api/<ST>/zip_to_plans.json or zip_to_county_multi.json where they have
+  been built, and estimated as ZIPS_PER_COUNTY per county elsewhere.
+- missing details: whether the county caches (mock_api/<ST>/plans.json or
+  counties/*.json) have scraped details for the plan.
+- staleness: days since the plan's scraped_json_all file was last written.
+
+    priority = reach * (1                                       if details are missing
+                        STALE_WEIGHT * min(1, age / STALE_DAYS)  otherwise)
+
+so scraping capacity goes first to the widest-reaching plans that lookups
+return without details, and then to refreshing the oldest data; a plan with
+details never outranks a missing plan of the same reach.
+
+Usage:
+    python plan_priority.py                     # top 25 plans nationally
+    python plan_priority.py --state "South Carolina" --top 50
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from landscape import load_landscape
+
+# Directories
+api_dir = Path('./mock_api')
+json_dir = Path('./scraped_json_all')
+
+ZIPS_PER_COUNTY = 13  # ~41,000 ZIP codes over ~3,100 counties, for states without a ZIP mapping yet
+STALE_DAYS = 30       # Scraped data reaches full staleness after this many days
+STALE_WEIGHT = 0.5    # Refreshing old data counts at most half as much as filling in missing data
+
+DAY = 86400
+
+
+def state_zip_plans(state_abbr, plans_by_county, statewide_plans):
+    """{plan_id: set of ZIPs} for one state, or None without a ZIP mapping
+
+    plans_by_county maps county names to the plan IDs offered only there,
+    statewide_plans are the state's 'All Counties' plans.
+    """
+    state_dir = api_dir / state_abbr
+    zip_plans_file = state_dir / 'zip_to_plans.json'
+    zip_county_file = state_dir / 'zip_to_county_multi.json'
+    plan_zips = defaultdict(set)
+
+    if zip_plans_file.exists():
+        with open(zip_plans_file, 'r') as f:
+            zip_plans = json.load(f)
+        for zip_code, entry in zip_plans.items():
+            if isinstance(entry, list):  # {zip: [plan_id, ...]}
+                plan_ids = entry
+            else:  # {zip: {'counties': {county: {'plans': [{...}, ...]}}}}
+                plan_ids = [p['contract_plan_segment_id']
+                            for county in entry['counties'].values() for p in county['plans']]
+            for plan_id in plan_ids:
+                plan_zips[plan_id].add(zip_code)
+        return plan_zips
+
+    if zip_county_file.exists():
+        with open(zip_county_file, 'r') as f:
+            zip_counties = json.load(f)
+        for entry in zip_counties:
+            for plan_id in statewide_plans:
+                plan_zips[plan_id].add(entry['zip'])
+            for county in entry['counties']:
+                for plan_id in plans_by_county.get(county['name'], ()):
+                    plan_zips[plan_id].add(entry['zip'])
+        return plan_zips
+
+    return None
+
+
+def plan_reach(table):
+    """{plan_id: {'states': [...], 'counties': n, 'zips': n, 'zips_estimated': bool}} from the landscape"""
+    reach = {}
+    abbrs = table.columns['State Territory Abbreviation']
+    county_names = table.columns['County Name']
+    plan_ids = table.columns['ContractPlanSegmentID']
+
+    for state in table.states():
+        rows = table.row_indexes(state=state)
+        state_abbr = abbrs[rows[0]]
+        counties = [c for c in table.counties(state) if c != 'All Counties']
+
+        plans_by_county = defaultdict(set)
+        statewide_plans = set()
+        for i in rows:
+            if county_names[i] == 'All Counties':
+                statewide_plans.add(plan_ids[i])
+            else:
+                plans_by_county[county_names[i]].add(plan_ids[i])
+
+        plan_counties = defaultdict(int)
+        for plan_id in statewide_plans:
+            plan_counties[plan_id] += len(counties)
+        for county_plans in plans_by_county.values():
+            for plan_id in county_plans - statewide_plans:
+                plan_counties[plan_id] += 1
+
+        plan_zips = state_zip_plans(state_abbr, plans_by_county, statewide_plans)
+        for plan_id, county_count in plan_counties.items():
+            entry = reach.setdefault(plan_id, {'states': [], 'counties': 0, 'zips': 0, 'zips_estimated': False})
+            entry['states'].append(state)
+            entry['counties'] += county_count
+            if plan_zips is None:
+                entry['zips'] += county_count * ZIPS_PER_COUNTY
+                entry['zips_estimated'] = True
+            else:
+                entry['zips'] += len(plan_zips.get(plan_id, ()))
+    return reach
+
+
+def plans_with_details():
+    """Plan IDs the county caches hold scraped details for"""
+    have_details = set()
+    for state_dir in sorted(p for p in api_dir.iterdir() if p.is_dir()) if api_dir.exists() else []:
+        plan_table_file = state_dir / 'plans.json'
+        if plan_table_file.exists():
+            with open(plan_table_file, 'r') as f:
+                plan_table = json.load(f)
+            have_details.update(plan_id for plan_id, plan in plan_table['plans'].items()
+                                if plan['has_scraped_details'])
+            continue
+
+        for county_file in sorted(state_dir.glob('counties/*.json')):
+            with open(county_file, 'r') as f:
+                county_cache = json.load(f)
+            if isinstance(county_cache, list):  # Raw-content caches (SC): every entry was scraped
+                have_details.update(plan['plan_id'] for plan in county_cache)
+            else:
+                have_details.update(plan['summary']['contract_plan_segment_id'] for plan in county_cache['plans']
+                                    if plan['has_scraped_details'])
+    return have_details
+
+
+def last_scraped():
+    """{plan_id: time its scraped_json_all file was last written}"""
+    scraped = {}
+    if not json_dir.exists():
+        return scraped
+    with os.scandir(json_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json'):
+                plan_id = entry.name[:-len('.json')].rsplit('-', 1)[-1]
+                scraped[plan_id] = max(scraped.get(plan_id, 0), entry.stat().st_mtime)
+    return scraped
+
+
+def priority(zips, has_details, scraped_at, now):
+    if not has_details:
+        return float(zips)
+    age_days = (now - scraped_at) / DAY if scraped_at else STALE_DAYS
+    return zips * STALE_WEIGHT * min(1.0, age_days / STALE_DAYS)
+
+
+def compute_priorities(table=None, now=None):
+    """{plan_id: {'priority', 'zips', 'counties', 'states', 'has_details', 'age_days', ...}} for every plan"""
+    table = table or load_landscape()
+    now = now or time.time()
+    have_details = plans_with_details()
+    scraped = last_scraped()
+
+    priorities = {}
+    for plan_id, entry in plan_reach(table).items():
+        has_details = plan_id in have_details
+        scraped_at = scraped.get(plan_id)
+        entry.update({
+            'has_details': has_details,
+            'age_days': round((now - scraped_at) / DAY, 1) if scraped_at else None,
+            'priority': priority(entry['zips'], has_details, scraped_at, now)
+        })
+        priorities[plan_id] = entry
+    return priorities
+
+
+def rank_plans(states=None, missing_only=False, table=None):
+    """Landscape plans, highest priority first, as dicts with the fields the raw scrapers use
+
+    Each has 'plan_id', 'contract', 'plan_num', 'segment', 'name' and its
+    priority entry from compute_priorities.
+    """
+    table = table or load_landscape()
+    priorities = compute_priorities(table)
+    names = table.columns['Plan Name']
+    ranked = []
+    for plan_id, entry in priorities.items():
+        if states and not set(entry['states']) & set(states):
+            continue
+        if missing_only and entry['has_details']:
+            continue
+        contract, plan_num, segment = plan_id.split('_')
+        ranked.append(dict(entry, plan_id=plan_id, contract=contract, plan_num=plan_num, segment=segment,
+                           name=names[table.by_plan[plan_id][0]]))
+    ranked.sort(key=lambda p: (-p['priority'], p['plan_id']))
+    return ranked
+
+
+def missing_plan_ids(states=None):
+    """IDs of the plans without details in the county caches, highest priority first"""
+    return [plan['plan_id'] for plan in rank_plans(states, missing_only=True)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rank plans for scraping by reach, missing details and staleness')
+    parser.add_argument('--state', action='append', help='State/territory name as in the landscape CSV (repeatable)')
+    parser.add_argument('--missing', action='store_true', help='Only plans without details in the county caches')
+    parser.add_argument('--top', type=int, default=25)
+    args = parser.parse_args(argv)
+
+    ranked = rank_plans(args.state, args.missing)
+    print("=" * 80)
+    print(f"SCRAPE PRIORITY - {len(ranked)} plans, "
+          f"{sum(1 for p in ranked if not p['has_details'])} without details")
+    print("=" * 80)
+    for plan in ranked[:args.top]:
+        zips = f"~{plan['zips']}" if plan['zips_estimated'] else str(plan['zips'])
+        status = 'missing' if not plan['has_details'] else f"{plan['age_days']}d old" if plan['age_days'] is not None else 'cached'
+        print(f"{plan['priority']:10.1f}  {plan['plan_id']:14s} {zips:>7s} ZIPs {plan['counties']:4d} counties  "
+              f"{status:10s} {plan['name'][:40]}")
+    return ranked
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Precompressed .br/.gz sidecars for the static API files
+
+Plan JSON is extremely repetitive, so it compresses far better at the maximum
+levels (brotli 11, gzip 9) than a CDN compressing on the fly does - and doing
+it once at build time costs nothing per request. Every static_api/**/*.json
+gets a <name>.json.br and <name>.json.gz next to it; the deploy steps upload
+them with Content-Encoding br / gzip, and the server picks the variant that
+matches the request's Accept-Encoding (negotiate()).
+
+.br needs the brotli package. cloudfront_precompressed.js sends every client
+that accepts br to the .br sidecar, so without brotli precompress() refuses to
+run rather than leave those requests pointing at missing objects; --gzip-only
+writes just the .gz sidecars, for origins that negotiate (api_server.py).
+Sidecars newer than their source are left alone, and sidecars whose source
+is gone are removed (a source given by path, or any under a directory).
+
+Usage:
+    python precompress.py                       # everything under static_api/
+    python precompress.py static_api/medicare/zip_minified --workers 8 --force
+    python precompress.py --gzip-only           # no brotli; not for the CloudFront deploy
+"""
+
+import argparse
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # .gz sidecars only, and only with gzip_only
+    brotli = None
+
+static_dir = Path('./static_api')
+
+BROTLI_QUALITY = 11
+GZIP_LEVEL = 9
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}  # Content-Encoding -> sidecar suffix
+BUILD_FILES = {'zip_states.json'}  # Build bookkeeping, never served
+
+
+def sidecar(path, encoding):
+    return path.with_name(path.name + ENCODINGS[encoding])
+
+
+def compress_file(path, force=False, encodings=tuple(ENCODINGS)):
+    """Write the sidecars of one file; returns (path, size, {encoding: sidecar size}, paths written)"""
+    path = Path(path)
+    stat = path.stat()
+    data = None
+    sizes, written = {}, []
+    for encoding in encodings:
+        target = sidecar(path, encoding)
+        if not force and target.exists() and target.stat().st_mtime_ns >= stat.st_mtime_ns:
+            sizes[encoding] = target.stat().st_size
+            continue
+        if data is None:
+            data = path.read_bytes()
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(data, GZIP_LEVEL, mtime=0)
+        tmp_path = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+        tmp_path.write_bytes(compressed)
+        os.replace(tmp_path, target)
+        sizes[encoding] = len(compressed)
+        written.append(str(target))
+    return str(path), stat.st_size, sizes, written
+
+
+def remove_sidecars(path):
+    """Delete the sidecars of a removed file; returns the paths deleted"""
+    removed = []
+    for encoding in ENCODINGS:
+        target = sidecar(Path(path), encoding)
+        if target.exists():
+            target.unlink()
+            removed.append(str(target))
+    return removed
+
+
+def source_files(paths):
+    """The .json files of the given files and directories (sidecars excluded)"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob('*.json') if p.is_file() and p.name not in BUILD_FILES)
+        elif path.suffix == '.json':
+            yield path
+
+
+def orphan_sidecars(paths):
+    """Sidecars under the given directories whose source file no longer exists"""
+    suffixes = set(ENCODINGS.values())
+    for path in map(Path, paths):
+        if path.is_dir():
+            for target in sorted(path.rglob('*.json.*')):
+                if target.suffix in suffixes and not target.with_suffix('').exists():
+                    yield target
+
+
+def precompress(paths, workers=1, force=False, gzip_only=False):
+    """Compress files in parallel; returns totals with the sidecar paths written or removed
+
+    Raises RuntimeError when brotli is not installed, unless gzip_only.
+    """
+    if brotli is None and not gzip_only:
+        raise RuntimeError('brotli is not installed (pip install brotli): the CloudFront function needs .br '
+                           'sidecars; pass gzip_only / --gzip-only only for origins that negotiate')
+    encodings = ['gzip'] if gzip_only else list(ENCODINGS)
+    sources = list(source_files(paths))
+    files = [p for p in sources if p.exists()]
+    removed = [s for p in sources if not p.exists() for s in remove_sidecars(p)]
+    for target in orphan_sidecars(paths):
+        target.unlink()
+        removed.append(str(target))
+    totals = {'files': len(files), 'raw': 0, 'br': 0, 'gzip': 0, 'changed': removed}
+    workers = max(1, min(workers, len(files)))
+    start = time.perf_counter()
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compress_file, files, [force] * len(files), [encodings] * len(files),
+                                        chunksize=32))
+    else:
+        results = [compress_file(p, force, encodings) for p in files]
+
+    for _, size, sizes, written in results:
+        totals['raw'] += size
+        for encoding, compressed_size in sizes.items():
+            totals[encoding] += compressed_size
+        totals['changed'].extend(written)
+    totals['seconds'] = time.perf_counter() - start
+    return totals
+
+
+def accepted_encodings(accept_encoding):
+    """{encoding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate(path, accept_encoding):
+    """(file to send, Content-Encoding or None) for a request with this Accept-Encoding
+
+    Prefers brotli, then gzip, among the sidecars that exist and the client
+    accepts (q > 0, directly or through '*').
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ENCODINGS:  # br first: smaller
+        q = accepted.get(encoding, accepted.get('*', 0))
+        target = sidecar(Path(path), encoding)
+        if q > 0 and target.exists() and target.stat().st_mtime_ns >= Path(path).stat().st_mtime_ns:
+            return target, encoding
+    return Path(path), None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write .br/.gz sidecars for static API JSON files')
+    parser.add_argument('paths', nargs='*', default=[str(static_dir)], help='Files or directories (default: static_api)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Recompress even up-to-date sidecars')
+    parser.add_argument('--gzip-only', action='store_true',
+                        help='Write only .gz sidecars (not for cloudfront_precompressed.js, which needs .br)')
+    args = parser.parse_args(argv)
+    if brotli is None and not args.gzip_only:
+        parser.error('brotli is not installed - pip install brotli, or --gzip-only for origins that negotiate')
+
+    totals = precompress(args.paths, args.workers, args.force, args.gzip_only)
+    print(f"Precompressed {totals['files']} files in {totals['seconds']:.1f}s "
+          f"({len(totals['changed'])} sidecars written or removed)")
+    if totals['raw']:
+        print(f"  Raw:  {totals['raw'] / 1024 / 1024:.2f} MB")
+        print(f"  gzip: {totals['gzip'] / 1024 / 1024:.2f} MB ({totals['raw'] / max(1, totals['gzip']):.1f}x smaller)")
+        if not args.gzip_only:
+            print(f"  br:   {totals['br'] / 1024 / 1024:.2f} MB ({totals['raw'] / max(1, totals['br']):.1f}x smaller)")
+        else:
+            print("  br:   skipped (--gzip-only)")
+    return totals
+
+
+if __name__ == '__main__':
+    main()
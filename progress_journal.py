@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Crash-safe scraping progress: an append-only journal on top of a snapshot
+
+Rewriting the whole of scraping_progress.json every few plans costs O(N) per
+save (O(N^2) over a national run), and a kill mid-write leaves a truncated
+file. ProgressJournal instead appends one JSON line per plan outcome to
+scraping_progress.journal and fsyncs in batches (every `fsync_every` records
+or `fsync_interval` seconds, whichever comes first), so a crash loses at most
+one unsynced batch and never corrupts what is already on disk.
+
+Compaction folds the journal into the snapshot and truncates it. The
+snapshot keeps the old {'completed': [...], 'failed': [...]} format, so
+anything that reads scraping_progress.json keeps working, and next to it goes
+scraping_progress.idx: the completed plan IDs sorted into flat arrays that
+are mmap'ed and bisected in place (like zip_index.bin), stamped with the
+snapshot's size and mtime.
+
+Resuming therefore costs O(new entries): open maps the index instead of
+parsing the snapshot, replays only the journal on top of it, and cuts a torn
+last line from a crash back to the last newline so the next record starts on
+a line of its own. Startup compaction only happens once the journal has
+grown past `compact_bytes`, or when the index is missing or older than the
+snapshot (which is then parsed once). close() compacts after a run that
+recorded anything.
+
+Usage:
+    with ProgressJournal() as journal:
+        if plan_id not in journal.completed:
+            ...
+            journal.record(plan_id, state_name, success=True)
+"""
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Set
+from pathlib import Path
+
+INDEX_MAGIC = b'PJIX'
+INDEX_FORMAT = 1
+# magic, format, reserved, completed IDs, failed JSON bytes, snapshot size, snapshot mtime_ns
+INDEX_HEADER = struct.Struct('<4sHHIIQq')
+
+
+def build_index(completed, failed, snapshot_stat):
+    """Index bytes: header, (count + 1) u32 offsets, sorted ID bytes, failed list as JSON"""
+    ids = sorted(plan_id.encode('utf-8') for plan_id in completed)
+    offsets = [0]
+    for plan_id in ids:
+        offsets.append(offsets[-1] + len(plan_id))
+    failed_json = json.dumps(failed).encode('utf-8')
+    return b''.join([
+        INDEX_HEADER.pack(INDEX_MAGIC, INDEX_FORMAT, 0, len(ids), len(failed_json),
+                          snapshot_stat.st_size, snapshot_stat.st_mtime_ns),
+        struct.pack(f'<{len(offsets)}I', *offsets),
+        *ids,
+        failed_json,
+    ])
+
+
+class SortedIds:
+    """Read-only view of the sorted plan IDs in index bytes"""
+
+    def __init__(self, buffer=None, count=0):
+        self.count = count
+        if buffer is None:
+            self.offsets, self.ids = [0], b''
+            return
+        view = memoryview(buffer)
+        start = INDEX_HEADER.size + 4 * (count + 1)
+        self.offsets = view[INDEX_HEADER.size:start].cast('I')
+        self.ids = view[start:start + self.offsets[count]]
+
+    def __len__(self):
+        return self.count
+
+    def _id(self, i):
+        return bytes(self.ids[self.offsets[i]:self.offsets[i + 1]])
+
+    def __contains__(self, plan_id):
+        key = plan_id.encode('utf-8')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self.count and self._id(lo) == key
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self._id(i).decode('utf-8')
+
+
+class CompletedPlans(Set):
+    """Completed plan IDs: the mapped index plus the ones completed since"""
+
+    def __init__(self, base=None):
+        self.base = base if base is not None else SortedIds()
+        self.added = set()
+
+    def __contains__(self, plan_id):
+        return plan_id in self.added or plan_id in self.base
+
+    def add(self, plan_id):
+        if plan_id not in self.base:
+            self.added.add(plan_id)
+
+    def __len__(self):
+        return len(self.base) + len(self.added)
+
+    def __iter__(self):
+        return heapq.merge(iter(self.base), sorted(self.added))
+
+
+class ProgressJournal:
+    """Completed and failed plans, persisted as snapshot + append-only journal"""
+
+    def __init__(self, snapshot_path=Path('./scraping_progress.json'), journal_path=None,
+                 fsync_every=10, fsync_interval=2.0, compact_bytes=1024 * 1024):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else self.snapshot_path.with_suffix('.journal')
+        self.index_path = self.snapshot_path.with_suffix('.idx')
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+
+        self.completed = CompletedPlans()
+        self.failed = {}  # plan_id -> {'plan_id', 'state', 'error'}
+        self.replayed = 0  # Journal records applied on open
+        self.recorded = 0  # Records appended since
+        self._file = None
+        self._stale_index = False  # Snapshot had to be parsed; write its index
+        self._pending = 0
+        self._synced_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _apply(self, entry):
+        plan_id = entry['plan_id']
+        if entry['success']:
+            self.completed.add(plan_id)
+            self.failed.pop(plan_id, None)
+        elif plan_id not in self.completed:  # A failed re-scrape keeps the earlier good data
+            self.failed[plan_id] = {'plan_id': plan_id, 'state': entry.get('state'), 'error': entry.get('error')}
+
+    def _read_index(self, snapshot_stat):
+        """(completed IDs, failed) from an index matching the snapshot, or None"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # Missing or empty
+            return None
+        if len(buffer) < INDEX_HEADER.size:
+            return None
+        magic, index_format, _, count, failed_size, size, mtime_ns = INDEX_HEADER.unpack_from(buffer, 0)
+        if magic != INDEX_MAGIC or index_format != INDEX_FORMAT:
+            return None
+        if (size, mtime_ns) != (snapshot_stat.st_size, snapshot_stat.st_mtime_ns):
+            return None  # Snapshot rewritten since (or by something else)
+        failed = json.loads(bytes(buffer[len(buffer) - failed_size:]))
+        return SortedIds(buffer, count), failed
+
+    def _load_snapshot(self):
+        try:
+            snapshot_stat = self.snapshot_path.stat()
+        except FileNotFoundError:
+            return
+        indexed = self._read_index(snapshot_stat)
+        if indexed is not None:
+            ids, failed = indexed
+            self.completed = CompletedPlans(ids)
+            self.failed = {f['plan_id']: f for f in failed}
+            return
+
+        with open(self.snapshot_path, 'r') as f:
+            snapshot = json.load(f)
+        self.completed = CompletedPlans()
+        for plan_id in snapshot['completed']:
+            self.completed.add(plan_id)
+        self.failed = {f['plan_id']: f for f in snapshot['failed'] if f['plan_id'] not in self.completed}
+        self._stale_index = True
+
+    def _replay(self):
+        """Apply the journal; a torn last line is cut off so appends start on a fresh line"""
+        if not self.journal_path.exists():
+            return
+        good_end = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn write from a crash
+                good_end += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(entry)
+                self.replayed += 1
+        if good_end < self.journal_path.stat().st_size:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_end)
+                os.fsync(f.fileno())
+
+    def open(self):
+        self._load_snapshot()
+        self._replay()
+        if self._stale_index or (self.journal_path.exists()
+                                 and self.journal_path.stat().st_size >= self.compact_bytes):
+            self.compact()
+
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        return self
+
+    def record(self, plan_id, state, success, error=None):
+        """Append one plan outcome; a success clears an earlier failure"""
+        entry = {'plan_id': plan_id, 'state': state, 'success': success, 'time': round(time.time(), 3)}
+        if error is not None:
+            entry['error'] = error
+        with self._lock:
+            self._apply(entry)
+            self._file.write(json.dumps(entry) + '\n')
+            self.recorded += 1
+            self._pending += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_interval:
+                self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._synced_at = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            if self._file and self._pending:
+                self._sync()
+
+    def compact(self):
+        """Fold everything into the snapshot (written atomically and durably), then empty the journal"""
+        snapshot = self.as_progress()
+        tmp_path = self.snapshot_path.with_name(f'.{self.snapshot_path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # The index is only trusted while it matches the snapshot's size and mtime
+        index = build_index(self.completed, snapshot['failed'], self.snapshot_path.stat())
+        tmp_path = self.index_path.with_name(f'.{self.index_path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(index)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+        self._stale_index = False
+
+        # Only drop the journal once the snapshot that contains it is on disk
+        if self._file:
+            self._file.truncate(0)
+            self._sync()
+        elif self.journal_path.exists():
+            with open(self.journal_path, 'r+') as f:
+                f.truncate(0)
+                os.fsync(f.fileno())
+
+    def as_progress(self):
+        """The old scraping_progress.json structure"""
+        return {'completed': sorted(self.completed), 'failed': list(self.failed.values())}
+
+    def close(self):
+        if self._file is None:
+            return
+        with self._lock:
+            self._sync()
+            if self.recorded:
+                self.compact()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,43 +1,218 @@
 #!/usr/bin/env python3
-"""Re-extract JSON from existing HTML files"""
+"""Re-extract JSON from existing HTML files
 
+Reparses any subset of the saved pages with the current plan_parser across
+a process pool, e.g. to roll out a parser fix to the whole corpus. Pages are
+streamed from the HTML store (html_store.py; the newest version of each),
+plus any legacy scraped_html_all/ files not imported into it. Pages whose
+HTML hash and parser version match .reparse_manifest.json are skipped - for
+stored pages the hash comes from the store index, so they are not even read -
+and JSON files are written atomically (and only when their content changes).
+
+Usage:
+    python reprocess_html.py                         # every saved page
+    python reprocess_html.py --state Arizona         # one state (repeatable)
+    python reprocess_html.py --glob 'Arizona-H0*.html'
+    python reprocess_html.py --changed-since 2025-11-20
+    python reprocess_html.py --force                 # ignore the manifest
+"""
+
+import argparse
+import hashlib
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from fnmatch import fnmatchcase
 from pathlib import Path
-from scrape_multithreaded import extract_plan_data
+
+from build_all_county_caches import write_json_atomic
+from html_store import HtmlStore, read_blob
+from plan_parser import PARSER_VERSION, extract_plan_data
 
 html_dir = Path('scraped_html_all')
+store_dir = Path('html_store')
 json_dir = Path('scraped_json_all')
+manifest_file = Path('.reparse_manifest.json')
+
+MANIFEST_FORMAT = 1
+
+
+def load_manifest():
+    """Per-file {'size', 'mtime_ns', 'sha256', 'parser_version'} from the last run"""
+    try:
+        manifest = json.loads(manifest_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('format') != MANIFEST_FORMAT:
+        return {}
+    return manifest['files']
+
+
+def select_files(states=None, pattern=None, changed_since=None):
+    """HTML files matching the state, glob and modification time filters"""
+    patterns = [f"{state.replace(' ', '_')}-*.html" for state in states] if states else [pattern or '*.html']
+    files = set()
+    for glob_pattern in patterns:
+        files.update(html_dir.glob(glob_pattern))
+    if pattern and states:
+        files = {f for f in files if f.match(pattern)}
+    if changed_since is not None:
+        cutoff = changed_since.timestamp()
+        files = {f for f in files if f.stat().st_mtime >= cutoff}
+    return sorted(files)
+
+
+def select_stored(store, states=None, pattern=None, changed_since=None):
+    """Newest store entries whose <name>.html matches the state, glob and scrape time filters"""
+    patterns = [f"{state.replace(' ', '_')}-*.html" for state in states] if states else [pattern or '*.html']
+    cutoff = changed_since.timestamp() if changed_since is not None else None
+    selected = []
+    for name, entry in sorted(store.latest().items()):
+        file_name = f'{name}.html'
+        if not any(fnmatchcase(file_name, p) for p in patterns):
+            continue
+        if pattern and states and not fnmatchcase(file_name, pattern):
+            continue
+        if cutoff is not None and entry['time'] < cutoff:
+            continue
+        selected.append(dict(entry, root=str(store.root)))
+    return selected
+
+
+def reparse(name, html, json_path, entry, previous):
+    """Parse one page and write its JSON; returns reprocess_page's result tuple"""
+    try:
+        plan_data = extract_plan_data(html)
+        written = write_json_atomic(json_path, plan_data, indent=2)
+    except Exception as e:
+        print(f"  ✗ {name}: {e}")
+        return name, previous, 'failed', None
 
-# Find all Arizona HTML files
-arizona_files = sorted(html_dir.glob('Arizona-*.html'))
+    address = plan_data.get('contact_info', {}).get('Plan address')
+    has_newline = None if address is None else '\n' in address
+    return name, entry, 'written' if written else 'unchanged', has_newline
 
-print(f"Found {len(arizona_files)} Arizona HTML files to reprocess\n")
 
-for html_file in arizona_files:
-    print(f"Processing {html_file.name}...")
+def reprocess_stored(stored, previous, force=False):
+    """Reparse one page from the HTML store unless it and the parser are unchanged"""
+    name = f"{stored['name']}.html"
+    json_path = json_dir / f"{stored['name']}.json"
+    entry = {
+        'size': stored['size'],
+        'mtime_ns': None,
+        'sha256': stored['sha256'],
+        'parser_version': PARSER_VERSION
+    }
+    if (not force and previous is not None and json_path.exists()
+            and (previous['sha256'], previous['parser_version']) == (entry['sha256'], PARSER_VERSION)):
+        return name, previous, 'skipped', None
+    return reparse(name, read_blob(stored['root'], stored), json_path, entry, previous)
 
-    # Read HTML
-    with open(html_file, 'r', encoding='utf-8') as f:
-        html_content = f.read()
 
-    # Extract data using current (fixed) extraction logic
-    plan_data = extract_plan_data(html_content)
+def reprocess_page(page, previous, force=False):
+    """Process pool entry point: a store entry (dict) or a legacy HTML file (Path)"""
+    if isinstance(page, dict):
+        return reprocess_stored(page, previous, force)
+    return reprocess_file(page, previous, force)
 
-    # Get corresponding JSON filename
-    json_filename = html_file.stem + '.json'
-    json_path = json_dir / json_filename
 
-    # Write JSON
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(plan_data, f, indent=2)
+def reprocess_file(html_file, previous, force=False):
+    """Reparse one HTML file unless it and the parser are unchanged
 
-    # Verify address has newline
-    if 'Plan address' in plan_data.get('contact_info', {}):
-        address = plan_data['contact_info']['Plan address']
-        has_newline = '\n' in address
-        status = "✓ HAS NEWLINE" if has_newline else "✗ NO NEWLINE"
-        print(f"  {status}: {repr(address[:60])}...")
+    Returns (file name, manifest entry, status, address has newline or None).
+    """
+    json_path = json_dir / f'{html_file.stem}.json'
+    stat = html_file.stat()
+    up_to_date = (
+        not force and previous is not None
+        and previous['parser_version'] == PARSER_VERSION
+        and json_path.exists()
+    )
+
+    # Same size and mtime: trust the recorded hash without reading the file
+    if up_to_date and (previous['size'], previous['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+        return html_file.name, previous, 'skipped', None
+
+    with open(html_file, 'rb') as f:
+        raw = f.read()
+    entry = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': hashlib.sha256(raw).hexdigest(),
+        'parser_version': PARSER_VERSION
+    }
+    if up_to_date and previous['sha256'] == entry['sha256']:
+        return html_file.name, entry, 'skipped', None
+
+    # Extract data using current extraction logic
+    return reparse(html_file.name, raw.decode('utf-8'), json_path, entry, previous)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-extract JSON from saved plan HTML')
+    parser.add_argument('--state', action='append', help='State name as in the file names, e.g. Arizona or "New Hampshire"')
+    parser.add_argument('--glob', help="File name pattern, e.g. 'Arizona-H0*.html'")
+    parser.add_argument('--changed-since', type=datetime.fromisoformat,
+                        help='Only files modified since this date/time (YYYY-MM-DD[THH:MM])')
+    parser.add_argument('--force', action='store_true', help='Reparse even if the HTML and parser are unchanged')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count)')
+    parser.add_argument('--store', default=str(store_dir), help='HTML store directory (default: html_store)')
+    args = parser.parse_args(argv)
+
+    store = HtmlStore(args.store)
+    stored = select_stored(store, args.state, args.glob, args.changed_since)
+    in_store = store.latest()
+    html_files = [f for f in select_files(args.state, args.glob, args.changed_since) if f.stem not in in_store]
+    pages = stored + html_files
+    print(f"Found {len(pages)} pages to reprocess ({len(stored)} from {store.root}/, "
+          f"{len(html_files)} from {html_dir}/; parser version {PARSER_VERSION})\n")
+
+    manifest = load_manifest()
+    json_dir.mkdir(exist_ok=True)
+    counts = {'skipped': 0, 'written': 0, 'unchanged': 0, 'failed': 0}
+    addresses = {True: 0, False: 0}
+    start = time.perf_counter()
+
+    jobs = [(page, manifest.get(f"{page['name']}.html" if isinstance(page, dict) else page.name), args.force)
+            for page in pages]
+    workers = max(1, min(args.workers, len(jobs)))
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(reprocess_page, *zip(*jobs), chunksize=32)
     else:
-        print("  ⚠ No address found")
+        results = (reprocess_page(*job) for job in jobs)
+
+    try:
+        for i, (name, entry, status, has_newline) in enumerate(results, 1):
+            if entry is not None:
+                manifest[name] = entry
+            counts[status] += 1
+            if has_newline is not None:
+                addresses[has_newline] += 1
+            if i % 500 == 0:
+                print(f"  Processed {i}/{len(jobs)}...")
+    finally:
+        if executor:
+            executor.shutdown()
+        write_json_atomic(manifest_file, {'format': MANIFEST_FORMAT, 'files': manifest}, separators=(',', ':'))
+
+    elapsed = time.perf_counter() - start
+    rate = len(jobs) / elapsed if elapsed > 0 else 0
+    print(f"\nReprocessed {len(jobs)} files in {elapsed:.1f}s ({rate:.0f} files/s, {workers} workers)")
+    print(f"  JSON rewritten: {counts['written']}")
+    print(f"  Reparsed, JSON unchanged: {counts['unchanged']}")
+    print(f"  Skipped (HTML and parser unchanged): {counts['skipped']}")
+    if counts['failed']:
+        print(f"  Failed: {counts['failed']}")
+
+    # Verify addresses have newlines
+    if addresses[True] or addresses[False]:
+        print(f"  Addresses with newline: ✓ {addresses[True]}  ✗ {addresses[False]}")
+    return counts
+
 
-print(f"\nReprocessed {len(arizona_files)} files")
+if __name__ == '__main__':
+    main()
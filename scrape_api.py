@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Browserless plan scraper: fetch plan details straight from the plan-compare JSON API
+
+investigate_api.py showed that the plan details page is rendered from a single
+XHR, GET /api/v1/data/plan-compare/plan/{year}/{contract}/{plan}/{segment}.
+Calling that endpoint directly over a pooled aiohttp session (the 'api' backend
+of scrape_engine.py, with its rate limit, adaptive concurrency and retries)
+instead of rendering the page in Chrome makes a plan cost milliseconds of HTTP
+instead of seconds of browser time.
+
+Each raw response is saved to scraped_api_raw/ (the API counterpart of
+html_store/) and mapped onto the scraped_json_all schema by
+api_to_plan_record, and the saved raw responses can be re-mapped with --remap
+instead of fetching again.
+
+The mapping is PROVISIONAL. network_requests.json recorded the plan request
+but not its body, so the API field names below (organization_name,
+maximum_oopc, plan_address, benefits, ...) are unverified guesses. Record
+real responses with investigate_api.py (recorded_api/), run
+`python scrape_api.py --check-mapping recorded_api/` to list the mapped
+fields they lack and the response fields nothing reads, fix the tables, then
+--remap. --replay runs the same check first.
+
+Until a check has passed - recorded responses, none missing a mapped field -
+for the mapping as it is now (MAPPING_CHECK_FILE holds its fingerprint), the
+api backend refuses to start, so nothing is saved or journaled.
+
+drug_coverage and extra_benefits (UNMAPPED_SECTIONS) are not mapped at all:
+records from this backend leave them empty, where the page parser fills the
+drug tier and extra benefit tables. So the mapped records, tagged
+'source': 'api', go to scraped_json_api/ and plan outcomes to their own
+journal, scraping_progress_api.json: the county cache builders only read the
+parsed pages in scraped_json_all/, and the browser scrapers' progress is not
+touched.
+
+Requires aiohttp (pip install aiohttp).
+
+Usage:
+    python scrape_api.py                               # every plan in state_data/
+    python scrape_api.py --state Alaska --max-concurrency 32   # any scrape_engine.py option
+    python scrape_api.py --replay recorded_api/        # offline, from recorded responses
+    python scrape_api.py --remap                       # rebuild JSON from scraped_api_raw/
+    python scrape_api.py --check-mapping recorded_api/ # verify the field mapping
+"""
+
+import argparse
+import hashlib
+import http.server
+import inspect
+import json
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import scrape_engine
+from build_all_county_caches import write_json_atomic
+
+# Directories
+raw_dir = Path('./scraped_api_raw')
+json_dir = Path('./scraped_json_api')
+progress_file = Path('./scraping_progress_api.json')
+MAPPING_CHECK_FILE = Path('./.api_mapping_check.json')
+
+API_PATH = '/api/v1/data/plan-compare'
+API_BASE = f'https://www.medicare.gov{API_PATH}'
+PLAN_YEAR = 2026
+
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}  # The engine backs off and retries these
+
+# Headers the plan-compare frontend sends with its XHRs (network_requests.json)
+API_HEADERS = {
+    'accept': 'application/json, text/plain, */*',
+    'referer': 'https://www.medicare.gov/plan-compare/',
+    'fe-ver': '2.51.1',
+    'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+}
+
+# API response fields -> scraped_json_all labels
+PLAN_TYPES = {
+    'PLAN_TYPE_MAPD': 'Medicare Advantage with drug coverage',
+    'PLAN_TYPE_MA': 'Medicare Advantage (without drug coverage)',
+    'PLAN_TYPE_PDP': 'Drug plan (Part D)',
+    'PLAN_TYPE_REGIONAL_PPO': 'Regional PPO',
+}
+PREMIUM_FIELDS = [
+    ('Total monthly premium', 'total_monthly_premium'),
+    ('Health premium', 'partc_premium'),
+    ('Drug premium', 'partd_premium'),
+    ('Standard Part B premium', 'part_b_premium'),
+    ('Part B premium reduction', 'part_b_premium_reduction'),
+]
+DEDUCTIBLE_FIELDS = [
+    ('Health deductible', 'annual_deductible'),
+    ('Drug deductible', 'drug_plan_deductible'),
+]
+MOOP_FIELDS = [
+    ('Maximum you pay for health services', 'maximum_oopc'),
+]
+# Every response field api_to_plan_record reads
+MAPPED_FIELDS = (
+    ['name', 'organization_name', 'plan_type', 'contract_id', 'plan_id', 'segment_id', 'plan_address', 'benefits']
+    + [field for fields in (PREMIUM_FIELDS, DEDUCTIBLE_FIELDS, MOOP_FIELDS) for _, field in fields]
+)
+# scraped_json_all sections the API mapping does not fill (left empty)
+UNMAPPED_SECTIONS = ('drug_coverage', 'extra_benefits')
+
+
+def plan_api_url(contract_plan_segment_id, base_url=API_BASE, year=PLAN_YEAR):
+    """H0104_016_0 -> {base}/plan/2026/H0104/016/0?lis=LIS_NO_HELP"""
+    contract, plan, segment = contract_plan_segment_id.split('_')
+    return f"{base_url}/plan/{year}/{contract}/{plan}/{segment}?lis=LIS_NO_HELP"
+
+
+def display_amount(value):
+    """API amounts are dollars as numbers; the page shows $1,234.50"""
+    if value is None or isinstance(value, str):
+        return value
+    return f"${value:,.2f}"
+
+
+def network_costs(costs):
+    """[{'network': 'In-network', 'cost': '$5 copay'}, ...] as the page's cell text"""
+    if isinstance(costs, str):
+        return costs
+    return '\n'.join(f"{c['network']}: {c['cost']}" if c.get('network') else c['cost'] for c in costs)
+
+
+def api_to_plan_record(data):
+    """Map one plan API response onto the scraped_json_all schema"""
+    record = {
+        'plan_info': {},
+        'premiums': {},
+        'deductibles': {},
+        'maximum_out_of_pocket': {},
+        'contact_info': {},
+        'benefits': {},
+        'drug_coverage': {},
+        'extra_benefits': {}
+    }
+
+    plan_info = record['plan_info']
+    if data.get('name'):
+        plan_info['name'] = data['name']
+    if data.get('organization_name'):
+        plan_info['organization'] = data['organization_name']
+    if data.get('plan_type'):
+        plan_info['type'] = PLAN_TYPES.get(data['plan_type'], data['plan_type'])
+    if data.get('contract_id'):
+        plan_info['id'] = f"{data['contract_id']}-{data['plan_id']}-{data['segment_id']}"
+
+    for section, fields in [('premiums', PREMIUM_FIELDS),
+                            ('deductibles', DEDUCTIBLE_FIELDS),
+                            ('maximum_out_of_pocket', MOOP_FIELDS)]:
+        for label, field in fields:
+            if data.get(field) is not None:
+                record[section][label] = display_amount(data[field])
+
+    address = data.get('plan_address')
+    if address:
+        record['contact_info']['Plan address'] = (
+            f"{address['street']}\n{address['city']}, {address['state']} {address['zip']}"
+        )
+
+    for category in data.get('benefits', []):
+        services = {s['service']: network_costs(s['costs']) for s in category.get('services', [])}
+        if services:
+            record['benefits'][category['category']] = services
+
+    return record
+
+
+def check_mapping(recorded_dir):
+    """Compare recorded responses with the mapping tables
+
+    Returns {'files', 'missing': {mapped field: responses without it},
+    'unused': {response field: responses with it that nothing reads}}.
+    """
+    report = {'files': 0, 'missing': {}, 'unused': {}}
+    for path in sorted(Path(recorded_dir).rglob('*.json')):
+        data = json.loads(path.read_text())
+        report['files'] += 1
+        for field in MAPPED_FIELDS:
+            if field not in data:
+                report['missing'][field] = report['missing'].get(field, 0) + 1
+        for field in data:
+            if field not in MAPPED_FIELDS:
+                report['unused'][field] = report['unused'].get(field, 0) + 1
+    return report
+
+
+def mapping_fingerprint():
+    """Hash of the mapping tables and api_to_plan_record, so a passed check goes stale when they change"""
+    tables = [PLAN_TYPES, PREMIUM_FIELDS, DEDUCTIBLE_FIELDS, MOOP_FIELDS, MAPPED_FIELDS, UNMAPPED_SECTIONS]
+    source = json.dumps(tables) + inspect.getsource(api_to_plan_record)
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def mapping_verified():
+    """Whether --check-mapping passed for the current mapping"""
+    try:
+        return json.loads(MAPPING_CHECK_FILE.read_text())['mapping'] == mapping_fingerprint()
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def print_mapping_report(recorded_dir):
+    """Print check_mapping; a pass (responses recorded, no mapped field missing) is saved to MAPPING_CHECK_FILE"""
+    report = check_mapping(recorded_dir)
+    print(f"Mapping check against {report['files']} recorded responses in {recorded_dir}/")
+    if not report['files']:
+        print("  ⚠ Nothing recorded - the field mapping is unverified (run investigate_api.py)")
+    for field, count in sorted(report['missing'].items()):
+        print(f"  ✗ mapped field '{field}' missing from {count}/{report['files']} responses")
+    for field, count in sorted(report['unused'].items()):
+        print(f"  ? response field '{field}' is not mapped ({count}/{report['files']} responses)")
+    print(f"  Not mapped at all: {', '.join(UNMAPPED_SECTIONS)}")
+    report['passed'] = bool(report['files']) and not report['missing']
+    if report['passed']:
+        write_json_atomic(MAPPING_CHECK_FILE, {'mapping': mapping_fingerprint(), 'recorded_dir': str(recorded_dir),
+                                               'files': report['files']}, indent=2)
+        print(f"  ✓ Mapping verified ({MAPPING_CHECK_FILE})")
+    else:
+        MAPPING_CHECK_FILE.unlink(missing_ok=True)
+    return report
+
+
+def require_verified_mapping():
+    if not mapping_verified():
+        raise RuntimeError('The API field mapping has not passed a check against recorded responses: '
+                           'run `python scrape_api.py --check-mapping recorded_api/` first')
+
+
+def save_plan(data, plan, state_name):
+    """Keep the raw response and write the mapped record to scraped_json_api/"""
+    name = f"{state_name}-{plan['ContractPlanSegmentID']}"
+    raw_path = raw_dir / f'{name}.json'
+    write_json_atomic(raw_path, data, separators=(',', ':'))
+
+    record = api_to_plan_record(data)
+    record['source'] = 'api'
+    record['source_file'] = str(raw_path)
+    record['state'] = state_name
+    record['plan_id'] = plan['ContractPlanSegmentID']
+    record['url'] = plan.get('url')
+    write_json_atomic(json_dir / f'{name}.json', record, indent=2, ensure_ascii=False)
+
+
+class ReplayHandler(http.server.BaseHTTPRequestHandler):
+    """Serve recorded API responses: {API_PATH}/plan/2026/H0104/016/0 -> {root}/plan/2026/H0104/016/0.json"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so the client's connection pool is exercised
+    disable_nagle_algorithm = True  # Headers and body are separate writes
+    root = Path('recorded_api')
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        recorded = self.root / f"{path[len(API_PATH):].strip('/')}.json" if path.startswith(API_PATH) else None
+        if recorded is None or not recorded.is_file():
+            body, status = b'{"error": "not recorded"}', 404
+        else:
+            body, status = recorded.read_bytes(), 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_replay_server(recorded_dir, host='127.0.0.1', port=0):
+    """Serve recorded_dir on a background thread; returns (server, API base URL)"""
+    handler = type('RecordedReplayHandler', (ReplayHandler,), {'root': Path(recorded_dir)})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{API_PATH}"
+
+
+def remap_raw_files():
+    """Re-map every saved raw response, e.g. after fixing api_to_plan_record"""
+    written = 0
+    for raw_path in sorted(raw_dir.glob('*.json')):
+        state_name, plan_id = raw_path.stem.rsplit('-', 1)
+        previous = json_dir / raw_path.name
+        url = json.loads(previous.read_text()).get('url') if previous.exists() else None
+        record = api_to_plan_record(json.loads(raw_path.read_text()))
+        record.update({'source': 'api', 'source_file': str(raw_path), 'state': state_name, 'plan_id': plan_id,
+                       'url': url})
+        written += write_json_atomic(json_dir / raw_path.name, record, indent=2, ensure_ascii=False)
+    return written
+
+
+def main(argv=None):
+    """Run scrape_engine.py with the api profile; extra options are passed through"""
+    parser = argparse.ArgumentParser(description='Scrape plan details from the plan-compare JSON API')
+    parser.add_argument('--replay', metavar='DIR', help='Serve recorded responses from DIR locally and scrape those')
+    parser.add_argument('--remap', action='store_true', help='Only rebuild scraped_json_api/ from scraped_api_raw/')
+    parser.add_argument('--check-mapping', metavar='DIR',
+                        help='Only check the field mapping against recorded responses in DIR')
+    args, engine_args = parser.parse_known_args(argv)
+
+    if args.check_mapping:
+        return print_mapping_report(args.check_mapping)
+
+    if args.remap:
+        json_dir.mkdir(exist_ok=True)
+        written = remap_raw_files()
+        print(f"Re-mapped raw API responses: {written} JSON files changed")
+        return {'completed': 0, 'failed': 0, 'remapped': written}
+
+    server = None
+    if args.replay:
+        print_mapping_report(args.replay)
+    if not mapping_verified():
+        print("✗ Not scraping: the field mapping has not passed --check-mapping against recorded responses")
+        return {'completed': 0, 'failed': 0}
+    if args.replay:
+        server, base_url = start_replay_server(args.replay)
+        print(f"Replaying recorded responses from {args.replay}/ at {base_url}")
+        engine_args += ['--base-url', base_url]
+    try:
+        return scrape_engine.main(['--profile', 'api'] + engine_args)
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -16,10 +16,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium_stealth import stealth
 from bs4 import BeautifulSoup
 
+from html_store import HtmlStore
+
 MIN_DELAY, MAX_DELAY = 8.0, 15.0
-HTML_DIR = Path('./scraped_html_all')
+HTML_STORE = HtmlStore()
 JSON_DIR = Path('./scraped_json_all')
-HTML_DIR.mkdir(exist_ok=True)
 JSON_DIR.mkdir(exist_ok=True)
 
 USER_AGENTS = [
@@ -184,9 +185,7 @@ def main():
             html = scrape_plan(driver, plan_id, contract, plan_num, segment)
             if html:
                 # Save HTML
-                html_file = HTML_DIR / f"South_Carolina-{plan_id}.html"
-                with open(html_file, 'w') as f:
-                    f.write(html)
+                HTML_STORE.put(f"South_Carolina-{plan_id}", html)
                 
                 # Extract and save JSON
                 data = extract_data(html)
@@ -214,6 +213,7 @@ def main():
     
     finally:
         driver.quit()
+        HTML_STORE.close()
     
     total_time = time.time() - start_time
     print(f"\n=== Complete ===")
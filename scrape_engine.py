@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+One scraping engine for every plan scrape: asyncio scheduler, pluggable backends
+
+The per-purpose scrapers (multithreaded, optimized, stealth, balanced, the
+per-state batches...) differed only in worker count, delays and which plans
+they picked. This engine replaces them:
+
+- A token bucket caps the request rate across all workers (`rate` pages/s,
+  up to `burst` back to back), instead of a random sleep in every worker.
+- Concurrency adapts (AIMD): it grows by one slot after a window of successes
+  and halves, and the token bucket pauses for `cooldown` seconds, on a timeout,
+  HTTP 429 or 5xx. Plans that hit such a backoff are retried once the cooldown
+  is over, ahead of fresh work, up to --max-attempts times.
+- The fetch backend is pluggable: 'browser' renders the page in pooled Chrome
+  drivers (driver_pool, page_ready, plan_parser) and 'api' calls the plan-compare
+  JSON API directly (scrape_api).
+
+Profiles bundle the settings the old scripts hand-tuned; any of them can be
+overridden on the command line. Every plan outcome is appended to a progress
+journal (progress_journal), so runs resume where they stopped, even after a
+crash. Plans are scraped in plan_priority order: the widest-reaching plans
+without details first. With --queue, plans are leased from a shared work_queue instead, so
+several nodes can finish one run between them without scraping a plan twice.
+
+Usage:
+    python scrape_engine.py                                   # every remaining plan
+    python scrape_engine.py --profile stealth --state Delaware
+    python scrape_engine.py --plan H5216_059_0 --plan H7617_046_0 --force
+    python scrape_engine.py --retry-failed --pages-per-driver 1
+    python scrape_engine.py --profile api --max-concurrency 32
+    python scrape_engine.py --queue /shared/scrape_queue.sqlite   # on every node
+    python scrape_engine.py --shard 2/4                      # static split, no shared storage
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from driver_pool import DriverPool
+from html_store import HtmlStore
+from page_ready import PageReadiness
+from plan_priority import compute_priorities, missing_plan_ids
+from plan_parser import extract_plan_data
+from progress_journal import ProgressJournal
+from work_queue import WorkQueue, in_shard
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+except ImportError:  # Only the browser backend needs Selenium
+    webdriver = None
+
+# Directories
+state_data_dir = Path('./state_data')
+html_store_dir = Path('./html_store')
+json_dir = Path('./scraped_json_all')
+progress_file = Path('./scraping_progress.json')  # The api backend keeps scrape_api.progress_file
+readiness_log = Path('./page_readiness.jsonl')
+
+MAX_ATTEMPTS = 3  # Per plan, counting retries after a backoff (--max-attempts)
+
+PROFILES = {
+    # scrape_multithreaded, scrape_all_plans_parallel
+    'fast': {'backend': 'browser', 'rate': 1.0, 'burst': 4, 'concurrency': 4, 'max_concurrency': 8,
+             'cooldown': 30, 'pages_per_driver': 50},
+    # scrape_optimized and the batch scripts built on it
+    'default': {'backend': 'browser', 'rate': 0.5, 'burst': 2, 'concurrency': 2, 'max_concurrency': 4,
+                'cooldown': 30, 'pages_per_driver': 50},
+    # scrape_balanced: 4 workers, 5-8s apart
+    'balanced': {'backend': 'browser', 'rate': 0.25, 'burst': 1, 'concurrency': 2, 'max_concurrency': 4,
+                 'cooldown': 60, 'jitter': 3.0, 'pages_per_driver': 20, 'stealth': True},
+    # scrape_stealth and friends: one fresh, randomized browser at a time, 8-15s apart
+    'stealth': {'backend': 'browser', 'rate': 0.1, 'burst': 1, 'concurrency': 1, 'max_concurrency': 1,
+                'cooldown': 120, 'jitter': 7.0, 'pages_per_driver': 1, 'stealth': True, 'order': 'random'},
+    # scrape_api: no browser at all
+    'api': {'backend': 'api', 'rate': 5.0, 'burst': 10, 'concurrency': 4, 'max_concurrency': 16,
+            'cooldown': 10},
+}
+
+CHROME_USER_AGENTS = [
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+]
+WINDOW_SIZES = ['1920,1080', '1366,768', '1536,864', '1440,900', '1280,720']
+
+
+class Backoff(Exception):
+    """The site is pushing back (timeout, 429, 5xx): slow down and retry the plan later"""
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, `burst` at once"""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def pause(self, seconds):
+        """Hand out nothing for `seconds` (on top of what is already owed)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class AdaptiveConcurrency:
+    """Additive increase, multiplicative decrease of the number of plans in flight"""
+
+    def __init__(self, initial, minimum=1, maximum=8):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.peak = self.limit
+        self.successes = 0
+        self.backoffs = 0
+
+    def success(self):
+        """One more slot after `limit` successes in a row"""
+        self.successes += 1
+        if self.successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self.peak = max(self.peak, self.limit)
+            self.successes = 0
+
+    def backoff(self):
+        self.limit = max(self.minimum, self.limit // 2)
+        self.successes = 0
+        self.backoffs += 1
+
+
+class BrowserBackend:
+    """Render plan pages in pooled Chrome drivers, one per executor thread"""
+
+    name = 'browser'
+
+    def __init__(self, threads, pages_per_driver=50, stealth=False, ready_ceiling=5.0):
+        if webdriver is None:
+            raise RuntimeError('The browser backend needs selenium (pip install selenium)')
+        self.stealth = stealth
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.pool = DriverPool(self.create_driver, max_pages=pages_per_driver, max_memory_mb=1500)
+        self.readiness = PageReadiness(ceiling=ready_ceiling, log_path=readiness_log)
+        self.store = HtmlStore(html_store_dir)
+        self.new_blobs = 0
+
+    def create_driver(self, worker_id):
+        if self.stealth:
+            user_agent, window_size = random.choice(CHROME_USER_AGENTS), random.choice(WINDOW_SIZES)
+        else:
+            user_agent, window_size = CHROME_USER_AGENTS[worker_id % len(CHROME_USER_AGENTS)], '1920,1080'
+
+        chrome_options = Options()
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        chrome_options.add_argument(f'--window-size={window_size}')
+        chrome_options.add_argument(f'--user-agent={user_agent}')
+
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.set_page_load_timeout(45)
+        if self.stealth:
+            # Mask automation
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+                "userAgent": user_agent,
+                "platform": "MacIntel" if "Mac" in user_agent else "Win32"
+            })
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
+
+    def load_plan_page(self, driver, url):
+        """Navigate to a plan page and return its rendered HTML"""
+        driver.get(url)
+
+        wait = WebDriverWait(driver, 30)
+        wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+        if self.stealth:
+            # Random scroll to mimic human interaction
+            driver.execute_script(f"window.scrollBy(0, {random.randint(100, 500)})")
+        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "mct-c-table")))
+
+        self.readiness.wait(driver, url)
+        return driver.page_source
+
+    def scrape(self, plan, state_name):
+        url = plan['url']
+        try:
+            html_content = self.pool.run(lambda driver: self.load_plan_page(driver, url))
+        except TimeoutException:
+            raise Backoff('Timeout')
+
+        name = f"{state_name}-{plan['ContractPlanSegmentID']}"
+        entry = self.store.put(name, html_content)
+        self.new_blobs += entry['new']
+
+        parsed_data = extract_plan_data(html_content)
+        parsed_data['source_file'] = str(self.store.root / entry['blob'])
+        parsed_data['state'] = state_name
+        parsed_data['plan_id'] = plan['ContractPlanSegmentID']
+        parsed_data['url'] = url
+        with open(json_dir / f'{name}.json', 'w', encoding='utf-8') as f:
+            json.dump(parsed_data, f, indent=2, ensure_ascii=False)
+        return {'success': True, 'size': len(html_content)}
+
+    async def __aenter__(self):
+        return self
+
+    async def fetch(self, plan, state_name):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.scrape, plan, state_name)
+
+    async def __aexit__(self, *exc):
+        self.executor.shutdown()
+        self.pool.close()
+        self.store.close()
+
+    def summary(self):
+        stats = self.store.stats()
+        return (f"{self.pool.summary()}\n{self.readiness.summary()}\n"
+                f"HTML store: {self.new_blobs} new pages this run; {stats['pages']} pages in "
+                f"{stats['stored_bytes'] / 1024 / 1024:.1f} MB ({self.store.root}/)")
+
+
+class ApiBackend:
+    """Fetch plans from the plan-compare JSON API over one pooled aiohttp session"""
+
+    name = 'api'
+
+    def __init__(self, connections, base_url=None):
+        import scrape_api  # Needs aiohttp
+        scrape_api.require_verified_mapping()
+        self.api = scrape_api
+        self.json_dir = scrape_api.json_dir
+        self.connections = connections
+        self.base_url = base_url or scrape_api.API_BASE
+
+    async def __aenter__(self):
+        aiohttp = self.api.aiohttp
+        self.api.raw_dir.mkdir(exist_ok=True)
+        self.json_dir.mkdir(exist_ok=True)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connections, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=self.api.REQUEST_TIMEOUT),
+            headers=self.api.API_HEADERS
+        )
+        return self
+
+    async def fetch(self, plan, state_name):
+        url = self.api.plan_api_url(plan['ContractPlanSegmentID'], self.base_url)
+        try:
+            async with self.session.get(url) as response:
+                if response.status in self.api.RETRY_STATUSES:
+                    raise Backoff(f'HTTP {response.status}')
+                if response.status != 200:
+                    return {'success': False, 'error': f'HTTP {response.status}'}
+                data = await response.json(content_type=None)
+        except (self.api.aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise Backoff(str(e) or type(e).__name__)
+        self.api.save_plan(data, plan, state_name)
+        return {'success': True}
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def summary(self):
+        return None
+
+
+class TaskList:
+    """A fixed list of (plan, state_name) pairs as a task source (see work_queue.WorkQueue)"""
+
+    def __init__(self, tasks):
+        self.tasks = deque(tasks)
+
+    def take(self, n):
+        return [self.tasks.popleft() for _ in range(min(n, len(self.tasks)))]
+
+
+async def scrape(tasks, backend, rate, burst=1, concurrency=2, max_concurrency=4, cooldown=30,
+                 jitter=0.0, on_result=None, max_attempts=MAX_ATTEMPTS):
+    """Run every (plan, state_name) through backend under the rate and concurrency limits
+
+    tasks is a list, or a source whose take(n) hands out up to n more pairs
+    (a WorkQueue leases them, on a worker thread so a lock held by another
+    node never stalls the fetches in flight); it is asked for more whenever a
+    slot frees up. A plan that backed off is retried once `cooldown` has
+    passed, before any fresh work. on_result(result) - a function or a
+    coroutine function - is called for each plan's final outcome. Returns the
+    AdaptiveConcurrency, whose limit, peak and backoffs describe the run.
+    """
+    bucket = TokenBucket(rate, burst)
+    limiter = AdaptiveConcurrency(concurrency, maximum=max_concurrency)
+    source = tasks if hasattr(tasks, 'take') else TaskList(tasks)
+    retries = deque()  # (due, plan, state_name, attempt), due in order since cooldown is fixed
+    running = {}
+
+    async def take(n):
+        if n <= 0:
+            return []
+        if isinstance(source, TaskList):
+            return source.take(n)
+        return await asyncio.to_thread(source.take, n)
+
+    async def run_one(plan, state_name):
+        await bucket.acquire()
+        if jitter:
+            await asyncio.sleep(random.uniform(0, jitter))
+        start = time.perf_counter()
+        result = await backend.fetch(plan, state_name)
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def start(plan, state_name, attempt):
+        running[asyncio.ensure_future(run_one(plan, state_name))] = (plan, state_name, attempt)
+
+    while True:
+        while retries and retries[0][0] <= time.monotonic() and len(running) < limiter.limit:
+            start(*retries.popleft()[1:])
+        for plan, state_name in await take(limiter.limit - len(running)):
+            start(plan, state_name, 1)
+        if not running:
+            if not retries:
+                break
+            await asyncio.sleep(max(0.0, retries[0][0] - time.monotonic()))
+            continue
+
+        timeout = max(0.0, retries[0][0] - time.monotonic()) if retries else None
+        done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            plan, state_name, attempt = running.pop(future)
+            result = {'plan_id': plan['ContractPlanSegmentID'], 'state': state_name, 'attempt': attempt}
+            try:
+                result.update(future.result())
+            except Backoff as e:
+                limiter.backoff()
+                bucket.pause(cooldown)
+                if attempt < max_attempts:
+                    retries.append((time.monotonic() + cooldown, plan, state_name, attempt + 1))
+                    continue
+                result.update({'success': False, 'error': str(e)})
+            except Exception as e:
+                result.update({'success': False, 'error': str(e)[:200]})
+            else:
+                if result['success']:
+                    limiter.success()
+            if on_result:
+                if asyncio.iscoroutinefunction(on_result):
+                    await on_result(result)
+                else:
+                    on_result(result)
+    return limiter
+
+
+def select_tasks(journal, states=None, plan_ids=None, retry_failed=False, force=False, limit=None, shard=None):
+    """(plan, state_name) pairs from state_data/ matching the filters and the progress journal"""
+    state_files = sorted(state_data_dir.glob('*.json'))
+    if states:
+        wanted = {s.replace(' ', '_') for s in states}
+        state_files = [f for f in state_files if f.stem in wanted]
+
+    completed_ids = set() if force else journal.completed
+    wanted_ids = set(plan_ids) if plan_ids is not None else None
+    if retry_failed:
+        failed_ids = set(journal.failed)
+        wanted_ids = failed_ids if wanted_ids is None else wanted_ids & failed_ids
+
+    tasks = []
+    for state_file in state_files:
+        with open(state_file, 'r') as f:
+            plans = json.load(f)
+        for plan in plans:
+            plan_id = plan['ContractPlanSegmentID']
+            if plan_id in completed_ids or (wanted_ids is not None and plan_id not in wanted_ids):
+                continue
+            if shard and not in_shard(plan_id, shard):
+                continue
+            tasks.append((plan, state_file.stem))
+    return tasks[:limit] if limit else tasks
+
+
+def order_tasks(tasks, order='priority'):
+    """Sort tasks in place; returns {plan_id: priority} when ordered by priority"""
+    if order == 'random':
+        # Randomize order to avoid pattern detection
+        random.shuffle(tasks)
+    elif order == 'priority':
+        try:
+            priorities = {plan_id: p['priority'] for plan_id, p in compute_priorities().items()}
+        except FileNotFoundError:
+            print("Landscape CSV not found - scraping in state file order")
+            return None
+        # Stable, so equal priorities keep state file order
+        tasks.sort(key=lambda task: -priorities.get(task[0]['ContractPlanSegmentID'], 0))
+        return priorities
+    return None
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4)"""
+    k, n = (int(part) for part in value.split('/'))
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError(f'shard must be K/N with 1 <= K <= N, not {value}')
+    return k, n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scrape Medicare plan details')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='default')
+    parser.add_argument('--backend', choices=['browser', 'api'], help="Override the profile's backend")
+    parser.add_argument('--state', action='append', help='State file name in state_data/, e.g. New_Hampshire (repeatable)')
+    parser.add_argument('--plan', action='append', help='Only this ContractPlanSegmentID, e.g. H5216_059_0 (repeatable)')
+    parser.add_argument('--retry-failed', action='store_true', help='Only plans recorded as failed in the progress file')
+    parser.add_argument('--force', action='store_true', help='Include plans already marked completed')
+    parser.add_argument('--missing', action='store_true', help='Only plans without details in the county caches')
+    parser.add_argument('--limit', type=int, help='Scrape at most this many plans (the first in --order)')
+    parser.add_argument('--order', choices=['priority', 'file', 'random'],
+                        help='priority (plan_priority.py, default), state file order, or random (stealth default)')
+    parser.add_argument('--rate', type=float, help='Pages per second across all workers')
+    parser.add_argument('--burst', type=int, help='Pages that may start back to back')
+    parser.add_argument('--concurrency', type=int, help='Plans in flight at the start')
+    parser.add_argument('--max-concurrency', type=int, help='Upper bound for the adaptive concurrency')
+    parser.add_argument('--pages-per-driver', type=int, help='Restart each browser after this many pages')
+    parser.add_argument('--base-url', help='API base URL (api backend)')
+    parser.add_argument('--queue', metavar='PATH', help='Lease plans from this shared SQLite work queue (seeded if needed)')
+    parser.add_argument('--lease-seconds', type=float, default=300, help='Work queue lease, renewed while scraping')
+    parser.add_argument('--worker-id', help='Name of this node in the work queue (default host:pid)')
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                        help='Attempts per plan: fetches after a backoff, and work queue leases before one '
+                             'that keeps expiring is marked failed')
+    parser.add_argument('--shard', type=parse_shard, metavar='K/N', help='Only the K-th of N stable slices of the plans')
+    args = parser.parse_args(argv)
+
+    settings = dict(PROFILES[args.profile])
+    for key in ['backend', 'rate', 'burst', 'concurrency', 'max_concurrency', 'pages_per_driver', 'order']:
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    settings['concurrency'] = min(settings['concurrency'], settings['max_concurrency'])
+
+    print("=" * 80)
+    print(f"MEDICARE PLAN SCRAPER - profile {args.profile}, {settings['backend']} backend")
+    print(f"Rate: {settings['rate']:g} pages/s (burst {settings['burst']}), "
+          f"concurrency {settings['concurrency']}-{settings['max_concurrency']}")
+    print("=" * 80)
+
+    if settings['backend'] == 'api':
+        import scrape_api  # Needs aiohttp
+        journal_path = scrape_api.progress_file
+    else:
+        journal_path = progress_file
+    with ProgressJournal(journal_path) as journal:
+        return run_tasks(args, settings, journal)
+
+
+def run_tasks(args, settings, journal):
+    plan_ids = args.plan
+    if args.missing:
+        missing = missing_plan_ids()
+        plan_ids = [p for p in missing if p in plan_ids] if plan_ids else missing
+    tasks = select_tasks(journal, args.state, plan_ids, args.retry_failed, args.force, shard=args.shard)
+    priorities = order_tasks(tasks, settings.get('order', 'priority'))
+    if args.limit:
+        tasks = tasks[:args.limit]
+    print(f"\nAlready completed: {len(journal.completed)} plans"
+          + (f" ({journal.replayed} recovered from the journal)" if journal.replayed else ""))
+
+    queue = None
+    if args.queue:
+        queue = WorkQueue(args.queue, args.lease_seconds, args.worker_id, args.max_attempts)
+        if args.retry_failed:
+            queue.retry_failed()
+        added = queue.add(tasks, priorities or 0)
+        queued = queue.counts()
+        total = queued['pending'] + queued['leased']
+        print(f"Work queue {args.queue} as {queue.owner}: {added} plans added; "
+              f"{queued['pending']} pending, {queued['leased']} leased, {queued['done']} done, {queued['failed']} failed")
+    else:
+        total = len(tasks)
+    print(f"Plans to scrape: {total}\n")
+    if not total:
+        if queue:
+            queue.close()
+        return {'completed': 0, 'failed': 0}
+
+    if settings['backend'] == 'api':
+        backend = ApiBackend(settings['max_concurrency'], args.base_url)
+    else:
+        json_dir.mkdir(exist_ok=True)
+        backend = BrowserBackend(settings['max_concurrency'], settings['pages_per_driver'], settings.get('stealth', False))
+
+    counts = {'completed': 0, 'failed': 0}
+
+    async def on_result(result):
+        journal.record(result['plan_id'], result['state'], result['success'], result.get('error'))
+        if queue and not await asyncio.to_thread(queue.complete, result['plan_id'], result['success'],
+                                                 result.get('error')):
+            print(f"  ! Lease on {result['plan_id']} expired and was re-issued; raise --lease-seconds")
+        if result['success']:
+            counts['completed'] += 1
+            print(f"[{counts['completed'] + counts['failed']}/{total}] ✓ {result['state']}-{result['plan_id']} "
+                  f"({result['seconds']:.1f}s)")
+        else:
+            counts['failed'] += 1
+            print(f"[{counts['completed'] + counts['failed']}/{total}] ✗ {result['state']}-{result['plan_id']}: "
+                  f"{result.get('error', 'Unknown')[:80]}")
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(queue.lease_seconds / 3)
+            await asyncio.to_thread(queue.heartbeat)
+
+    async def run():
+        renew = asyncio.ensure_future(heartbeat()) if queue else None
+        try:
+            async with backend:
+                return await scrape(queue or tasks, backend, settings['rate'], settings['burst'],
+                                    settings['concurrency'], settings['max_concurrency'], settings['cooldown'],
+                                    settings.get('jitter', 0.0), on_result, args.max_attempts)
+        finally:
+            if renew:
+                renew.cancel()
+
+    start_time = time.time()
+    try:
+        limiter = asyncio.run(run())
+    finally:
+        if queue:
+            queue.release()  # Plans this node leased but never finished, e.g. after Ctrl-C
+    elapsed = time.time() - start_time
+
+    # Final summary
+    print("\n" + "=" * 80)
+    print("FINAL SUMMARY")
+    print("=" * 80)
+    print(f"Total completed: {counts['completed']}")
+    print(f"Total failed: {counts['failed']}")
+    print(f"Elapsed: {elapsed:.0f}s ({counts['completed'] / elapsed * 3600 if elapsed > 0 else 0:.0f} plans/hour)")
+    print(f"Concurrency: ended at {limiter.limit}, peak {limiter.peak}; backed off {limiter.backoffs}x")
+    summary = backend.summary()
+    if summary:
+        print(summary)
+    print(f"\nJSON files: {getattr(backend, 'json_dir', json_dir)}/")
+    print(f"Progress file: {journal.snapshot_path}")
+    if queue:
+        queued = queue.counts()
+        print(f"Work queue: {queued['pending']} pending, {queued['leased']} leased by other nodes, "
+              f"{queued['done']} done, {queued['failed']} failed")
+        queue.close()
+    return counts
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
-Scrape remaining 35 SC plans - save RAW HTML then parse.
+Scrape the SC plans still missing details - save RAW HTML then parse.
 Two-step approach that worked for priority plans.
+Plans come from plan_priority.py, widest-reaching first.
 """
 import json
 import time
@@ -13,21 +14,11 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium_stealth import stealth
 
+from plan_priority import missing_plan_ids
+
 RAW_DIR = Path('./raw_sc_plans')
 RAW_DIR.mkdir(exist_ok=True)
 
-MISSING_PLANS = [
-    "H3146_036_0", "H3146_038_0", "H3146_040_0", "H5216_466_0",
-    "H5521_140_0", "H5521_245_0", "H5521_249_0", "H5521_251_0",
-    "H5521_319_0", "H5521_500_0", "H5525_049_0", "H6345_002_0",
-    "H7020_010_1", "H7020_010_2", "H7020_011_1", "H7020_011_2",
-    "H7849_136_1", "H7849_136_2", "H8003_001_0", "H8003_002_0",
-    "H8003_004_0", "H8003_005_0", "H8145_069_0", "H8176_004_1",
-    "S4802_070_0", "S4802_144_0", "S5601_018_0", "S5617_218_0",
-    "S5617_359_0", "S5884_134_0", "S5884_155_0", "S5884_188_0",
-    "S5921_354_0", "S5921_391_0", "S5953_001_0"
-]
-
 def create_driver():
     opts = Options()
     opts.add_argument('--headless=new')
@@ -81,21 +72,22 @@ def main():
     print("="*80)
     print("SCRAPING MISSING SC PLANS - RAW HTML")
     print("="*80)
-    print(f"Plans: {len(MISSING_PLANS)}")
+    missing_plans = missing_plan_ids(['South Carolina'])
+    print(f"Plans: {len(missing_plans)}")
     print(f"Output: {RAW_DIR}\n")
     
     driver = create_driver()
     
     try:
         success = 0
-        for i, plan_id in enumerate(MISSING_PLANS, 1):
-            print(f"[{i}/{len(MISSING_PLANS)}] {plan_id}...", flush=True)
+        for i, plan_id in enumerate(missing_plans, 1):
+            print(f"[{i}/{len(missing_plans)}] {plan_id}...", flush=True)
             if scrape_raw(driver, plan_id):
                 success += 1
             time.sleep(1)
         
         print(f"\n{'='*80}")
-        print(f"RAW SCRAPING COMPLETE: {success}/{len(MISSING_PLANS)}")
+        print(f"RAW SCRAPING COMPLETE: {success}/{len(missing_plans)}")
         print(f"{'='*80}\n")
         print("Next step: Parse with parse_sc_raw_content.py")
         
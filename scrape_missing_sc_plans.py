@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
-Scrape the remaining 35 South Carolina Medicare plans to complete coverage.
+Scrape the South Carolina Medicare plans still missing details to complete coverage.
 Uses robust extraction similar to scrape_priority_plans.py
+Plans come from plan_priority.py, widest-reaching first.
 """
 import json
 import time
@@ -14,18 +15,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium_stealth import stealth
 from bs4 import BeautifulSoup
 
-# Missing plan IDs
-MISSING_PLANS = [
-    "H3146_036_0", "H3146_038_0", "H3146_040_0", "H5216_466_0",
-    "H5521_140_0", "H5521_245_0", "H5521_249_0", "H5521_251_0",
-    "H5521_319_0", "H5521_500_0", "H5525_049_0", "H6345_002_0",
-    "H7020_010_1", "H7020_010_2", "H7020_011_1", "H7020_011_2",
-    "H7849_136_1", "H7849_136_2", "H8003_001_0", "H8003_002_0",
-    "H8003_004_0", "H8003_005_0", "H8145_069_0", "H8176_004_1",
-    "S4802_070_0", "S4802_144_0", "S5601_018_0", "S5617_218_0",
-    "S5617_359_0", "S5884_134_0", "S5884_155_0", "S5884_188_0",
-    "S5921_354_0", "S5921_391_0", "S5953_001_0"
-]
+from plan_priority import missing_plan_ids
 
 OUTPUT_DIR = Path("scraped_json_all")
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -195,7 +185,8 @@ def main():
     print("="*80)
     print("SCRAPING MISSING SOUTH CAROLINA PLANS")
     print("="*80)
-    print(f"\nTotal plans to scrape: {len(MISSING_PLANS)}")
+    missing_plans = missing_plan_ids(['South Carolina'])
+    print(f"\nTotal plans to scrape: {len(missing_plans)}")
     print(f"Output directory: {OUTPUT_DIR}")
     
     driver = setup_driver()
@@ -204,8 +195,8 @@ def main():
         success_count = 0
         failed_plans = []
         
-        for i, plan_id in enumerate(MISSING_PLANS, 1):
-            print(f"\n[{i}/{len(MISSING_PLANS)}]", end=" ")
+        for i, plan_id in enumerate(missing_plans, 1):
+            print(f"\n[{i}/{len(missing_plans)}]", end=" ")
             
             if scrape_plan(driver, plan_id):
                 success_count += 1
@@ -218,7 +209,7 @@ def main():
         print("\n" + "="*80)
         print("SCRAPING COMPLETE")
         print("="*80)
-        print(f"\nSuccessful: {success_count}/{len(MISSING_PLANS)}")
+        print(f"\nSuccessful: {success_count}/{len(missing_plans)}")
         
         if failed_plans:
             print(f"\nFailed plans ({len(failed_plans)}):")
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
-Re-scrape 3 priority plans for ZIP 29401 to ensure perfect data quality.
-Plans: H5322_043_0, H5322_044_0, R2604_005_0
+Re-scrape the 3 highest-priority plans for ZIP 29401 to ensure perfect data quality.
+Priority comes from plan_priority.py (reach, missing details, staleness).
 """
 import json
 import time
@@ -16,33 +16,21 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium_stealth import stealth
 from bs4 import BeautifulSoup
 
+from plan_priority import rank_plans
+
 JSON_DIR = Path('./scraped_json_all')
 JSON_DIR.mkdir(exist_ok=True)
 
-# Priority plans
-PRIORITY_PLANS = [
-    {
-        'plan_id': 'H5322_043_0',
-        'contract': 'H5322',
-        'plan_num': '043',
-        'segment': '0',
-        'name': 'AARP Medicare Advantage Patriot No Rx SC-MA01 (HMO-POS)'
-    },
-    {
-        'plan_id': 'H5322_044_0',
-        'contract': 'H5322',
-        'plan_num': '044',
-        'segment': '0',
-        'name': 'AARP Medicare Advantage from UHC SC-0006 (HMO-POS)'
-    },
-    {
-        'plan_id': 'R2604_005_0',
-        'contract': 'R2604',
-        'plan_num': '005',
-        'segment': '0',
-        'name': 'UHC Medicare Advantage Patriot No Rx GS-MA01 (Regional PPO)'
-    }
-]
+# How many of the top plans (plan_priority.py) offered in ZIP_CODE to re-scrape
+ZIP_CODE = '29401'
+PRIORITY_COUNT = 3
+
+def priority_plans_for_zip(zip_code=ZIP_CODE, count=PRIORITY_COUNT):
+    """The highest-priority South Carolina plans a lookup of zip_code returns"""
+    with open('mock_api/SC/zip_to_plans.json') as f:
+        zip_plan_ids = set(json.load(f)[zip_code])
+    ranked = rank_plans(states=['South Carolina'])
+    return [p for p in ranked if p['plan_id'] in zip_plan_ids][:count]
 
 USER_AGENTS = [
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -154,9 +142,10 @@ def scrape_plan(driver, plan):
         return None
 
 def main():
-    print("=== Re-scraping Priority Plans for ZIP 29401 ===\n")
+    print(f"=== Re-scraping Priority Plans for ZIP {ZIP_CODE} ===\n")
+    priority_plans = priority_plans_for_zip()
     print("Plans to scrape:")
-    for p in PRIORITY_PLANS:
+    for p in priority_plans:
         print(f"  - {p['plan_id']}: {p['name']}")
     print()
     
@@ -164,9 +153,9 @@ def main():
     success = 0
     
     try:
-        for i, plan in enumerate(PRIORITY_PLANS, 1):
+        for i, plan in enumerate(priority_plans, 1):
             plan_id = plan['plan_id']
-            print(f"[{i}/{len(PRIORITY_PLANS)}] {plan_id}")
+            print(f"[{i}/{len(priority_plans)}] {plan_id}")
             print(f"  {plan['name'][:60]}")
             
             html = scrape_plan(driver, plan)
@@ -201,7 +190,7 @@ def main():
                 print(f"  ✗ Failed to scrape")
             
             # Delay between plans
-            if i < len(PRIORITY_PLANS):
+            if i < len(priority_plans):
                 delay = random.uniform(10, 15)
                 print(f"  Waiting {delay:.1f}s...")
                 time.sleep(delay)
@@ -210,7 +199,7 @@ def main():
         driver.quit()
     
     print(f"\n=== Complete ===")
-    print(f"Successfully scraped: {success}/{len(PRIORITY_PLANS)}")
+    print(f"Successfully scraped: {success}/{len(priority_plans)}")
 
 if __name__ == '__main__':
     main()
@@ -13,31 +13,12 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium_stealth import stealth
 
+from plan_priority import rank_plans
+
 JSON_DIR = Path('./scraped_json_all')
 
-PRIORITY_PLANS = [
-    {
-        'plan_id': 'H5322_043_0',
-        'contract': 'H5322',
-        'plan_num': '043',
-        'segment': '0',
-        'name': 'AARP Medicare Advantage Patriot No Rx SC-MA01 (HMO-POS)'
-    },
-    {
-        'plan_id': 'H5322_044_0',
-        'contract': 'H5322',
-        'plan_num': '044',
-        'segment': '0',
-        'name': 'AARP Medicare Advantage from UHC SC-0006 (HMO-POS)'
-    },
-    {
-        'plan_id': 'R2604_005_0',
-        'contract': 'R2604',
-        'plan_num': '005',
-        'segment': '0',
-        'name': 'UHC Medicare Advantage Patriot No Rx GS-MA01 (Regional PPO)'
-    }
-]
+# How many of South Carolina's top plans (plan_priority.py) to re-scrape
+PRIORITY_COUNT = 3
 
 def create_driver():
     opts = Options()
@@ -65,14 +46,15 @@ def create_driver():
 def main():
     print("=== Scraping Priority Plans (Raw Content) ===\n")
     
+    priority_plans = rank_plans(states=['South Carolina'])[:PRIORITY_COUNT]
     driver = create_driver()
     
     try:
-        for i, plan in enumerate(PRIORITY_PLANS, 1):
+        for i, plan in enumerate(priority_plans, 1):
             plan_id = plan['plan_id']
             url = f"https://www.medicare.gov/plan-compare/#/plan-details/2026-{plan['contract']}-{plan['plan_num']}-{plan['segment']}?year=2026&lang=en"
             
-            print(f"[{i}/3] {plan_id}: {plan['name'][:60]}")
+            print(f"[{i}/{len(priority_plans)}] {plan_id}: {plan['name'][:60]}")
             
             try:
                 driver.get(url)
@@ -121,7 +103,7 @@ def main():
             except Exception as e:
                 print(f"  ✗ Error: {e}")
             
-            if i < len(PRIORITY_PLANS):
+            if i < len(priority_plans):
                 time.sleep(random.uniform(8, 12))
     
     finally:
@@ -134,7 +116,7 @@ def main():
     sys.path.insert(0, '.')
     from parse_sc_raw_content import parse_plan_file
     
-    for plan in PRIORITY_PLANS:
+    for plan in priority_plans:
         plan_id = plan['plan_id']
         filepath = JSON_DIR / f"South_Carolina-{plan_id}.json"
         
@@ -14,6 +14,10 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
+from page_ready import PageReadiness
+
+# Read each page as soon as its plan tables stop changing (at most 5s)
+PAGE_READINESS = PageReadiness()
 
 # Create directory for saving HTML responses
 html_dir = Path('./scraped_html_selenium')
@@ -71,8 +75,9 @@ def scrape_plan(driver, plan_data, state_name):
         print(f"  Waiting for tables to render...")
         wait.until(EC.presence_of_element_located((By.CLASS_NAME, "mct-c-table")))
 
-        # Give it extra time for all content to fully render
-        time.sleep(5)
+        # Give the remaining content time to render, until the tables stop changing
+        waited = PAGE_READINESS.wait(driver, url)
+        print(f"  Tables settled after {waited:.2f}s")
 
         # Get the rendered HTML
         html_content = driver.page_source
@@ -170,6 +175,7 @@ def main():
     print(f"Total requests: {len(results)}")
     print(f"Successful: {successful}")
     print(f"Failed: {failed}")
+    print(PAGE_READINESS.summary())
 
     if failed > 0:
         print("\nFailed requests:")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test the all-states county cache build on a small synthetic landscape
+Run with pytest or directly: python test_build_all_county_caches.py
+"""
+
+import csv
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import build_all_county_caches
+import landscape
+
+HEADER = [
+    'State Territory Name', 'State Territory Abbreviation', 'County Name',
+    'ContractPlanSegmentID', 'Plan Name', 'Plan Type', 'Organization Marketing Name',
+    'Part C Premium', 'Part D Total Premium', 'Overall Star Rating', 'SNP Type',
+    'Parent Organization Name'
+]
+
+def plan_row(state, abbr, county, plan_id):
+    return [state, abbr, county, plan_id, f'Plan {plan_id}', 'HMO', 'Org', '$0.00', '$0.00', '4', '', 'Parent']
+
+ROWS = [
+    plan_row('New Hampshire', 'NH', 'All Counties', 'S4802_075_0'),
+    plan_row('New Hampshire', 'NH', 'Cheshire', 'H5216_059_0'),
+    plan_row('Vermont', 'VT', 'Addison', 'H2001_001_0'),
+    plan_row('Vermont', 'VT', 'Bennington', 'H2001_001_0'),
+]
+
+def test_all_states_build_across_the_process_pool():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        csv_path = root / landscape.CSV_CANDIDATES[0]
+        csv_path.parent.mkdir(parents=True)
+        with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(ROWS)
+        (root / 'scraped_json_all').mkdir()
+        (root / 'scraped_json_all' / 'Vermont-H2001_001_0.json').write_text(json.dumps({'plan': 'vt'}))
+
+        os.chdir(root)
+        try:
+            build_all_county_caches.main(['--all', '--workers', '2'])
+        finally:
+            os.chdir(cwd)
+            landscape._TABLES.clear()
+
+        nh = json.loads((root / 'mock_api/NH/plans.json').read_text())
+        vt = json.loads((root / 'mock_api/VT/plans.json').read_text())
+        assert sorted(nh['plans']) == ['H5216_059_0', 'S4802_075_0']
+        assert vt['plans']['H2001_001_0']['counties'] == ['Addison', 'Bennington']
+        assert vt['plans']['H2001_001_0']['details'] == {'plan': 'vt'}
+        assert sorted(p.name for p in (root / 'mock_api/VT/counties').iterdir()) == ['Addison.json', 'Bennington.json']
+
+def test_write_json_atomic_skips_unchanged_outputs():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'plans.json'
+        assert build_all_county_caches.write_json_atomic(path, {'plans': {}}) is True
+        os.utime(path, ns=(10**9, 10**9))
+
+        assert build_all_county_caches.write_json_atomic(path, {'plans': {}}) is False
+        assert path.stat().st_mtime_ns == 10**9  # Untouched, so mtime-based checks see no change
+
+        assert build_all_county_caches.write_json_atomic(path, {'plans': {'H1': {}}}) is True
+        assert json.loads(path.read_text()) == {'plans': {'H1': {}}}
+        assert [p.name for p in Path(tmp).iterdir()] == ['plans.json']  # No temp file left
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
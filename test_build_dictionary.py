@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test the learned minification dictionary on a small synthetic ZIP corpus
+Run with pytest or directly: python test_build_dictionary.py
+"""
+
+import importlib
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'minification'))
+import build_dictionary
+import minify_state_endpoint
+
+def plan(plan_id, copay):
+    return {
+        'plan_id': plan_id,
+        'plan_type': None,
+        'plan_info': {'name': f'Humana Gold Plus {plan_id} (HMO D-SNP)', 'organization': 'Humana',
+                      'type': 'Medicare Advantage with drug coverage'},
+        'maximum_out_of_pocket': {'Maximum you pay for health services': '$9,350 In-network'},
+        'contact_info': {'Plan address': 'P.O. Box 14168\nLexington, KY 40512'},
+        'benefits': {'Doctor Services': {'Emergency care': copay, 'Urgent care': '$0-$40 copay'}},
+    }
+
+def write_corpus(zip_dir, copay='$115 copay'):
+    zip_dir.mkdir(parents=True, exist_ok=True)
+    for i, (zip_code, states) in enumerate([('29401', ['SC']), ('29402', ['SC']), ('30301', ['GA', 'SC'])]):
+        data = {'zip_code': zip_code, 'multi_state': len(states) > 1, 'states': states, 'primary_state': states[0],
+                'counties': [], 'plans': [plan(f'H0710_05{i}_0', copay), plan('H0710_099_0', copay)], 'plan_count': 2}
+        (zip_dir / f'{zip_code}.json').write_text(json.dumps(data))
+
+def decode(obj, keys, values):
+    if isinstance(obj, dict):
+        return {keys.get(k, k): decode(v, keys, values) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode(item, keys, values) for item in obj]
+    return values.get(obj, obj) if isinstance(obj, str) else obj
+
+def test_learned_dictionary_round_trips_and_reports_by_state():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_dir, mapping_dir = Path(tmp) / 'zip', Path(tmp) / 'mappings'
+        write_corpus(zip_dir)
+        try:
+            report = build_dictionary.main(['--input', str(zip_dir), '--output', str(mapping_dir)])
+            key_data = json.loads((mapping_dir / 'key_mapping.json').read_text())
+            value_data = json.loads((mapping_dir / 'value_mapping.json').read_text())
+
+            assert key_data['version'] == value_data['version'] == 1
+            assert 'Maximum you pay for health services' in key_data['mapping']
+            assert '$115 copay' in value_data['values'].values()
+            assert list(value_data['organizations'].values()) == ['Humana']
+            assert 'P.O. Box 14168\nLexington, KY 40512' in value_data['addresses'].values()
+            assert list(value_data['network_types'].values()) == ['HMO D-SNP']
+            assert 'H0710_050_0' not in value_data['values'].values()  # Seen once: not worth an entry
+
+            original = json.loads((zip_dir / '30301.json').read_text())
+            minified = minify_state_endpoint.minify_zip_data(original)
+            assert minified['dv'] == 1
+            keys = {code: key for key, code in key_data['mapping'].items()}
+            values = {code: value for category in build_dictionary.CODE_PREFIXES for code, value in value_data[category].items()}
+            assert [decode({k: v for k, v in p.items() if k != 'pt'}, keys, values) for p in minified['p']] == original['plans']
+
+            assert (report['SC']['zips'], report['GA']['zips']) == (3, 1)
+            assert report['SC']['minified'] < report['SC']['original'] / 2
+        finally:
+            importlib.reload(minify_state_endpoint)
+
+def test_version_changes_only_with_the_dictionary_and_codes_are_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_dir, mapping_dir = Path(tmp) / 'zip', Path(tmp) / 'mappings'
+        write_corpus(zip_dir)
+        try:
+            build_dictionary.main(['--input', str(zip_dir), '--output', str(mapping_dir)])
+            first = json.loads((mapping_dir / 'value_mapping.json').read_text())
+            report = build_dictionary.main(['--input', str(zip_dir), '--output', str(mapping_dir)])
+            assert json.loads((mapping_dir / 'value_mapping.json').read_text()) == first
+            assert report['SC']['previous'] == report['SC']['minified']
+
+            write_corpus(zip_dir, copay='$120 copay')
+            build_dictionary.main(['--input', str(zip_dir), '--output', str(mapping_dir)])
+            second = json.loads((mapping_dir / 'value_mapping.json').read_text())
+            assert second['version'] == 2
+            assert second['organizations'] == first['organizations']
+            assert '$120 copay' in second['values'].values() and '$115 copay' not in second['values'].values()
+        finally:
+            importlib.reload(minify_state_endpoint)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
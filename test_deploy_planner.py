@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test the hash-based deploy planner against an in-memory S3 stub
+Run with pytest or directly: python test_deploy_planner.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from deploy_planner import deploy, invalidation_paths, object_headers
+
+
+class StubS3:
+    """Bucket + CloudFront stand-in recording every call and the peak upload concurrency"""
+
+    def __init__(self, fail=()):
+        self.objects = {}
+        self.invalidations = []
+        self.fail = set(fail)
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def put(self, path, key, **headers):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.01)
+            if key in self.fail:
+                raise RuntimeError('upload failed')
+            self.objects[key] = (Path(path).read_bytes(), headers)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def delete(self, key):
+        self.objects.pop(key, None)
+
+    def invalidate(self, paths):
+        if 'CloudFront' in self.fail:
+            raise RuntimeError('invalidation failed')
+        self.invalidations.append(paths)
+        return f'I{len(self.invalidations)}'
+
+
+def write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    if mtime:
+        os.utime(path, (mtime, mtime))
+
+
+def test_only_changed_objects_are_uploaded_and_invalidated():
+    with tempfile.TemporaryDirectory() as tmp:
+        root, manifest = Path(tmp) / 'static_api', Path(tmp) / '.deploy_manifest.json'
+        for zip_code in ['29401', '29402', '29403', '29404']:
+            write(root / 'medicare' / 'zip' / f'{zip_code}.json', '{"premium":"$10.00"}')
+        write(root / 'medicare' / 'zip' / '29401.json.gz', 'gzip bytes')
+        write(root / 'medicare' / 'zip_states.json', '{}')  # Build bookkeeping
+
+        s3 = StubS3()
+        first = deploy(s3, root, 'bucket', manifest, workers=3)
+        assert len(first['uploaded']) == 5 and 'medicare/zip_states.json' not in s3.objects
+        assert first['invalidation'] == [] and s3.invalidations == []  # Nothing was cached yet
+        assert 1 < s3.peak <= 3
+        assert s3.objects['medicare/zip/29401.json.gz'][1] == {
+            'content_type': 'application/json', 'content_encoding': 'gzip', 'cache_control': 'max-age=3600'}
+
+        # Same size, different content; touched but identical; new
+        write(root / 'medicare' / 'zip' / '29401.json', '{"premium":"$12.00"}')
+        write(root / 'medicare' / 'zip' / '29402.json', '{"premium":"$10.00"}', mtime=1000)
+        write(root / 'medicare' / 'zip' / '29405.json', '{"premium":"$0.00"}')
+        (root / 'medicare' / 'zip' / '29403.json').unlink()
+
+        assert deploy(s3, root, 'bucket', manifest, dry_run=True)['upload'] == [
+            'medicare/zip/29401.json', 'medicare/zip/29405.json']
+        second = deploy(s3, root, 'bucket', manifest, delete=True)
+        assert second['uploaded'] == ['medicare/zip/29401.json', 'medicare/zip/29405.json']
+        assert second['deleted'] == ['medicare/zip/29403.json'] and 'medicare/zip/29403.json' not in s3.objects
+        assert s3.invalidations == [['/medicare/zip/29401.json', '/medicare/zip/29403.json']]
+        assert s3.objects['medicare/zip/29401.json'][0] == b'{"premium":"$12.00"}'
+
+        assert deploy(s3, root, 'bucket', manifest, delete=True)['upload'] == []
+        assert deploy(s3, root, 'other-bucket', manifest, dry_run=True)['unchanged'] == 0
+
+def test_failed_uploads_are_retried_and_includes_scope_deletes():
+    with tempfile.TemporaryDirectory() as tmp:
+        root, manifest = Path(tmp) / 'static_api', Path(tmp) / '.deploy_manifest.json'
+        write(root / 'medicare' / 'zip' / '29401.json', 'sc')
+        write(root / 'medicare' / 'zip' / '03602.json', 'nh')
+
+        s3 = StubS3(fail={'medicare/zip/03602.json'})
+        plan = deploy(s3, root, 'bucket', manifest)
+        assert plan['uploaded'] == ['medicare/zip/29401.json'] and list(plan['failed']) == ['medicare/zip/03602.json']
+        s3.fail.clear()
+        assert deploy(s3, root, 'bucket', manifest)['uploaded'] == ['medicare/zip/03602.json']
+
+        (root / 'medicare' / 'zip' / '03602.json').unlink()
+        sc_only = deploy(s3, root, 'bucket', manifest, include=['medicare/zip/29*'], delete=True)
+        assert sc_only['delete'] == [] and 'medicare/zip/03602.json' in s3.objects
+
+def test_failed_invalidations_are_retried_by_the_next_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        root, manifest = Path(tmp) / 'static_api', Path(tmp) / '.deploy_manifest.json'
+        write(root / 'medicare' / 'zip' / '29401.json', '{"premium":"$10.00"}')
+        write(root / 'medicare' / 'zip' / '29402.json', '{"premium":"$10.00"}')
+        s3 = StubS3()
+        deploy(s3, root, 'bucket', manifest)
+
+        write(root / 'medicare' / 'zip' / '29401.json', '{"premium":"$12.00"}')
+        s3.fail.add('CloudFront')
+        plan = deploy(s3, root, 'bucket', manifest)
+        assert plan['uploaded'] == ['medicare/zip/29401.json'] and 'CloudFront invalidation' in plan['failed']
+        s3.fail.clear()
+
+        # Nothing left to upload, but the replaced object is still cached
+        write(root / 'medicare' / 'zip' / '29402.json', '{"premium":"$11.00"}')
+        assert deploy(s3, root, 'bucket', manifest, dry_run=True)['invalidation'] == [
+            '/medicare/zip/29401.json', '/medicare/zip/29402.json']
+        plan = deploy(s3, root, 'bucket', manifest)
+        assert plan['uploaded'] == ['medicare/zip/29402.json'] and not plan['failed']
+        assert s3.invalidations == [['/medicare/zip/29401.json', '/medicare/zip/29402.json']]
+
+        # Skipped invalidations stay pending too; a successful one clears them
+        write(root / 'medicare' / 'zip' / '29401.json', '{"premium":"$13.00"}')
+        assert deploy(s3, root, 'bucket', manifest, invalidate=False)['invalidation_id'] is None
+        assert deploy(s3, root, 'bucket', manifest)['invalidation'] == ['/medicare/zip/29401.json']
+        assert deploy(s3, root, 'bucket', manifest)['invalidation'] == []
+        assert len(s3.invalidations) == 2
+
+def test_headers_and_invalidation_paths():
+    assert object_headers('medicare/zip_shared/plans_SC.0123456789abcdef.json.br') == {
+        'content_type': 'application/json', 'content_encoding': 'br',
+        'cache_control': 'public, max-age=31536000, immutable'}
+    assert object_headers('medicare/mappings/v3/key_mapping.json')['cache_control'].endswith('immutable')
+    assert object_headers('medicare/states.json')['cache_control'] == 'max-age=3600'
+
+    keys = [f'medicare/zip/{n:05d}.json' for n in range(29000, 29010)] + ['medicare/states.json']
+    assert len(invalidation_paths(keys)) == 11
+    assert invalidation_paths(keys[:10], max_paths=5) == ['/medicare/zip/*']
+    assert invalidation_paths(keys, max_paths=5) == ['/medicare/*']
+    assert invalidation_paths(keys, max_paths=5, max_wildcards=0) == ['/*']
+    # states.json sits at the top of the bucket: one /*, not /* next to narrower wildcards
+    assert invalidation_paths(keys + ['states.json'], max_paths=5) == ['/*']
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test the driver pool with fake drivers (no Chrome needed)
+Run with pytest or directly: python test_driver_pool.py
+"""
+
+import threading
+
+from driver_pool import DriverPool
+
+class FakeDriver:
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.alive = True
+        self.quit_called = False
+        self.pages = []
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError('chrome not reachable')
+        return 1
+
+    def get(self, url):
+        if not self.alive:
+            raise RuntimeError('invalid session id')
+        self.pages.append(url)
+        return f'<html>{url}</html>'
+
+    def quit(self):
+        self.quit_called = True
+        self.alive = False
+
+def test_driver_is_reused_and_recycled_after_max_pages():
+    created = []
+    pool = DriverPool(lambda worker_id: created.append(FakeDriver(worker_id)) or created[-1], max_pages=3)
+
+    for i in range(7):
+        pool.run(lambda driver: driver.get(f'/plan/{i}'))
+
+    assert [len(d.pages) for d in created] == [3, 3, 1]
+    assert created[0].quit_called and created[1].quit_called
+    assert pool.stats['recycled_pages'] == 2
+    pool.close()
+    assert created[2].quit_called
+
+def test_crashed_driver_is_restarted_transparently():
+    created = []
+    pool = DriverPool(lambda worker_id: created.append(FakeDriver(worker_id)) or created[-1], max_pages=100)
+
+    pool.run(lambda driver: driver.get('/plan/1'))
+    created[0].alive = False  # Chrome died between pages
+    assert pool.run(lambda driver: driver.get('/plan/2')) == '<html>/plan/2</html>'
+
+    def crash_mid_page(driver):
+        if driver is created[1]:
+            driver.alive = False
+        return driver.get('/plan/3')
+
+    assert pool.run(crash_mid_page) == '<html>/plan/3</html>'
+    assert len(created) == 3
+    assert pool.stats['restarted_crashed'] == 2
+
+def test_page_errors_keep_a_healthy_driver():
+    created = []
+    pool = DriverPool(lambda worker_id: created.append(FakeDriver(worker_id)) or created[-1])
+
+    def timeout(driver):
+        raise TimeoutError('page never rendered')
+
+    try:
+        pool.run(timeout)
+    except TimeoutError:
+        pass
+    pool.run(lambda driver: driver.get('/plan/1'))
+    assert len(created) == 1
+
+def test_memory_threshold_recycles():
+    memory = {'mb': 100}
+    created = []
+    pool = DriverPool(lambda worker_id: created.append(FakeDriver(worker_id)) or created[-1],
+                      max_pages=0, max_memory_mb=500, memory_usage=lambda driver: memory['mb'])
+    pool.run(lambda driver: driver.get('/plan/1'))
+    memory['mb'] = 900
+    pool.run(lambda driver: driver.get('/plan/2'))
+    pool.run(lambda driver: driver.get('/plan/3'))
+    assert [d.pages for d in created] == [['/plan/1', '/plan/2'], ['/plan/3']]
+    assert pool.stats['recycled_memory'] == 2
+
+def test_one_driver_per_thread():
+    created = []
+    lock = threading.Lock()
+
+    def create(worker_id):
+        with lock:
+            created.append(FakeDriver(worker_id))
+            return created[-1]
+
+    pool = DriverPool(create, max_pages=100)
+    threads = [threading.Thread(target=lambda: [pool.run(lambda d: d.get('/x')) for _ in range(5)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(d.worker_id for d in created) == [0, 1, 2, 3]
+    assert all(len(d.pages) == 5 for d in created)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed HTML store
+Run with pytest or directly: python test_html_store.py
+"""
+
+import gzip
+import json
+import multiprocessing
+import os
+import tempfile
+from pathlib import Path
+
+import html_store
+from html_store import HtmlStore, import_directory
+
+PAGE = '<html><body><h1>Humana Gold Plus (HMO)</h1>' + '<table class="mct-c-table"></table>' * 50 + '</body></html>'
+
+def test_identical_pages_are_stored_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HtmlStore(Path(tmp) / 'store')
+        first = store.put('Alaska-H0001_001_0', PAGE, scraped_at=100)
+        retry = store.put('Alaska-H0001_001_0', PAGE, scraped_at=200)
+        other = store.put('Alaska-H0001_002_0', PAGE, scraped_at=150)
+        changed = store.put('Alaska-H0001_002_0', PAGE + '<!-- v2 -->', scraped_at=300)
+
+        assert (first['new'], retry['new'], other['new'], changed['new']) == (True, False, False, True)
+        assert first['blob'] == retry['blob'] == other['blob']
+        assert first['stored_size'] < first['size'] / 5
+        assert len(list((Path(tmp) / 'store' / 'blobs').rglob('*.html.*'))) == 2
+
+        reopened = HtmlStore(Path(tmp) / 'store')
+        assert reopened.get('Alaska-H0001_001_0') == PAGE
+        assert reopened.get('Alaska-H0001_002_0') == PAGE + '<!-- v2 -->'
+        assert reopened.get('Alaska-H0009_001_0') is None
+        assert [e['time'] for e in reopened.history('Alaska-H0001_002_0')] == [150, 300]
+        assert [(e['plan_id'], e['state']) for e, _ in reopened.iter_pages()] == [
+            ('H0001_001_0', 'Alaska'), ('H0001_002_0', 'Alaska')]
+        stats = reopened.stats()
+        assert (stats['pages'], stats['scrapes'], stats['blobs']) == (2, 4, 2)
+
+def test_torn_index_line_and_gzip_blobs_are_readable():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HtmlStore(tmp)
+        zstandard = html_store.zstandard
+        html_store.zstandard = None  # Without zstandard installed
+        try:
+            entry = store.put('Vermont-H2001_001_0', PAGE)
+        finally:
+            html_store.zstandard = zstandard
+        assert entry['blob'].endswith('.html.gz')
+        assert gzip.decompress((Path(tmp) / entry['blob']).read_bytes()).decode() == PAGE
+
+        with open(store.index_path, 'a') as f:
+            f.write('{"name": "Vermont-H2001_002_0", "pla')  # Killed mid-append
+        assert list(HtmlStore(tmp).latest()) == ['Vermont-H2001_001_0']
+        store = HtmlStore(tmp)
+        assert store.put('Vermont-H2001_001_0', PAGE)['new'] is False
+        store.put('Vermont-H2001_003_0', PAGE)
+        assert sorted(HtmlStore(tmp).latest()) == ['Vermont-H2001_001_0', 'Vermont-H2001_003_0']
+        assert HtmlStore(tmp).get('Vermont-H2001_003_0') == PAGE
+        assert len(HtmlStore(tmp).history('Vermont-H2001_001_0')) == 2  # Not glued onto the fragment
+        assert len(store.index_path.read_text().splitlines()) == 3
+
+def put_pages(root, state, n):
+    with HtmlStore(root, fsync_every=8) as store:
+        for i in range(n):
+            store.put(f'{state}-H{i:04d}_001_0', PAGE + f'<!-- {state} {i} -->')
+
+def test_processes_sharing_a_store_never_interleave_index_lines():
+    with tempfile.TemporaryDirectory() as tmp:
+        workers = [multiprocessing.Process(target=put_pages, args=(tmp, state, 60))
+                   for state in ['Alaska', 'Vermont', 'Wyoming', 'Maine']]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        lines = (Path(tmp) / 'index.jsonl').read_text().splitlines()
+        assert len(lines) == 240 and len({json.loads(line)['name'] for line in lines}) == 240
+        assert HtmlStore(tmp).get('Maine-H0059_001_0') == PAGE + '<!-- Maine 59 -->'
+
+def test_import_keeps_scrape_times():
+    with tempfile.TemporaryDirectory() as tmp:
+        html_dir = Path(tmp) / 'scraped_html_all'
+        html_dir.mkdir()
+        for name in ['Alaska-H0001_001_0', 'Alaska-H0001_002_0']:
+            (html_dir / f'{name}.html').write_text(PAGE)
+            os.utime(html_dir / f'{name}.html', (1000, 1000))
+
+        store = HtmlStore(Path(tmp) / 'store')
+        counts = import_directory(store, html_dir, delete=True)
+        assert (counts['pages'], counts['new_blobs']) == (2, 1)
+        assert list(html_dir.iterdir()) == []
+        assert {e['time'] for e in store.latest().values()} == {1000}
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test the manifest-driven incremental build on a small synthetic tree
+Run with pytest or directly: python test_incremental_build.py
+"""
+
+import csv
+import importlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import incremental_build
+import landscape
+import precompress
+
+sys.path.insert(0, str(Path(__file__).parent / 'minification'))
+import build_dictionary
+import minify_state_endpoint
+from test_build_dictionary import write_corpus
+
+HEADER = [
+    'State Territory Name', 'State Territory Abbreviation', 'County Name',
+    'ContractPlanSegmentID', 'Plan Name', 'Plan Type', 'Organization Marketing Name',
+    'Part C Premium', 'Part D Total Premium', 'Overall Star Rating', 'SNP Type',
+    'Parent Organization Name'
+]
+
+def plan_row(state, abbr, county, plan_id):
+    return [state, abbr, county, plan_id, f'Plan {plan_id}', 'HMO', 'Org', '$0.00', '$0.00', '4', '', 'Parent']
+
+ROWS = [
+    plan_row('New Hampshire', 'NH', 'All Counties', 'S4802_075_0'),
+    plan_row('New Hampshire', 'NH', 'Cheshire', 'H5216_059_0'),
+    plan_row('New Hampshire', 'NH', 'Sullivan', 'H5216_060_0'),
+    plan_row('Vermont', 'VT', 'Addison', 'H2001_001_0'),
+]
+
+def write_tree(root, rows=ROWS):
+    csv_path = root / landscape.CSV_CANDIDATES[0]
+    csv_path.parent.mkdir(parents=True)
+    with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+    scraped = root / 'scraped_json_all'
+    scraped.mkdir()
+    for name in ['New_Hampshire-S4802_075_0', 'New_Hampshire-H5216_059_0', 'Vermont-H2001_001_0']:
+        (scraped / f'{name}.json').write_text(json.dumps({'plan': name, 'premiums': {}}))
+
+def test_rescraping_one_plan_rebuilds_only_its_outputs():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_tree(root)
+        os.chdir(root)
+        try:
+            first = incremental_build.main(['NH', 'VT'])
+            assert 'mock_api/NH/plans.json' in first
+            assert 'mock_api/VT/counties/Addison.json' in first
+
+            # Nothing changed: nothing rebuilt, nothing to deploy
+            assert incremental_build.main(['NH', 'VT']) == []
+
+            # Re-scrape one NH plan that only Cheshire offers
+            plan_file = root / 'scraped_json_all/New_Hampshire-H5216_059_0.json'
+            plan_file.write_text(json.dumps({'plan': 'updated', 'premiums': {'Total': '$1.00'}}))
+            changed = incremental_build.main(['NH', 'VT'])
+            assert changed == ['mock_api/NH/plans.json']
+
+            plans = json.loads((root / 'mock_api/NH/plans.json').read_text())['plans']
+            assert plans['H5216_059_0']['details']['plan'] == 'updated'
+            assert plans['S4802_075_0']['details']['plan'] == 'New_Hampshire-S4802_075_0'
+
+            # A plan scraped for the first time changes its county file too
+            (root / 'scraped_json_all/New_Hampshire-H5216_060_0.json').write_text(json.dumps({'plan': 'new'}))
+            changed = incremental_build.main(['NH', 'VT'])
+            assert changed == ['mock_api/NH/counties/Sullivan.json', 'mock_api/NH/plans.json']
+            assert (root / '.changed_files.txt').read_text().splitlines() == changed
+        finally:
+            os.chdir(cwd)
+            landscape._TABLES.clear()
+
+def test_short_landscape_rows_are_hashed():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_tree(root, ROWS + [plan_row('Vermont', 'VT', 'Bennington', 'H2001_002_0')[:9]])  # Ragged row
+        os.chdir(root)
+        try:
+            assert 'mock_api/VT/counties/Bennington.json' in incremental_build.main(['VT'])
+            assert incremental_build.main(['VT']) == []
+        finally:
+            os.chdir(cwd)
+            landscape._TABLES.clear()
+
+def test_changed_zips_refresh_the_shared_layout_and_publish_their_dictionary():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_tree(root)
+        static = root / 'static_api/medicare'
+        write_corpus(static / 'zip')
+        (static / 'zip_shared').mkdir()
+        os.chdir(root)
+        tables = []
+        try:
+            for copay in ['$115 copay', '$120 copay']:
+                write_corpus(static / 'zip', copay=copay)
+                build_dictionary.main(['--input', str(static / 'zip'), '--output', str(root / 'dictionary')])
+                minify_state_endpoint.load_mappings(root / 'dictionary')
+                version = minify_state_endpoint.MAPPING_VERSION
+                changed = incremental_build.main(['VT'] + (['--gzip-only'] if precompress.brotli is None else []))
+
+                assert f'static_api/medicare/mappings/v{version}/key_mapping.json' in changed
+                for zip_code in ['29401', '29402', '30301']:
+                    assert json.loads((static / f'zip_minified/{zip_code}_minified.json').read_text())['dv'] == version
+                    shared = json.loads((static / f'zip_shared/{zip_code}.json').read_text())
+                    table = json.loads((static / 'zip_shared' / shared['tb']).read_text())
+                    assert shared['dv'] == table['dv'] == version
+                tables.append(sorted(p.name for p in (static / 'zip_shared').glob('plans_*.json')))
+            assert [name.split('.')[0] for name in tables[1]] == ['plans_GA', 'plans_SC']
+            assert not set(tables[0]) & set(tables[1])  # The first run's tables were replaced
+        finally:
+            os.chdir(cwd)
+            landscape._TABLES.clear()
+            importlib.reload(minify_state_endpoint)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
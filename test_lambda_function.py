@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Test the Lambda handler against the mock_api data
+Run with pytest or directly: python test_lambda_function.py
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import lambda_function
+
+def reset(data_dir=None):
+    """Drop the warm-container caches so the next call reloads from disk"""
+    lambda_function._STATE_DATA.clear()
+    lambda_function._COUNTY_CACHES.clear()
+    lambda_function.invalidate_response_cache()
+    lambda_function.DATA_DIR = data_dir or Path(lambda_function.__file__).parent / 'mock_api'
+
+def split_plan_store(src_state_dir, dst_state_dir):
+    """Rewrite inline-details county caches into the plans.json layout"""
+    shutil.copy(src_state_dir / 'zip_to_county_multi.json', dst_state_dir)
+    (dst_state_dir / 'counties').mkdir()
+    plan_store = {}
+    for county_file in sorted((src_state_dir / 'counties').glob('*.json')):
+        county_data = json.loads(county_file.read_text())
+        for plan in county_data['plans']:
+            stored = plan_store.setdefault(plan['summary']['contract_plan_segment_id'], dict(plan, counties=[]))
+            stored['counties'].append(county_file.stem)
+        county_data['plans'] = [
+            {'summary': p['summary'], 'has_scraped_details': p['has_scraped_details']}
+            for p in county_data['plans']
+        ]
+        (dst_state_dir / 'counties' / county_file.name).write_text(json.dumps(county_data))
+    (dst_state_dir / 'plans.json').write_text(json.dumps({'plans': plan_store}))
+
+def call(path, query=None):
+    """Invoke the handler like a Function URL request"""
+    event = {'httpMethod': 'GET', 'path': path, 'queryStringParameters': query}
+    result = lambda_function.lambda_handler(event, None)
+    return result['statusCode'], json.loads(result['body'])
+
+def test_plan_index_lists_every_county():
+    reset()
+    index = lambda_function.get_plan_index('nh')
+
+    # S4802_075_0 is an "All Counties" plan, so every NH county serves it
+    plan, counties = index['S4802_075_0']
+    assert plan['summary']['contract_plan_segment_id'] == 'S4802_075_0'
+    assert counties == lambda_function.load_state('nh')['counties']
+
+def test_plan_detail_route():
+    status, body = call('/nh/plan/S4802_075_0')
+    assert status == 200
+    assert body['plan_id'] == 'S4802_075_0'
+    assert body['county'] == body['counties'][0]
+    assert len(body['counties']) == 10
+
+def test_plan_detail_not_found():
+    status, body = call('/nh/plan/X0000_000_0')
+    assert status == 404
+    assert body['error'] == 'Plan not found'
+
+def test_plan_store_layout_matches_inline_details():
+    requests = [
+        ('/nh/03602', None),
+        ('/nh/03602', {'details': '0'}),
+        ('/nh/plan/S4802_075_0', None),
+        ('/nh/counties', None)
+    ]
+    reset()
+    expected = [call(path, query) for path, query in requests]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state_dir = Path(tmp) / 'NH'
+        state_dir.mkdir()
+        split_plan_store(lambda_function.DATA_DIR / 'NH', state_dir)
+        reset(Path(tmp))
+        try:
+            assert [call(path, query) for path, query in requests] == expected
+
+            # County files no longer carry the details themselves
+            county = json.loads((state_dir / 'counties/Cheshire.json').read_text())
+            assert 'details' not in county['plans'][0]
+        finally:
+            reset()
+
+def test_zip_request_loads_only_its_counties():
+    reset()
+    status, body = call('/nh/03602', {'details': '0'})
+    assert status == 200
+
+    status, health = call('/health')
+    assert health['states_loaded'] == 1
+    assert health['resident'] == {'nh': sorted(body['counties'])}
+
+def test_county_cache_is_bounded():
+    reset()
+    cache = lambda_function._COUNTY_CACHES
+    max_entries = cache.max_entries
+    cache.max_entries = 2
+    try:
+        for zip_code in ['03462', '03602', '03256']:  # Cheshire, +Sullivan, Belknap/Grafton
+            call(f'/nh/{zip_code}', {'details': '0'})
+        assert len(cache) == 2
+        assert cache.keys() == [('nh', 'Belknap'), ('nh', 'Grafton')]
+    finally:
+        cache.max_entries = max_entries
+        reset()
+
+def test_eager_and_lazy_responses_match():
+    reset()
+    lazy = [call('/nh/03602'), call('/wy/82001', {'details': '0'}), call('/states')]
+    reset()
+    lambda_function.load_data()
+    eager = [call('/nh/03602'), call('/wy/82001', {'details': '0'}), call('/states')]
+    assert lazy == eager
+
+def test_repeat_zip_hits_are_served_from_response_cache():
+    reset()
+    first = lambda_function.get_plans_by_zip('nh', '03602', True)
+
+    # A cache hit must not need the county caches at all
+    lambda_function._COUNTY_CACHES.clear()
+    second = lambda_function.get_plans_by_zip('nh', '03602', True)
+    assert second['body'] is first['body']
+    assert len(lambda_function._COUNTY_CACHES) == 0
+
+    # Summary and full responses are cached separately
+    summary = lambda_function.get_plans_by_zip('nh', '03602', False)
+    assert summary['body'] != first['body']
+
+def test_response_cache_respects_data_version():
+    cache = lambda_function.ResponseCache(max_bytes=100)
+    cache.put(('nh', '03602', True), 'v1', 'x' * 40)
+    assert cache.get(('nh', '03602', True), 'v1') == 'x' * 40
+    assert cache.get(('nh', '03602', True), 'v2') is None
+
+def test_data_version_stats_only_the_plan_table_and_zip_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        state_dir = Path(tmp) / 'NH'
+        (state_dir / 'counties').mkdir(parents=True)
+        (state_dir / 'plans.json').write_text('{"plans": {}}')
+        (Path(tmp) / 'zip_index.bin').write_bytes(b'ZIPX')
+        version = lambda_function.data_version(state_dir)
+
+        (state_dir / 'counties' / 'Sullivan.json').write_text('{}')  # Not stat'ed
+        assert lambda_function.data_version(state_dir) == version
+
+        (Path(tmp) / 'zip_index.bin').write_bytes(b'ZIPX, rebuilt')
+        assert lambda_function.data_version(state_dir) != version
+
+        os.environ['DATA_VERSION'] = 'deploy-42'
+        try:
+            assert lambda_function.data_version(state_dir) == 'deploy-42'
+        finally:
+            del os.environ['DATA_VERSION']
+
+def test_response_cache_evicts_by_size():
+    cache = lambda_function.ResponseCache(max_bytes=100)
+    for zip_code in ['03462', '03602', '03256']:
+        cache.put(('nh', zip_code, True), 'v1', 'x' * 40)
+    assert cache.total_bytes == 80
+    assert cache.get(('nh', '03462', True), 'v1') is None
+    assert cache.get(('nh', '03256', True), 'v1') is not None
+
+    cache.put(('nh', 'big', True), 'v1', 'x' * 101)
+    assert cache.get(('nh', 'big', True), 'v1') is None
+
+def reference_zip_body(state_key, zip_code, include_details):
+    """ZIP response encoded the original way: build the full dict, then json.dumps"""
+    zip_info = lambda_function.load_state(state_key)['zips'][zip_code]
+    response = {
+        'zip_code': zip_code,
+        'state': lambda_function.STATES[state_key]['name'],
+        'state_abbr': lambda_function.STATES[state_key]['abbr'],
+        'multi_county': zip_info['multi_county'],
+        'primary_county': zip_info['primary_county']['name'],
+        'counties': {}
+    }
+    for county_info in zip_info['counties']:
+        county_data = lambda_function.load_county(state_key, county_info['name'])
+        if county_data is None:
+            continue
+        plans = json.loads(lambda_function.encode_summary_plans(county_data['plans']))
+        if include_details:
+            plans = county_data['plans']
+        response['counties'][county_info['name']] = {
+            'fips': county_info['fips'],
+            'percentage': county_info.get('percentage'),
+            'plan_count': len(plans),
+            'scraped_details_available': county_data['scraped_details_available'],
+            'plans': plans
+        }
+    return json.dumps(response)
+
+def test_spliced_zip_bodies_match_json_dumps():
+    reset()
+    for state_key in lambda_function.STATES:
+        for zip_code in lambda_function.load_state(state_key)['zips']:
+            for include_details in (True, False):
+                body = lambda_function.get_plans_by_zip(state_key, zip_code, include_details)['body']
+                assert body == reference_zip_body(state_key, zip_code, include_details), (state_key, zip_code)
+
+def test_splice_json():
+    assert lambda_function.splice_json('{}', 'plans', '[1, 2]') == json.dumps({'plans': [1, 2]})
+    assert lambda_function.splice_json('{"a": 1}', 'plans', '[]') == json.dumps({'a': 1, 'plans': []})
+
+def test_national_zip_route_spans_states():
+    reset()
+    assert call('/zip/03602', {'details': '0'}) == (200, {
+        'zip_code': '03602', 'multi_state': False, 'states': ['NH'],
+        'results': [call('/nh/03602', {'details': '0'})[1]]
+    })
+    assert call('/zip/99999')[0] == 404 and call('/zip/abc')[0] == 404
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for abbr in ['NH', 'VT']:
+            shutil.copytree(lambda_function.DATA_DIR / abbr, Path(tmp) / abbr)
+        # 03602 also appears in Vermont's mapping, served by a Windsor county cache
+        windsor = {'fips': '50027', 'name': 'Windsor'}
+        vt_zips = json.loads((Path(tmp) / 'VT/zip_to_county_multi.json').read_text())
+        vt_zips.append({'zip': '03602', 'counties': [dict(windsor, percentage=12.5)], 'primary_county': windsor})
+        (Path(tmp) / 'VT/zip_to_county_multi.json').write_text(json.dumps(vt_zips))
+        (Path(tmp) / 'VT/counties').mkdir(exist_ok=True)
+        shutil.copy(Path(tmp) / 'NH/counties/Sullivan.json', Path(tmp) / 'VT/counties/Windsor.json')
+        reset(Path(tmp))
+        try:
+            status, body = call('/zip/03602')
+            assert status == 200
+            assert (body['multi_state'], body['states']) == (True, ['NH', 'VT'])
+            assert body['results'] == [call('/nh/03602')[1], call('/vt/03602')[1]]
+            assert body['results'][1]['counties']['Windsor']['percentage'] == 12.5
+        finally:
+            reset()
+
+def test_national_zip_route_skips_states_that_cannot_serve_the_zip():
+    reset()
+    get_plans_by_zip = lambda_function.get_plans_by_zip
+    lambda_function.get_zip_index().lookup_all = lambda zip_code: [{'state': 'NH'}, {'state': 'VT'}]
+
+    def vt_fails(state_key, zip_code, include_details=True):
+        if state_key == 'vt':
+            return {'statusCode': 404, 'body': json.dumps({'error': 'ZIP code not found'})}
+        return get_plans_by_zip(state_key, zip_code, include_details)
+
+    lambda_function.get_plans_by_zip = vt_fails
+    try:
+        status, body = call('/zip/03602', {'details': '0'})
+        assert status == 200
+        assert (body['multi_state'], body['states'], body['unavailable_states']) == (False, ['NH'], ['VT'])
+        assert body['results'] == [call('/nh/03602', {'details': '0'})[1]]
+
+        lambda_function.get_plans_by_zip = lambda *args, **kwargs: vt_fails('vt', '03602')
+        status, body = call('/zip/03602')
+        assert status == 404 and body['unavailable_states'] == ['NH', 'VT']
+    finally:
+        lambda_function.get_plans_by_zip = get_plans_by_zip
+        del lambda_function.get_zip_index().lookup_all
+        reset()
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
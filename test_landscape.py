@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the shared landscape CSV loader against a small synthetic CSV
+Run with pytest or directly: python test_landscape.py
+"""
+
+import csv
+import os
+import tempfile
+from pathlib import Path
+
+import landscape
+
+HEADER = [
+    'State Territory Name', 'State Territory Abbreviation', 'County Name',
+    'ContractPlanSegmentID', 'Plan Name', 'Plan Type'
+]
+
+ROWS = [
+    ['New Hampshire', 'NH', 'All Counties', 'S4802_075_0', 'Wellcare Classic (PDP)', 'PDP'],
+    ['New Hampshire', 'NH', 'Cheshire', 'H5216_059_0', 'Humana Gold Plus (HMO)', 'HMO'],
+    ['New Hampshire', 'NH', 'Sullivan', 'H5216_059_0', 'Humana Gold Plus (HMO)', 'HMO'],
+    ['Vermont', 'VT', 'All Counties', 'S4802_076_0', 'Wellcare Classic (PDP)', 'PDP'],
+]
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+def test_indexes_match_csv_reader():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'landscape.csv'
+        write_csv(csv_path, ROWS)
+        table = landscape.load_landscape(csv_path, use_snapshot=False)
+
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            expected = [row for row in csv.DictReader(f) if row['State Territory Name'] == 'New Hampshire']
+        assert list(table.iter_rows(state='New Hampshire')) == expected
+
+        assert table.states() == ['New Hampshire', 'Vermont']
+        assert table.counties('New Hampshire') == ['All Counties', 'Cheshire', 'Sullivan']
+        assert table.column('County Name', table.row_indexes(plan_id='H5216_059_0')) == ['Cheshire', 'Sullivan']
+        assert table.row_indexes(state='New Hampshire', county='Sullivan') == [2]
+        landscape._TABLES.clear()
+
+def test_short_rows_do_not_shift_later_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'landscape.csv'
+        write_csv(csv_path, [ROWS[0], ['New Hampshire', 'NH', 'Cheshire', 'H5216_059_0'], [], *ROWS[2:]])
+        table = landscape.load_landscape(csv_path, use_snapshot=False)
+
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            expected = list(csv.DictReader(f))
+        assert [table.row(i) for i in range(table.row_count)] == expected
+        assert table.row(1)['Plan Name'] is None
+        assert table.column('Plan Name', table.row_indexes(state='Vermont')) == ['Wellcare Classic (PDP)']
+        landscape._TABLES.clear()
+
+def test_snapshot_is_reused_until_csv_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / 'landscape.csv'
+        write_csv(csv_path, ROWS)
+
+        first = landscape.load_landscape(csv_path)
+        assert landscape.snapshot_path(csv_path).exists()
+        assert landscape.load_landscape(csv_path) is first  # Same process: no reload
+
+        # A new process would read the snapshot instead of the CSV
+        landscape._TABLES.clear()
+        source = landscape._source_info(csv_path)
+        assert landscape._read_snapshot(landscape.snapshot_path(csv_path), source) == first.columns
+
+        # Changing the CSV invalidates the snapshot
+        write_csv(csv_path, ROWS[:2])
+        os.utime(csv_path, ns=(source['mtime_ns'] + 10**9, source['mtime_ns'] + 10**9))
+        assert landscape.load_landscape(csv_path).row_count == 2
+        landscape._TABLES.clear()
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
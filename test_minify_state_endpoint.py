@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the inline and shared-plan-table minified layouts
+Run with pytest or directly: python test_minify_state_endpoint.py
+"""
+
+import hashlib
+import importlib
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'minification'))
+import build_dictionary
+import minify_state_endpoint
+from test_build_dictionary import write_corpus
+
+def minify(root, *args):
+    return minify_state_endpoint.main([*args, '--input', str(root / 'zip'), '--workers', '1'])
+
+def test_shared_layout_rebuilds_the_inline_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_corpus(root / 'zip')
+        build_dictionary.main(['--input', str(root / 'zip'), '--output', str(root / 'dictionary')])
+        try:
+            minify_state_endpoint.load_mappings(root / 'dictionary')
+            minify(root, 'SC', 'GA', '--output', str(root / 'zip_minified'))
+            totals = minify(root, 'SC', 'GA', '--layout', 'shared', '--output', str(root / 'zip_shared'))
+
+            # 30301 is in SC and GA; it goes with the table of its primary state, GA
+            tables = {state: table['name'] for state, table in totals['tables'].items()}
+            assert sorted(tables) == ['GA', 'SC']
+            for zip_code in ['29401', '29402', '30301']:
+                inline = json.loads((root / f'zip_minified/{zip_code}_minified.json').read_text())
+                shared = json.loads((root / f'zip_shared/{zip_code}.json').read_text())
+                table_text = (root / 'zip_shared' / shared['tb']).read_text()
+                assert shared['tb'] == tables[inline['ps']]
+                assert hashlib.sha256(table_text.encode()).hexdigest()[:16] in shared['tb']
+                table = json.loads(table_text)
+                assert [table['p'][i] for i in shared.pop('p')] == inline.pop('p')
+                assert {k: v for k, v in shared.items() if k != 'tb'} == inline
+            sc_table = json.loads((root / 'zip_shared' / tables['SC']).read_text())
+            assert len(sc_table['p']) == 3  # H0710_099_0 once, not once per ZIP
+            assert totals['zip_bytes'] < totals['inline'] / 2
+
+            # Unchanged plans keep the table; a changed plan replaces it
+            assert minify(root, 'SC', '--layout', 'shared', '--output', str(root / 'zip_shared'))['tables']['SC'] == \
+                totals['tables']['SC']
+            write_corpus(root / 'zip', copay='$120 copay')
+            changed = minify(root, 'SC', '--layout', 'shared', '--output', str(root / 'zip_shared'))
+            assert changed['tables']['SC']['name'] != tables['SC']
+            assert sorted(p.name for p in (root / 'zip_shared').glob('plans_SC.*.json')) == [
+                changed['tables']['SC']['name']]
+        finally:
+            importlib.reload(minify_state_endpoint)
+
+def test_shared_tables_outlive_zips_that_failed_to_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_corpus(root / 'zip')
+        build_dictionary.main(['--input', str(root / 'zip'), '--output', str(root / 'dictionary')])
+        output = ['--layout', 'shared', '--output', str(root / 'zip_shared')]
+        try:
+            minify_state_endpoint.load_mappings(root / 'dictionary')
+            old_table = minify(root, 'SC', *output)['tables']['SC']['name']
+
+            # 29402 changes but cannot be read this run, so its old file still names the old table
+            write_corpus(root / 'zip', copay='$120 copay')
+            (root / 'zip/29402.json').write_text('{"zip_code": "29402", "states": ["SC"], "primary_state": "SC", "plans": [')
+            totals = minify(root, 'SC', *output)
+            assert totals['failed'] == 1 and totals['removed_tables'] == []
+            shared = json.loads((root / 'zip_shared/29402.json').read_text())
+            assert shared['tb'] == old_table and (root / 'zip_shared' / old_table).exists()
+
+            write_corpus(root / 'zip', copay='$120 copay')
+            totals = minify(root, 'SC', *output)
+            assert old_table in totals['removed_tables']
+            assert [p.name for p in (root / 'zip_shared').glob('plans_SC.*.json')] == [totals['tables']['SC']['name']]
+
+            # A ZIP without a primary state has no table to go with
+            data = json.loads((root / 'zip/29401.json').read_text())
+            (root / 'zip/29403.json').write_text(json.dumps(dict(data, zip_code='29403', primary_state=None)))
+            totals = minify(root, '--all', *output)
+            assert totals['failed'] == 1 and sorted(totals['tables']) == ['GA', 'SC']
+            assert not (root / 'zip_shared/29403.json').exists()
+            assert not list((root / 'zip_shared').glob('plans_None.*'))
+        finally:
+            importlib.reload(minify_state_endpoint)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the page readiness detector with fake drivers (no Chrome needed)
+Run with pytest or directly: python test_page_ready.py
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from page_ready import PageReadiness
+
+class RenderingDriver:
+    """Adds one table row per poll until `rows` rows have rendered"""
+
+    def __init__(self, rows, ready_state='complete'):
+        self.rows = rows
+        self.rendered = 0
+        self.ready_state = ready_state
+
+    def execute_script(self, script):
+        self.rendered = min(self.rows, self.rendered + 1)
+        return [self.ready_state, 2, self.rendered, 10 + self.rendered]
+
+def test_returns_once_tables_stop_changing():
+    readiness = PageReadiness(ceiling=5.0, stable_for=0.1, poll_interval=0.02)
+    start = time.monotonic()
+    waited = readiness.wait(RenderingDriver(rows=5))
+    assert time.monotonic() - start < 1.0
+    assert 0.1 <= waited < 1.0
+    assert readiness.ceiling_hits == 0
+
+def test_ceiling_caps_pages_that_never_settle():
+    readiness = PageReadiness(ceiling=0.3, stable_for=0.1, poll_interval=0.02)
+    waited = readiness.wait(RenderingDriver(rows=10 ** 6))
+    assert 0.3 <= waited < 0.5
+    waited = readiness.wait(RenderingDriver(rows=1, ready_state='loading'))
+    assert 0.3 <= waited < 0.5
+    assert readiness.ceiling_hits == 2
+
+def test_waits_are_logged_and_summarized():
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / 'page_readiness.jsonl'
+        readiness = PageReadiness(ceiling=1.0, stable_for=0.05, poll_interval=0.01, log_path=log)
+        for i in range(3):
+            readiness.wait(RenderingDriver(rows=2), url=f'/plan/{i}')
+
+        entries = [json.loads(line) for line in log.read_text().splitlines()]
+        assert [e['url'] for e in entries] == ['/plan/0', '/plan/1', '/plan/2']
+        assert all(e['tables'] == 2 and not e['ceiling_hit'] for e in entries)
+        assert readiness.summary().startswith('Page readiness: 3 pages')
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
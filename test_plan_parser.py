@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test that plan_parser matches the original extract_plan_data output
+Run with pytest or directly: python test_plan_parser.py
+"""
+
+import json
+import re
+from pathlib import Path
+
+from bs4 import BeautifulSoup, NavigableString
+
+import plan_parser
+from benchmark_plan_parser import original_extract_plan_data, render_plan_page
+
+# Fixtures come from the repo, whatever directory the tests run from
+SCRAPED_JSON_DIR = Path(__file__).parent / 'scraped_json_all'
+
+BACKENDS = ['bs4', 'lxml'] if plan_parser.etree is not None else ['bs4']
+
+EDGE_CASE_PAGE = '''<html><body>
+<div class="header PlanDetailsPagePlanInfo">
+  <h1>  Humana <em>Gold</em> Plus<br>(HMO) </h1>
+  <h2>Humana &amp; Co<!-- org --></h2>
+  <ul><li>Plan type:<br> Medicare <b>Advantage</b> </li><li><span>Plan ID:</span>&nbsp;H5216-059-0</li><li>Other</li></ul>
+</div>
+<table class="mct-c-table"><caption>Premiums <small>2026</small></caption>
+  <tr><th>Total monthly premium<button>What's a premium?</button></th><td>$0.00<br><br>  <br>per month</td></tr>
+  <tr><th>Drug <!-- help --> premium</th><td><script>var x = 1;</script>$1.00 <em>with</em><br/>extra help</td></tr>
+  <tr><th></th><td> </td></tr>
+  <tr><td>No header</td></tr>
+</table>
+<table class="other-table"><caption>Ignored</caption><tr><th>a</th><td>b</td></tr></table>
+<table class="mct-c-table"><tr><th>No caption</th><td>skipped</td></tr></table>
+<table class="mct-c-table mct-c-table--zebra"><caption>Tier 1 drugs</caption>
+  <tbody><tr><th scope="row">Preferred retail</th><td><div><p>$0 copay</p>
+  <p>30-day supply</p></div></td></tr></tbody>
+</table>
+<table class="mct-c-table"><caption>Dental</caption><tr><th>Cleaning</th><td>&lt;covered&gt; &#8212; yes</td></tr></table>
+</body></html>'''
+
+def extract_text_with_breaks(element):
+    """scrape_all_plans_parallel.py's original cell text helper"""
+    parts = []
+    for item in element.descendants:
+        if isinstance(item, NavigableString):
+            text = str(item).strip()
+            if text:
+                parts.append(text)
+        elif item.name == 'br':
+            parts.append('\n')
+    return re.sub(r'\n+', '\n', ''.join(parts)).strip()
+
+def test_rendered_pages_match_original():
+    json_files = sorted(SCRAPED_JSON_DIR.glob('*.json'))[:10]
+    assert json_files, f'no fixtures in {SCRAPED_JSON_DIR}'
+    for json_file in json_files:
+        page = render_plan_page(json.loads(json_file.read_text()))
+        expected = original_extract_plan_data(page)
+        for backend in BACKENDS:
+            assert plan_parser.extract_plan_data(page, backend=backend) == expected, (json_file, backend)
+
+def test_edge_cases_match_original():
+    expected = original_extract_plan_data(EDGE_CASE_PAGE)
+    assert expected['plan_info']['type'] == 'Medicare Advantage'
+    assert expected['premiums']['Total monthly premium'] == '$0.00\nper month'
+    for page in [EDGE_CASE_PAGE, EDGE_CASE_PAGE.replace('\n', '\r\n'), '', '<p>No plan here</p>']:
+        for backend in BACKENDS:
+            assert plan_parser.extract_plan_data(page, backend=backend) == original_extract_plan_data(page), backend
+
+def test_variants_match_their_original_copies():
+    soup = BeautifulSoup(EDGE_CASE_PAGE, 'html.parser')
+    for backend in BACKENDS:
+        compact = plan_parser.extract_plan_data(EDGE_CASE_PAGE, cell_text=plan_parser.cell_text_compact, backend=backend)
+        assert compact['premiums']['Total monthly premium'] == extract_text_with_breaks(soup.find('td'))
+
+        stripped = plan_parser.extract_plan_data(EDGE_CASE_PAGE, cell_text=plan_parser.cell_text_stripped, backend=backend)
+        assert stripped['premiums']['Total monthly premium'] == soup.find('td').get_text(strip=True)
+
+        legacy = plan_parser.extract_plan_data(EDGE_CASE_PAGE, categorize=plan_parser.categorize_table_legacy, backend=backend)
+        assert 'Tier 1 drugs' in legacy['benefits']
+        assert 'Dental' in legacy['benefits']
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
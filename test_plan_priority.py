@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test scrape priorities against a small synthetic landscape, ZIP mapping and caches
+Run with pytest or directly: python test_plan_priority.py
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import plan_priority
+import scrape_engine
+from landscape import load_landscape
+from test_landscape import write_csv
+
+ROWS = [
+    ['New Hampshire', 'NH', 'All Counties', 'S4802_075_0', 'Wellcare Classic (PDP)', 'PDP'],
+    ['New Hampshire', 'NH', 'Belknap', 'H5216_059_0', 'Humana Gold Plus (HMO)', 'HMO'],
+    ['New Hampshire', 'NH', 'Grafton', 'H5216_059_0', 'Humana Gold Plus (HMO)', 'HMO'],
+    ['New Hampshire', 'NH', 'Grafton', 'H7617_046_0', 'HumanaChoice Giveback (PPO)', 'Local PPO'],
+    ['Vermont', 'VT', 'All Counties', 'S4802_076_0', 'Wellcare Classic (PDP)', 'PDP'],
+    ['Vermont', 'VT', 'Addison', 'H2001_001_0', 'UHC Dual Complete (HMO)', 'HMO'],
+]
+
+NH_ZIPS = [
+    {'zip': '03256', 'counties': [{'name': 'Belknap'}, {'name': 'Grafton'}]},
+    {'zip': '03249', 'counties': [{'name': 'Belknap'}]},
+    {'zip': '03741', 'counties': [{'name': 'Grafton'}]},
+]
+
+def make_tree(tmp):
+    """Landscape CSV, an NH ZIP mapping (VT has none) and NH caches with two plans' details"""
+    write_csv(Path(tmp) / 'landscape.csv', ROWS)
+    Path('mock_api/NH/counties').mkdir(parents=True)
+    Path('mock_api/NH/zip_to_county_multi.json').write_text(json.dumps(NH_ZIPS))
+    Path('mock_api/NH/plans.json').write_text(json.dumps({'plans': {
+        'S4802_075_0': {'has_scraped_details': True},
+        'H5216_059_0': {'has_scraped_details': True},
+        'H7617_046_0': {'has_scraped_details': False},
+    }}))
+    Path('scraped_json_all').mkdir()
+    for plan_id, age_days in [('S4802_075_0', 60), ('H5216_059_0', 3)]:
+        path = Path(f'scraped_json_all/New_Hampshire-{plan_id}.json')
+        path.write_text('{}')
+        mtime = time.time() - age_days * plan_priority.DAY
+        os.utime(path, (mtime, mtime))
+    return load_landscape(Path(tmp) / 'landscape.csv', use_snapshot=False)
+
+def in_tree(test):
+    def run():
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                test(make_tree(tmp))
+            finally:
+                os.chdir(cwd)
+    run.__name__ = test.__name__
+    return run
+
+@in_tree
+def test_reach_counts_zips_where_mapped_and_estimates_elsewhere(table):
+    reach = plan_priority.plan_reach(table)
+    assert (reach['S4802_075_0']['zips'], reach['S4802_075_0']['counties']) == (3, 2)
+    assert (reach['H5216_059_0']['zips'], reach['H5216_059_0']['counties']) == (3, 2)
+    assert (reach['H7617_046_0']['zips'], reach['H7617_046_0']['counties']) == (2, 1)
+    assert reach['S4802_076_0'] == {'states': ['Vermont'], 'counties': 1, 'zips': plan_priority.ZIPS_PER_COUNTY,
+                                    'zips_estimated': True}
+
+@in_tree
+def test_missing_details_first_then_stalest(table):
+    ranked = plan_priority.rank_plans(table=table)
+    assert [p['plan_id'] for p in ranked] == [
+        'H2001_001_0', 'S4802_076_0',  # Vermont: no details, ~13 ZIPs each
+        'H7617_046_0',                 # No details, 2 ZIPs
+        'S4802_075_0',                 # Details 60 days old: full staleness, half weight
+        'H5216_059_0',                 # Details 3 days old
+    ]
+    assert ranked[3]['priority'] == 3 * plan_priority.STALE_WEIGHT
+    assert 0 < ranked[4]['priority'] < ranked[3]['priority']
+    assert ranked[0]['name'] == 'UHC Dual Complete (HMO)' and ranked[0]['contract'] == 'H2001'
+    assert [p['plan_id'] for p in plan_priority.rank_plans(['New Hampshire'], missing_only=True, table=table)] == [
+        'H7617_046_0']
+
+@in_tree
+def test_engine_orders_tasks_by_priority(table):
+    tasks = [({'ContractPlanSegmentID': plan_id}, 'New_Hampshire')
+             for plan_id in ['H5216_059_0', 'S4802_075_0', 'H7617_046_0', 'Z0000_000_0']]
+    original = plan_priority.load_landscape
+    plan_priority.load_landscape = lambda: table
+    try:
+        priorities = scrape_engine.order_tasks(tasks)
+    finally:
+        plan_priority.load_landscape = original
+    assert [t[0]['ContractPlanSegmentID'] for t in tasks] == ['H7617_046_0', 'S4802_075_0', 'H5216_059_0',
+                                                                'Z0000_000_0']
+    assert priorities['H7617_046_0'] == 2.0
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
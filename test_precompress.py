@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the .br/.gz sidecars and Accept-Encoding negotiation
+Run with pytest or directly: python test_precompress.py
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import precompress
+from precompress import negotiate
+
+PLANS = json.dumps({'plans': [{'plan_id': f'H0710_{i:03d}_0', 'premium': '$0.00', 'copay': '$115 copay'}
+                              for i in range(200)]})
+GZIP_ONLY = precompress.brotli is None  # .br is covered where brotli is installed
+
+def test_sidecars_are_written_once_and_follow_their_source():
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_dir = Path(tmp) / 'medicare' / 'zip'
+        zip_dir.mkdir(parents=True)
+        (zip_dir / '29401.json').write_text(PLANS)
+        (zip_dir / 'zip_states.json').write_text('{}')
+
+        totals = precompress.precompress([tmp], gzip_only=GZIP_ONLY)
+        sidecar = zip_dir / '29401.json.gz'
+        assert str(sidecar) in totals['changed'] and not (zip_dir / 'zip_states.json.gz').exists()
+        assert gzip.decompress(sidecar.read_bytes()).decode() == PLANS
+        assert totals['gzip'] < totals['raw'] / 10
+        assert (zip_dir / '29401.json.br').exists() == (precompress.brotli is not None)
+
+        assert precompress.precompress([tmp], gzip_only=GZIP_ONLY)['changed'] == []  # Up to date
+        assert str(sidecar) in precompress.precompress([tmp], force=True, gzip_only=GZIP_ONLY)['changed']
+
+        (zip_dir / '29401.json').unlink()
+        assert str(sidecar) in precompress.precompress([zip_dir / '29401.json'], gzip_only=GZIP_ONLY)['changed']
+        assert list(zip_dir.glob('29401.*')) == []
+
+        # Sidecars of a file removed from a directory go with the next directory run
+        (zip_dir / '29402.json').write_text(PLANS)
+        precompress.precompress([tmp], gzip_only=GZIP_ONLY)
+        (zip_dir / '29402.json').unlink()
+        assert str(zip_dir / '29402.json.gz') in precompress.precompress([tmp], gzip_only=GZIP_ONLY)['changed']
+        assert sorted(p.name for p in zip_dir.iterdir()) == ['zip_states.json']
+
+def test_without_brotli_only_an_explicit_gzip_only_run_proceeds():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '29401.json'
+        path.write_text(PLANS)
+        brotli = precompress.brotli
+        precompress.brotli = None
+        try:
+            try:
+                precompress.precompress([path])
+                assert False, 'precompressed without brotli'
+            except RuntimeError as e:
+                assert 'brotli' in str(e)
+            assert not Path(f'{path}.gz').exists()
+        finally:
+            precompress.brotli = brotli
+
+        precompress.precompress([path], gzip_only=True)
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ['29401.json', '29401.json.gz']
+
+def test_negotiate_picks_the_accepted_sidecar():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '29401.json'
+        path.write_text(PLANS)
+        precompress.precompress([path], gzip_only=GZIP_ONLY)
+        Path(f'{path}.br').write_bytes(b'brotli bytes')  # Whether or not brotli is installed
+
+        assert negotiate(path, 'gzip, deflate, br') == (Path(f'{path}.br'), 'br')
+        assert negotiate(path, 'gzip') == (Path(f'{path}.gz'), 'gzip')
+        assert negotiate(path, 'br;q=0, gzip;q=0.8') == (Path(f'{path}.gz'), 'gzip')
+        assert negotiate(path, '*') == (Path(f'{path}.br'), 'br')
+        assert negotiate(path, 'identity') == (path, None)
+        assert negotiate(path, None) == (path, None)
+
+        # A sidecar older than its source is never served
+        stamp = path.stat().st_mtime + 10
+        os.utime(path, (stamp, stamp))
+        assert negotiate(path, 'br, gzip') == (path, None)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the append-only scraping progress journal
+Run with pytest or directly: python test_progress_journal.py
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import progress_journal
+from progress_journal import ProgressJournal
+
+def test_outcomes_survive_a_crash_and_are_compacted_on_open():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / 'scraping_progress.json'
+        snapshot.write_text(json.dumps({'completed': ['A_1_0'], 'failed': [{'plan_id': 'A_2_0', 'state': 'Alaska', 'error': 'Timeout'}]}))
+
+        journal = ProgressJournal(snapshot, fsync_every=2).open()
+        journal.record('A_2_0', 'Alaska', True)
+        journal.record('A_3_0', 'Alaska', False, 'HTTP 429')
+        journal.record('A_4_0', 'Alaska', True)
+        journal.sync()
+        # Killed here: no close(), and a half-written record at the end
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"plan_id": "A_5_0", "sta')
+
+        assert json.loads(snapshot.read_text())['completed'] == ['A_1_0']  # Never rewritten while running
+
+        recovered = ProgressJournal(snapshot, compact_bytes=1).open()  # Any journal is worth compacting
+        assert recovered.replayed == 3
+        assert recovered.completed == {'A_1_0', 'A_2_0', 'A_4_0'}
+        assert list(recovered.failed) == ['A_3_0']
+
+        # Compacted: the snapshot has everything and the journal is empty
+        assert json.loads(snapshot.read_text()) == {
+            'completed': ['A_1_0', 'A_2_0', 'A_4_0'],
+            'failed': [{'plan_id': 'A_3_0', 'state': 'Alaska', 'error': 'HTTP 429'}]
+        }
+        assert recovered.journal_path.stat().st_size == 0
+        recovered.close()
+
+def test_record_after_a_torn_line_is_not_lost():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / 'scraping_progress.json'
+        journal = ProgressJournal(snapshot).open()
+        journal.record('A_1_0', 'Alaska', True)
+        journal.close()
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"plan_id": "A_2_0", "sta')  # The journal holds nothing but the torn line
+
+        journal = ProgressJournal(snapshot).open()
+        assert journal.replayed == 0
+        journal.record('A_3_0', 'Alaska', True)
+        journal.sync()  # Killed after this
+
+        recovered = ProgressJournal(snapshot).open()
+        assert recovered.replayed == 1
+        assert set(recovered.completed) == {'A_1_0', 'A_3_0'}
+        recovered.close()
+
+def test_resume_maps_the_index_instead_of_parsing_the_snapshot():
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / 'scraping_progress.json'
+        with ProgressJournal(snapshot) as journal:
+            for i in range(100):
+                journal.record(f'P_{i:03d}_0', 'Alaska', True)
+            journal.record('F_1_0', 'Alaska', False, 'Timeout')
+        journal = ProgressJournal(snapshot).open()
+        journal.record('P_100_0', 'Alaska', True)
+        journal.sync()  # Killed: only the journal has P_100_0
+
+        real_load = progress_journal.json.load
+        progress_journal.json.load = None  # Any snapshot parse would fail
+        try:
+            recovered = ProgressJournal(snapshot).open()
+        finally:
+            progress_journal.json.load = real_load
+        assert recovered.replayed == 1
+        assert len(recovered.completed) == 101
+        assert 'P_042_0' in recovered.completed and 'P_100_0' in recovered.completed
+        assert 'P_101_0' not in recovered.completed
+        assert list(recovered.failed) == ['F_1_0']
+        recovered.close()
+
+        # Edited by hand: the index no longer matches and the snapshot is parsed again
+        snapshot.write_text(json.dumps({'completed': ['X_1_0'], 'failed': []}))
+        assert set(ProgressJournal(snapshot).open().completed) == {'X_1_0', 'P_100_0'}  # + the journal
+
+def test_fsync_is_batched():
+    synced = []
+    real_fsync = os.fsync
+    progress_journal.os.fsync = lambda fd: synced.append(fd)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            with ProgressJournal(Path(tmp) / 'progress.json', fsync_every=10, fsync_interval=3600) as journal:
+                for i in range(25):
+                    journal.record(f'P_{i}_0', 'Alaska', True)
+                assert len(synced) == 2
+            assert json.loads((Path(tmp) / 'progress.json').read_text())['completed'][:2] == ['P_0_0', 'P_10_0']
+    finally:
+        progress_journal.os.fsync = real_fsync
+
+def test_success_clears_failure_and_clean_runs_leave_no_journal_entries():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'progress.json'
+        with ProgressJournal(path) as journal:
+            journal.record('A_1_0', 'Alaska', False, 'Timeout')
+            journal.record('A_1_0', 'Alaska', True)
+            journal.record('A_2_0', 'Alaska', True)
+            journal.record('A_2_0', 'Alaska', False, 'Timeout')  # A later retry of a completed plan
+        with ProgressJournal(path) as journal:
+            assert journal.replayed == 0
+            assert journal.completed == {'A_1_0', 'A_2_0'}
+            assert journal.failed == {}
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test the browserless API scraper against recorded responses replayed locally
+Run with pytest or directly: python test_scrape_api.py
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import scrape_api
+
+# Synthetic response in the shape of the provisional field mapping - no real
+# plan response has been recorded yet (see scrape_api.py). These tests cover the
+# mapping and replay machinery, not the real API's field names; the real
+# check is `scrape_api.py --check-mapping recorded_api/`.
+SCRAPED_JSON_DIR = Path(__file__).parent / 'scraped_json_all'
+
+RECORDED_PLAN = {
+    'name': 'Blue Advantage Choice (PPO)',
+    'organization_name': 'Blue Cross and Blue Shield of Alabama',
+    'plan_type': 'PLAN_TYPE_MAPD',
+    'contract_id': 'H0104',
+    'plan_id': '016',
+    'segment_id': '0',
+    'total_monthly_premium': 0,
+    'partc_premium': 0,
+    'partd_premium': 0,
+    'part_b_premium': 202.9,
+    'part_b_premium_reduction': 'Not offered',
+    'annual_deductible': 285,
+    'drug_plan_deductible': 325,
+    'maximum_oopc': '$10,000 In and Out-of-network\n$6,150 In-network',
+    'plan_address': {'street': '450 Riverchase Parkway East', 'city': 'Birmingham', 'state': 'AL', 'zip': '35244'},
+    'benefits': [
+        {'category': 'Doctor services', 'services': [
+            {'service': 'Primary doctor visit', 'costs': [
+                {'network': 'In-network', 'cost': '$5 copay'},
+                {'network': 'Out-of-network', 'cost': '50% coinsurance'}
+            ]},
+            {'service': 'Specialist visit', 'costs': '$35 copay'}
+        ]},
+        {'category': 'Vision', 'services': []}
+    ]
+}
+
+def test_api_response_maps_onto_scraped_schema():
+    record = scrape_api.api_to_plan_record(RECORDED_PLAN)
+    assert record['plan_info'] == {
+        'name': 'Blue Advantage Choice (PPO)',
+        'organization': 'Blue Cross and Blue Shield of Alabama',
+        'type': 'Medicare Advantage with drug coverage',
+        'id': 'H0104-016-0'
+    }
+    assert record['premiums']['Standard Part B premium'] == '$202.90'
+    assert record['premiums']['Part B premium reduction'] == 'Not offered'
+    assert record['deductibles'] == {'Health deductible': '$285.00', 'Drug deductible': '$325.00'}
+    assert record['contact_info']['Plan address'] == '450 Riverchase Parkway East\nBirmingham, AL 35244'
+    assert record['benefits'] == {'Doctor services': {
+        'Primary doctor visit': 'In-network: $5 copay\nOut-of-network: 50% coinsurance',
+        'Specialist visit': '$35 copay'
+    }}
+    assert list(record) == list(json.loads(sorted(SCRAPED_JSON_DIR.glob('*.json'))[0].read_text()))
+    assert all(record[section] == {} for section in scrape_api.UNMAPPED_SECTIONS)
+
+def test_check_mapping_reports_missing_and_unused_fields():
+    with tempfile.TemporaryDirectory() as tmp:
+        recorded = Path(tmp) / 'plan' / '2026' / 'H0104' / '016' / '0.json'
+        recorded.parent.mkdir(parents=True)
+        renamed = dict(RECORDED_PLAN, moop_amount=RECORDED_PLAN['maximum_oopc'])
+        del renamed['maximum_oopc']
+        recorded.write_text(json.dumps(renamed))
+
+        report = scrape_api.check_mapping(tmp)
+        assert report == {'files': 1, 'missing': {'maximum_oopc': 1}, 'unused': {'moop_amount': 1}}
+        assert scrape_api.check_mapping(Path(tmp) / 'empty')['files'] == 0
+
+def test_replayed_scrape_writes_json_and_progress():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        os.chdir(root)
+        try:
+            plans = [
+                {'ContractPlanSegmentID': 'H0104_016_0', 'url': 'https://www.medicare.gov/plan-compare/#/plan-details/2026-H0104-016-0'},
+                {'ContractPlanSegmentID': 'H9999_001_0', 'url': None}  # Not recorded -> 404
+            ]
+            (root / 'state_data').mkdir()
+            (root / 'state_data' / 'Alabama.json').write_text(json.dumps(plans))
+            recorded = root / 'recorded_api' / 'plan' / '2026' / 'H0104' / '016' / '0.json'
+            recorded.parent.mkdir(parents=True)
+            recorded.write_text(json.dumps(RECORDED_PLAN))
+
+            counts = scrape_api.main(['--replay', 'recorded_api', '--concurrency', '4'])
+            assert counts == {'completed': 1, 'failed': 1}
+
+            # Next to, never into, the parsed pages the county caches are built from
+            assert not (root / 'scraped_json_all').exists() and not (root / 'scraping_progress.json').exists()
+            record = json.loads((root / 'scraped_json_api' / 'Alabama-H0104_016_0.json').read_text())
+            assert record['plan_info']['id'] == 'H0104-016-0'
+            assert (record['source'], record['state'], record['plan_id']) == ('api', 'Alabama', 'H0104_016_0')
+            assert json.loads((root / 'scraped_api_raw' / 'Alabama-H0104_016_0.json').read_text()) == RECORDED_PLAN
+
+            progress = json.loads((root / 'scraping_progress_api.json').read_text())
+            assert progress['completed'] == ['H0104_016_0']
+            assert progress['failed'][0]['error'] == 'HTTP 404'
+
+            # Completed plans are skipped; the raw responses can be re-mapped offline
+            assert scrape_api.main(['--replay', 'recorded_api', '--state', 'Alabama'])['completed'] == 0
+            assert scrape_api.main(['--remap'])['remapped'] == 0
+        finally:
+            os.chdir(cwd)
+
+def test_scraping_waits_for_a_passed_mapping_check():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        os.chdir(root)
+        try:
+            (root / 'state_data').mkdir()
+            (root / 'state_data' / 'Alabama.json').write_text(json.dumps([{'ContractPlanSegmentID': 'H0104_016_0'}]))
+            recorded = root / 'recorded_api' / 'plan' / '2026' / 'H0104' / '016' / '0.json'
+            recorded.parent.mkdir(parents=True)
+            recorded.write_text(json.dumps({k: v for k, v in RECORDED_PLAN.items() if k != 'maximum_oopc'}))
+
+            assert scrape_api.main([]) == {'completed': 0, 'failed': 0}
+            assert not scrape_api.print_mapping_report('recorded_api')['passed']
+            assert scrape_api.main(['--replay', 'recorded_api']) == {'completed': 0, 'failed': 0}
+            assert not (root / 'scraped_api_raw').exists() and not (root / 'scraping_progress_api.json').exists()
+
+            recorded.write_text(json.dumps(RECORDED_PLAN))
+            assert scrape_api.print_mapping_report('recorded_api')['passed'] and scrape_api.mapping_verified()
+            moop_fields = scrape_api.MOOP_FIELDS
+            scrape_api.MOOP_FIELDS = moop_fields + [('Maximum you pay for drugs', 'maximum_drug_oopc')]
+            try:
+                assert not scrape_api.mapping_verified()  # The mapping changed since the check
+            finally:
+                scrape_api.MOOP_FIELDS = moop_fields
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test the scraping engine's scheduler with fake backends (no browser or network)
+Run with pytest or directly: python test_scrape_engine.py
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import scrape_engine
+from progress_journal import ProgressJournal
+from scrape_engine import AdaptiveConcurrency, Backoff, TokenBucket, scrape
+
+def plans(n):
+    return [({'ContractPlanSegmentID': f'H{1000 + i}_001_0', 'url': f'/plan/{i}'}, 'Alaska') for i in range(n)]
+
+class FakeBackend:
+    def __init__(self, fail_first=0, latency=0.01):
+        self.fail_first = fail_first
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def fetch(self, plan, state_name):
+        self.calls.append(plan['ContractPlanSegmentID'])
+        pushed_back = len(self.calls) <= self.fail_first
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if pushed_back:
+                raise Backoff('HTTP 429')
+            return {'success': True}
+        finally:
+            self.in_flight -= 1
+
+def test_token_bucket_caps_rate():
+    async def run():
+        bucket = TokenBucket(rate=40, burst=2)
+        start = time.monotonic()
+        for _ in range(12):
+            await bucket.acquire()
+        return time.monotonic() - start
+    elapsed = asyncio.run(run())
+    assert 0.22 <= elapsed < 0.5  # 2 immediately, then 10 at 40/s
+
+def test_aimd_grows_on_success_and_halves_on_backoff():
+    limiter = AdaptiveConcurrency(2, maximum=4)
+    for _ in range(2 + 3):
+        limiter.success()
+    assert limiter.limit == 4
+    for _ in range(10):
+        limiter.success()
+    assert limiter.limit == 4
+    limiter.backoff()
+    assert limiter.limit == 2
+    limiter.backoff()
+    limiter.backoff()
+    assert (limiter.limit, limiter.peak, limiter.backoffs) == (1, 4, 3)
+
+def test_scheduler_ramps_up_within_max_concurrency():
+    backend = FakeBackend(latency=0.02)
+    results = []
+    limiter = asyncio.run(scrape(plans(40), backend, rate=1000, burst=10, concurrency=1,
+                                 max_concurrency=6, on_result=results.append))
+    assert len(results) == 40 and all(r['success'] for r in results)
+    assert backend.max_in_flight == 6 == limiter.peak
+
+def test_backed_off_plans_are_retried_at_lower_concurrency():
+    backend = FakeBackend(fail_first=3)
+    results = []
+    limiter = asyncio.run(scrape(plans(6), backend, rate=1000, burst=10, concurrency=4, max_concurrency=4,
+                                 cooldown=0.05, on_result=results.append))
+    assert sorted(r['plan_id'] for r in results) == sorted(p['ContractPlanSegmentID'] for p, _ in plans(6))
+    assert all(r['success'] for r in results)
+    assert limiter.backoffs == 3 and len(backend.calls) == 9
+    assert max(r['attempt'] for r in results) == 2
+
+def test_plans_that_keep_backing_off_fail():
+    backend = FakeBackend(fail_first=100)
+    results = []
+    asyncio.run(scrape(plans(1), backend, rate=1000, cooldown=0.01, on_result=results.append))
+    assert results[0]['success'] is False and results[0]['error'] == 'HTTP 429'
+    assert results[0]['attempt'] == scrape_engine.MAX_ATTEMPTS
+
+def test_retries_are_interleaved_with_fresh_work_up_to_max_attempts():
+    backend = FakeBackend(fail_first=1)
+    results = []
+    asyncio.run(scrape(plans(30), backend, rate=1000, burst=10, concurrency=1, max_concurrency=1,
+                       cooldown=0.03, on_result=results.append))
+    assert backend.calls.index('H1000_001_0', 1) < 10  # Not after the other 29 plans
+
+    backend = FakeBackend(fail_first=100)
+    results = []
+    asyncio.run(scrape(plans(1), backend, rate=1000, cooldown=0.01, on_result=results.append, max_attempts=5))
+    assert results[0]['attempt'] == 5 and len(backend.calls) == 5
+
+def test_a_blocked_task_source_does_not_stall_fetches_in_flight():
+    finished = threading.Event()
+
+    class SlowSource:
+        """Like a work queue waiting on another node's lock"""
+        def __init__(self):
+            self.tasks = plans(2)
+
+        def take(self, n):
+            if len(self.tasks) == 1:
+                assert finished.wait(2), 'the fetch in flight was stalled'
+            return [self.tasks.pop(0)] if self.tasks else []
+
+    results = []
+
+    def on_result(result):
+        results.append(result)
+        finished.set()
+    asyncio.run(scrape(SlowSource(), FakeBackend(latency=0.05), rate=1000, concurrency=2, on_result=on_result))
+    assert len(results) == 2
+
+def test_task_selection():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            Path('state_data').mkdir()
+            for state, ids in [('Alaska', ['A_1_0', 'A_2_0', 'A_3_0']), ('New_Hampshire', ['N_1_0'])]:
+                Path(f'state_data/{state}.json').write_text(json.dumps([{'ContractPlanSegmentID': i} for i in ids]))
+            journal = ProgressJournal('scraping_progress.json').open()
+            journal.record('A_1_0', 'Alaska', True)
+            journal.record('A_3_0', 'Alaska', False, 'Timeout')
+            journal.record('N_1_0', 'New_Hampshire', False, 'Timeout')
+
+            def ids(**kwargs):
+                return [p['ContractPlanSegmentID'] for p, _ in scrape_engine.select_tasks(journal, **kwargs)]
+
+            assert ids() == ['A_2_0', 'A_3_0', 'N_1_0']
+            assert ids(states=['New Hampshire']) == ['N_1_0']
+            assert ids(force=True, limit=2) == ['A_1_0', 'A_2_0']
+            assert ids(plan_ids=['A_1_0', 'A_3_0']) == ['A_3_0']
+            assert ids(retry_failed=True, states=['Alaska']) == ['A_3_0']
+            journal.close()
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -8,6 +8,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from page_ready import PageReadiness
 from bs4 import BeautifulSoup
 import time
 import re
@@ -82,7 +83,8 @@ try:
     wait = WebDriverWait(driver, 30)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
     wait.until(EC.presence_of_element_located((By.CLASS_NAME, "mct-c-table")))
-    time.sleep(5)
+    waited = PageReadiness().wait(driver, url)
+    print(f"Tables settled after {waited:.2f}s")
 
     print("Extracting data...")
     html_content = driver.page_source
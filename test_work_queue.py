@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test the shared work queue: disjoint leases across nodes, expiry and heartbeats
+Run with pytest or directly: python test_work_queue.py
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from collections import Counter
+
+from scrape_engine import scrape
+from test_scrape_engine import FakeBackend, plans
+from work_queue import WorkQueue, in_shard
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_nodes_lease_disjoint_plans():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.sqlite')
+        assert WorkQueue(path).add(plans(200)) == 200
+        assert WorkQueue(path).add(plans(200)) == 0  # Every node may seed it
+        leased = {}
+
+        def node(name):
+            queue = WorkQueue(path, owner=name)
+            leased[name] = []
+            while True:
+                batch = queue.take(3)
+                if not batch:
+                    break
+                for plan, _ in batch:
+                    leased[name].append(plan['ContractPlanSegmentID'])
+                    assert queue.complete(plan['ContractPlanSegmentID'], success=True)
+            queue.close()
+
+        threads = [threading.Thread(target=node, args=(f'node-{i}',)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        counts = Counter(plan_id for ids in leased.values() for plan_id in ids)
+        assert len(counts) == 200 and set(counts.values()) == {1}
+        assert WorkQueue(path).counts() == {'pending': 0, 'leased': 0, 'done': 200, 'failed': 0}
+
+def test_expired_leases_are_reissued_unless_renewed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.sqlite')
+        clock = FakeClock()
+        a = WorkQueue(path, lease_seconds=60, owner='a', clock=clock)
+        b = WorkQueue(path, lease_seconds=60, owner='b', clock=clock)
+        a.add(plans(2))
+
+        assert len(a.take(2)) == 2
+        assert b.take(2) == []
+        clock.now += 45
+        assert a.heartbeat() == 2
+        clock.now += 45
+        assert b.take(2) == []  # Renewed, so still a's
+
+        a.complete('H1000_001_0', success=True)
+        clock.now += 61  # a stalls past its lease on the other plan
+        reissued = b.take(2)
+        assert [p['ContractPlanSegmentID'] for p, _ in reissued] == ['H1001_001_0']
+        assert a.complete('H1001_001_0', success=True) is False
+        assert b.complete('H1001_001_0', success=False, error='Timeout') is True
+        assert a.counts() == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}
+
+        assert a.retry_failed() == 1
+        assert len(a.take(5)) == 1 and a.release() == 1
+        assert b.counts()['pending'] == 1
+
+def test_plans_that_keep_crashing_their_worker_are_failed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.sqlite')
+        clock = FakeClock()
+        queue = WorkQueue(path, lease_seconds=60, owner='a', max_attempts=2, clock=clock)
+        queue.add(plans(2))
+
+        assert len(queue.take(2)) == 2
+        assert queue.release() == 2  # Handing plans back is not an attempt
+        assert len(queue.take(2)) == 2
+        queue.complete('H1000_001_0', success=True)
+        clock.now += 61  # The worker died on H1001_001_0
+        assert [p['ContractPlanSegmentID'] for p, _ in queue.take(2)] == ['H1001_001_0']
+        clock.now += 61  # And again
+        assert queue.take(2) == []
+        assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}
+        error = queue.db.execute("SELECT error FROM tasks WHERE plan_id = 'H1001_001_0'").fetchone()[0]
+        assert error == 'Lease expired 2 times'
+
+        assert queue.retry_failed() == 1
+        assert len(queue.take(2)) == 1
+
+def test_engine_finishes_one_run_across_nodes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.sqlite')
+        WorkQueue(path).add(plans(60))
+        backends = {}
+
+        def node(name):
+            queue = WorkQueue(path, owner=name)
+            backends[name] = FakeBackend(fail_first=2)
+
+            def on_result(result):
+                assert queue.complete(result['plan_id'], result['success'], result.get('error'))
+            asyncio.run(scrape(queue, backends[name], rate=1000, burst=10, concurrency=2, max_concurrency=4,
+                               cooldown=0.01, on_result=on_result))
+            queue.close()
+
+        threads = [threading.Thread(target=node, args=(f'node-{i}',)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        calls = Counter(plan_id for backend in backends.values() for plan_id in backend.calls)
+        assert len(calls) == 60
+        assert sum(calls.values()) == 60 + 2 * 3  # Only the backed-off fetches were repeated, on the same node
+        assert WorkQueue(path).counts()['done'] == 60
+
+def test_static_shards_partition_plans():
+    ids = [p['ContractPlanSegmentID'] for p, _ in plans(500)]
+    shards = [{i for i in ids if in_shard(i, (k, 4))} for k in range(1, 5)]
+    assert sum(len(s) for s in shards) == 500 and set().union(*shards) == set(ids)
+    assert all(len(s) > 50 for s in shards)
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test the binary ZIP -> county index against the mock_api mappings
+Run with pytest or directly: python test_zip_index.py
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from zip_index import INDEX_FILE, ZipIndex, build_from_json, build_index, load_zip_index, source_files, write_index
+
+MOCK_API = Path(__file__).parent / 'mock_api'
+
+def test_every_entry_round_trips():
+    index = ZipIndex(build_from_json(MOCK_API))
+    for state, path in source_files(MOCK_API).items():
+        entries = json.loads(path.read_text())
+        zips = index.for_state(state)
+        assert len(zips) == len(entries)
+        for entry in entries:
+            assert zips[entry['zip']] == dict(entry, state=state)
+
+def test_zip_in_two_states_and_bad_zips():
+    county = {'fips': '33009', 'name': 'Grafton', 'percentage': 87.5}
+    entry = {'zip': '03750', 'counties': [county], 'primary_county': {'fips': '33009', 'name': 'Grafton'}}
+    vt_entry = {'zip': '03750', 'counties': [{'fips': '50027', 'name': 'Windsor', 'percentage': None}],
+                'primary_county': {'fips': '50027', 'name': 'Windsor'}}
+    index = ZipIndex(build_index({'VT': [vt_entry], 'NH': [entry]}))
+
+    assert index.lookup('03750', 'NH')['counties'] == [county]
+    assert index.lookup('03750', 'VT')['counties'][0]['percentage'] is None
+    assert index.lookup('03750')['state'] == 'NH'
+    assert list(index.for_state('VT')) == ['03750']
+    for bad in ['03751', '3750', 'abcde', '037500']:
+        assert not index.contains(bad)
+    assert '03750' not in index.for_state('ME') and 3750 not in index.for_state('NH')
+
+def test_loads_mmap_and_falls_back_when_missing_or_stale():
+    with tempfile.TemporaryDirectory() as tmp:
+        state_dir = Path(tmp) / 'NH'
+        state_dir.mkdir()
+        source = MOCK_API / 'NH' / 'zip_to_county_multi.json'
+        (state_dir / 'zip_to_county_multi.json').write_bytes(source.read_bytes())
+        zip_code = json.loads(source.read_text())[0]['zip']
+
+        assert zip_code in load_zip_index(tmp).for_state('NH')  # No index file yet
+        path = write_index(tmp)
+        mapped = load_zip_index(tmp)
+        assert not isinstance(mapped._buffer, bytes)
+        assert mapped.lookup(zip_code) == ZipIndex(path.read_bytes()).lookup(zip_code)
+
+        (state_dir / 'zip_to_county_multi.json').write_text('[]')
+        stamp = path.stat().st_mtime + 10
+        os.utime(state_dir / 'zip_to_county_multi.json', (stamp, stamp))
+        assert zip_code not in load_zip_index(tmp, check_stale=True).for_state('NH')
+        assert zip_code in load_zip_index(tmp).for_state('NH')  # Deployed copies trust the file
+        assert (Path(tmp) / INDEX_FILE).exists()
+
+if __name__ == '__main__':
+    for name, fn in list(globals().items()):
+        if name.startswith('test_'):
+            fn()
+            print(f"✓ {name}")
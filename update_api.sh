@@ -1,6 +1,6 @@
 #!/bin/bash
 # Efficient update script for Medicare Plan API
-# Only rebuilds changed states and syncs to S3
+# Only rebuilds changed states and uploads files whose content changed
 
 set -e
 
@@ -25,38 +25,30 @@ echo ""
 echo "  ✓ Build completed in ${BUILD_TIME}s"
 echo ""
 
-# Step 2: Sync to S3 (only changed files)
-echo "Step 2: Syncing to S3..."
+# Step 2: Fresh .br/.gz sidecars for the rebuilt files - cloudfront_precompressed.js
+# serves the sidecar, not the .json, to every client that accepts br or gzip
+echo "Step 2: Precompressing changed files..."
+python3 precompress.py "$OUTPUT_DIR"
+echo ""
+
+# Steps 3-4: Upload the files whose content hash changed since the last deploy
+# (.deploy_manifest.json) and invalidate exactly those paths in CloudFront
+echo "Step 3: Deploying changed files to S3 + CloudFront..."
 FILE_COUNT=$(find "$OUTPUT_DIR" -type f | wc -l | tr -d ' ')
-TOTAL_SIZE=$(du -sh "$OUTPUT_DIR" | cut -f1)
 echo "  Files to check: $FILE_COUNT"
-echo "  Total size: $TOTAL_SIZE"
-echo "  (This may take 5-10 minutes for large updates...)"
 echo ""
 
 START_TIME=$(date +%s)
-aws s3 sync "$OUTPUT_DIR/" "s3://$BUCKET_NAME/" \
-    --delete \
-    --size-only \
-    --content-type "application/json" \
-    --cache-control "max-age=3600" 2>&1 | tee /tmp/s3_sync.log
+python3 deploy_planner.py \
+    --bucket "$BUCKET_NAME" \
+    --distribution-id "$CLOUDFRONT_ID" \
+    --root "$OUTPUT_DIR" \
+    --delete 2>&1 | tee /tmp/s3_sync.log
 
 END_TIME=$(date +%s)
 ELAPSED=$((END_TIME - START_TIME))
 echo ""
-echo "  ✓ S3 sync completed in ${ELAPSED}s"
-echo "  ✓ Synced $FILE_COUNT files to S3"
-echo ""
-
-# Step 3: Invalidate CloudFront cache (only changed paths)
-echo "Step 3: Creating CloudFront invalidation..."
-INVALIDATION_ID=$(aws cloudfront create-invalidation \
-    --distribution-id "$CLOUDFRONT_ID" \
-    --paths "/medicare/*" \
-    --query 'Invalidation.Id' \
-    --output text)
-
-echo "  ✓ Invalidation created: $INVALIDATION_ID"
+echo "  ✓ Deploy completed in ${ELAPSED}s"
 echo ""
 
 echo "========================================"
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Shared work queue of plans to scrape, so several nodes can split a national run
+
+The queue is a SQLite file keyed by plan ID. Put it on local disk for several
+processes or containers on one host, or on any shared directory with working
+POSIX locks for several machines (the default rollback journal is used rather
+than WAL, which needs shared memory). Every node runs the same command:
+
+- add() seeds the queue; it is idempotent, so each node may seed it.
+- take(n) leases up to n pending plans to this node for `lease_seconds`. It
+  runs in one write transaction, so two nodes never get the same plan.
+- heartbeat() extends this node's leases while it is working on them. A node
+  that dies stops heartbeating, and its plans are leased again once the lease
+  expires - up to `max_attempts` leases per plan. A plan whose lease expired
+  that many times (one that keeps crashing its worker) is marked failed
+  instead of being re-issued forever; retry_failed() gives it a fresh count.
+- complete() records the outcome. It only succeeds while this node still
+  holds the lease, so a plan that was re-issued is never recorded twice.
+
+The connection may be used from any thread (scrape_engine calls the queue
+through asyncio.to_thread); calls are serialized by a lock.
+
+Usage:
+    queue = WorkQueue('scrape_queue.sqlite')
+    queue.add(tasks)
+    for plan, state_name in queue.take(4):
+        ...
+        queue.complete(plan['ContractPlanSegmentID'], success=True)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    plan_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending, leased, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_next ON tasks (status, priority DESC);
+"""
+
+
+def in_shard(plan_id, shard):
+    """shard is (k, n) with 1 <= k <= n: a stable split of plan IDs without shared storage"""
+    k, n = shard
+    return zlib.crc32(plan_id.encode()) % n == k - 1
+
+
+class WorkQueue:
+    """Plans to scrape with per-node leases, stored in one SQLite file"""
+
+    def __init__(self, path='scrape_queue.sqlite', lease_seconds=300, owner=None, max_attempts=3, clock=time.time):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.clock = clock
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _write(self, fn):
+        """Run fn(cursor) in an immediate (write-locked) transaction"""
+        with self._lock:
+            cursor = self.db.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(cursor)
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+            return result
+
+    def add(self, tasks, priority=0):
+        """Queue (plan, state_name) pairs; plans already in the queue are left as they are
+
+        priority is one number for all of them or {plan_id: number}; higher is leased first.
+        """
+        def priority_of(plan_id):
+            return priority.get(plan_id, 0) if isinstance(priority, dict) else priority
+
+        rows = [(plan['ContractPlanSegmentID'], state_name, json.dumps(plan),
+                 priority_of(plan['ContractPlanSegmentID']), self.clock())
+                for plan, state_name in tasks]
+
+        def insert(cursor):
+            before = self.db.total_changes
+            cursor.executemany(
+                'INSERT OR IGNORE INTO tasks (plan_id, state, plan, priority, updated) VALUES (?, ?, ?, ?, ?)', rows)
+            return self.db.total_changes - before
+        return self._write(insert)
+
+    def take(self, n):
+        """Lease up to n plans (pending, or leased by a node whose lease expired) to this node"""
+        if n <= 0:
+            return []
+        now = self.clock()
+
+        def lease(cursor):
+            # Expired leases that used up their attempts are not handed out again
+            cursor.execute(
+                "UPDATE tasks SET status = 'failed', error = 'Lease expired ' || attempts || ' times',"
+                " lease_owner = NULL, lease_expires = NULL, updated = ?"
+                " WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts))
+            rows = cursor.execute(
+                "SELECT plan_id, state, plan FROM tasks"
+                " WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)"
+                " ORDER BY priority DESC, rowid LIMIT ?", (now, n)).fetchall()
+            cursor.executemany(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1,"
+                " updated = ? WHERE plan_id = ?",
+                [(self.owner, now + self.lease_seconds, now, plan_id) for plan_id, _, _ in rows])
+            return [(json.loads(plan), state) for _, state, plan in rows]
+        return self._write(lease)
+
+    def heartbeat(self):
+        """Extend every lease this node holds; returns how many"""
+        now = self.clock()
+        return self._write(lambda cursor: cursor.execute(
+            "UPDATE tasks SET lease_expires = ? WHERE status = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, self.owner)).rowcount)
+
+    def complete(self, plan_id, success, error=None):
+        """Record a leased plan's outcome; False if the lease was lost to another node"""
+        return self._write(lambda cursor: cursor.execute(
+            "UPDATE tasks SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated = ?"
+            " WHERE plan_id = ? AND status = 'leased' AND lease_owner = ?",
+            ('done' if success else 'failed', error, self.clock(), plan_id, self.owner)).rowcount == 1)
+
+    def release(self):
+        """Hand this node's unfinished plans back, e.g. on shutdown (not counted as an attempt)"""
+        return self._write(lambda cursor: cursor.execute(
+            "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL, attempts = attempts - 1"
+            " WHERE status = 'leased' AND lease_owner = ?", (self.owner,)).rowcount)
+
+    def retry_failed(self):
+        """Make failed plans pending again, with a fresh attempt count"""
+        return self._write(lambda cursor: cursor.execute(
+            "UPDATE tasks SET status = 'pending', error = NULL, attempts = 0 WHERE status = 'failed'").rowcount)
+
+    def counts(self):
+        """{status: number of plans}"""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        with self._lock:
+            counts.update(self.db.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        return counts
+
+    def close(self):
+        self.db.close()
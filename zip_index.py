@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Binary ZIP -> county index, shared by lambda_function and api_server
+
+Every state's zip_to_county_multi.json used to be parsed into a dict of dicts
+on each cold start; nationally that is ~40k ZIPs. zip_index.bin packs all of
+them into flat little-endian arrays that are mmap'ed and searched in place:
+opening the index parses a 24-byte header, a lookup is a bisect over the
+sorted ZIP keys, and the pages are shared by every process that maps the file.
+
+Layout (each section padded to 4 bytes):
+    header        '<4sHHIIII': b'ZIPX', format, states, entries, links, counties, name bytes
+    keys          entries x u32    ZIP as an integer, ascending; a ZIP in two states'
+                                   mappings has one entry per state
+    starts        entries+1 x u32  first link of each entry (links of entry i are starts[i]:starts[i+1])
+    county_fips   counties x u32
+    name_starts   counties+1 x u32 offsets into names
+    link_county   links x u16      county number
+    link_percent  links x u16      share of the ZIP in hundredths of a percent, 0xFFFF = unknown
+    entry_state   entries x u8     state number
+    primary       entries x u8     which of the entry's links is the primary county
+    states        states x 2 bytes state abbreviations
+    names         UTF-8 county names
+
+lookup() returns the same dict a zip_to_county_multi.json entry holds.
+
+Usage:
+    index = load_zip_index(Path('mock_api'))
+    nh_zips = index.for_state('NH')      # Mapping: '03602' in nh_zips, nh_zips['03602']
+    index.lookup_all('03602')            # Every state's entry for a ZIP
+
+Rebuild after changing any zip_to_county_multi.json (deploy_lambda.sh does;
+a missing file is built in memory on load, and check_stale=True does the same
+for a file older than its sources):
+    python zip_index.py [mock_api]
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from bisect import bisect_left
+from collections.abc import Mapping
+from pathlib import Path
+
+INDEX_FILE = 'zip_index.bin'
+MAGIC = b'ZIPX'
+INDEX_FORMAT = 1
+HEADER = struct.Struct('<4sHHIIII')
+NO_PERCENT = 0xFFFF
+
+if sys.byteorder != 'little':
+    raise ImportError('zip_index maps its arrays in place and needs a little-endian machine')
+
+
+def _pad(data):
+    return data + b'\0' * (-len(data) % 4)
+
+
+def build_index(entries_by_state):
+    """Pack {state_abbr: [zip_to_county_multi entries]} into index bytes"""
+    states = sorted(entries_by_state)
+    counties = {}  # (fips, name) -> county number
+    rows = []
+    for state_number, state in enumerate(states):
+        for entry in entries_by_state[state]:
+            links = [(counties.setdefault((c['fips'], c['name']), len(counties)), c.get('percentage'))
+                     for c in entry['counties']]
+            primary = next(i for i, c in enumerate(entry['counties']) if c['name'] == entry['primary_county']['name'])
+            rows.append((int(entry['zip']), state_number, primary, links))
+    rows.sort(key=lambda row: (row[0], row[1]))
+
+    starts = [0]
+    link_county, link_percent = [], []
+    for _, _, _, links in rows:
+        for county, percent in links:
+            link_county.append(county)
+            link_percent.append(NO_PERCENT if percent is None else round(percent * 100))
+        starts.append(len(link_county))
+
+    names = b''
+    name_starts = [0]
+    county_fips = []
+    for fips, name in sorted(counties, key=counties.get):
+        county_fips.append(int(fips))
+        names += name.encode('utf-8')
+        name_starts.append(len(names))
+
+    return b''.join([
+        HEADER.pack(MAGIC, INDEX_FORMAT, len(states), len(rows), len(link_county), len(county_fips), len(names)),
+        _pad(struct.pack(f'<{len(rows)}I', *(row[0] for row in rows))),
+        _pad(struct.pack(f'<{len(starts)}I', *starts)),
+        _pad(struct.pack(f'<{len(county_fips)}I', *county_fips)),
+        _pad(struct.pack(f'<{len(name_starts)}I', *name_starts)),
+        _pad(struct.pack(f'<{len(link_county)}H', *link_county)),
+        _pad(struct.pack(f'<{len(link_percent)}H', *link_percent)),
+        _pad(bytes(row[1] for row in rows)),
+        _pad(bytes(row[2] for row in rows)),
+        _pad(''.join(states).encode('ascii')),
+        names,
+    ])
+
+
+def source_files(data_dir):
+    """{state_abbr: zip_to_county_multi.json path} under a data directory"""
+    return {path.parent.name: path for path in sorted(Path(data_dir).glob('*/zip_to_county_multi.json'))}
+
+
+def build_from_json(data_dir):
+    entries_by_state = {}
+    for state, path in source_files(data_dir).items():
+        with open(path, 'r') as f:
+            entries_by_state[state] = json.load(f)
+    return build_index(entries_by_state)
+
+
+def write_index(data_dir):
+    """Build data_dir/zip_index.bin from the state mappings; returns its path"""
+    path = Path(data_dir) / INDEX_FILE
+    tmp_path = path.with_name(f'.{INDEX_FILE}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(build_from_json(data_dir))
+    os.replace(tmp_path, path)
+    return path
+
+
+class ZipIndex:
+    """Read-only view of index bytes (an mmap or a bytes object)"""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        magic, index_format, n_states, n_entries, n_links, n_counties, names_size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or index_format != INDEX_FORMAT:
+            raise ValueError(f'Not a format {INDEX_FORMAT} ZIP index')
+
+        view = memoryview(buffer)
+        position = HEADER.size
+
+        def section(count, item_format, item_size):
+            nonlocal position
+            size = count * item_size
+            array = view[position:position + size].cast(item_format) if item_format else view[position:position + size]
+            position += size + (-size % 4)
+            return array
+
+        self.keys = section(n_entries, 'I', 4)
+        self.starts = section(n_entries + 1, 'I', 4)
+        self.county_fips = section(n_counties, 'I', 4)
+        self.name_starts = section(n_counties + 1, 'I', 4)
+        self.link_county = section(n_links, 'H', 2)
+        self.link_percent = section(n_links, 'H', 2)
+        self.entry_state = section(n_entries, None, 1)
+        self.primary = section(n_entries, None, 1)
+        states = bytes(section(n_states * 2, None, 1)).decode('ascii')
+        self.names = section(names_size, None, 1)
+        self.states = [states[i:i + 2] for i in range(0, len(states), 2)]
+        self.state_numbers = {state: i for i, state in enumerate(self.states)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _find(self, zip_code, state=None):
+        """Entry number of a ZIP (in a state), or None"""
+        if len(zip_code) != 5 or not zip_code.isdigit():
+            return None
+        key = int(zip_code)
+        state_number = None if state is None else self.state_numbers.get(state, -1)
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if state_number is None or self.entry_state[i] == state_number:
+                return i
+            i += 1
+        return None
+
+    def _county(self, county):
+        name = bytes(self.names[self.name_starts[county]:self.name_starts[county + 1]]).decode('utf-8')
+        return {'fips': f'{self.county_fips[county]:05d}', 'name': name}
+
+    def _entry(self, i):
+        counties = []
+        for link in range(self.starts[i], self.starts[i + 1]):
+            county = self._county(self.link_county[link])
+            percent = self.link_percent[link]
+            county['percentage'] = None if percent == NO_PERCENT else percent / 100
+            counties.append(county)
+        primary = counties[self.primary[i]]
+        return {
+            'zip': f'{self.keys[i]:05d}',
+            'multi_county': len(counties) > 1,
+            'county_count': len(counties),
+            'counties': counties,
+            'primary_county': {'fips': primary['fips'], 'name': primary['name']},
+            'county': primary['name'],
+            'fips': primary['fips'],
+            'state': self.states[self.entry_state[i]]
+        }
+
+    def contains(self, zip_code, state=None):
+        return self._find(zip_code, state) is not None
+
+    def lookup(self, zip_code, state=None):
+        """The zip_to_county_multi entry for a ZIP (plus its 'state'), or None"""
+        i = self._find(zip_code, state)
+        return None if i is None else self._entry(i)
+
+    def lookup_all(self, zip_code):
+        """The entries for a ZIP in every state mapping it, in state order"""
+        i = self._find(zip_code)
+        entries = []
+        while i is not None and i < len(self.keys) and self.keys[i] == int(zip_code):
+            entries.append(self._entry(i))
+            i += 1
+        return entries
+
+    def zips(self, state=None):
+        """ZIP codes in ascending order, optionally only one state's"""
+        state_number = None if state is None else self.state_numbers.get(state, -1)
+        for i, key in enumerate(self.keys):
+            if state_number is None or self.entry_state[i] == state_number:
+                yield f'{key:05d}'
+
+    def for_state(self, state):
+        return StateZips(self, state)
+
+
+class StateZips(Mapping):
+    """One state's ZIPs as a read-only mapping of ZIP -> entry, like the old per-state dict"""
+
+    def __init__(self, index, state):
+        self.index = index
+        self.state = state
+        self._len = None
+
+    def __getitem__(self, zip_code):
+        entry = self.index.lookup(zip_code, self.state)
+        if entry is None:
+            raise KeyError(zip_code)
+        return entry
+
+    def __contains__(self, zip_code):
+        return isinstance(zip_code, str) and self.index.contains(zip_code, self.state)
+
+    def __iter__(self):
+        return self.index.zips(self.state)
+
+    def __len__(self):
+        if self._len is None:
+            state_number = self.index.state_numbers.get(self.state)
+            self._len = 0 if state_number is None else bytes(self.index.entry_state).count(state_number)
+        return self._len
+
+
+def load_zip_index(data_dir, check_stale=False):
+    """mmap data_dir/zip_index.bin, or build the index in memory if there is none
+
+    check_stale also rebuilds in memory when a state mapping is newer than the
+    file - for local development; deployed copies don't keep their mtimes.
+    """
+    path = Path(data_dir) / INDEX_FILE
+    try:
+        index_mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ZipIndex(build_from_json(data_dir))
+
+    if check_stale and any(p.stat().st_mtime_ns > index_mtime for p in source_files(data_dir).values()):
+        print(f"  ⚠ {path} is older than its zip_to_county_multi.json sources - using an in-memory rebuild")
+        return ZipIndex(build_from_json(data_dir))
+    with open(path, 'rb') as f:
+        return ZipIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def main():
+    data_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path('mock_api')
+    path = write_index(data_dir)
+    sources = source_files(data_dir)
+    json_size = sum(p.stat().st_size for p in sources.values())
+
+    start = time.perf_counter()
+    for path_ in sources.values():
+        with open(path_, 'r') as f:
+            {entry['zip']: entry for entry in json.load(f)}
+    json_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = load_zip_index(data_dir)
+    open_time = time.perf_counter() - start
+
+    zips = list(index.zips())
+    start = time.perf_counter()
+    for zip_code in zips:
+        index.lookup(zip_code)
+    lookup_time = (time.perf_counter() - start) / max(1, len(zips))
+
+    print(f"ZIP index: {path} ({path.stat().st_size / 1024:.0f} KB, from {json_size / 1024:.0f} KB of JSON)")
+    print(f"  States: {', '.join(index.states)}; {len(index)} ZIP entries")
+    print(f"  Open: {open_time * 1e6:.0f} µs (JSON parse: {json_time * 1e3:.1f} ms)")
+    print(f"  Lookup: {lookup_time * 1e6:.1f} µs per ZIP")
+
+
+if __name__ == '__main__':
+    main()